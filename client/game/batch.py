@@ -0,0 +1,171 @@
+"""Batched NumPy simulator: N independent games stepped together.
+
+Boards are bit-packed as an (N, height + 4) uint32 array (bit j = column j).
+The four extra rows at the bottom are permanently full and act as the
+floor, so collision is a single AND against the piece masks. Pieces come
+from the same SHAPES/rotation tables as GameCore and scoring follows
+GameCore.clear_lines.
+"""
+import numpy as np
+
+from .core import BOARD_WIDTH, BOARD_HEIGHT, SHAPES, get_piece_table
+
+PIECE_ROWS = 4  # 회전 행렬의 최대 높이
+ROTATIONS = 4
+
+
+class PieceMasks:
+    """Dense (kind, rotation, x) -> row masks lookup tables for one board width."""
+
+    def __init__(self, width=BOARD_WIDTH):
+        table = get_piece_table(width)
+        self.x_min = min(r.min_x for chain in table.rotations for r in chain)
+        self.x_max = width - 1
+        xs = self.x_max - self.x_min + 1
+        shape = (len(SHAPES), ROTATIONS, xs)
+        self.masks = np.zeros(shape + (PIECE_ROWS,), dtype=np.uint32)
+        self.valid_x = np.zeros(shape, dtype=bool)
+        self.spawn_x = np.zeros(len(SHAPES), dtype=np.int64)
+
+        for kind, chain in enumerate(table.rotations):
+            self.spawn_x[kind] = width // 2 - chain[0].width // 2
+            for index, rotation in enumerate(chain):
+                row_bits = [sum(1 << j for j, cell in enumerate(row) if cell)
+                            for row in rotation.shape]
+                for x in range(rotation.min_x, rotation.max_x + 1):
+                    xi = x - self.x_min
+                    self.valid_x[kind, index, xi] = True
+                    for i, bits in enumerate(row_bits):
+                        self.masks[kind, index, xi, i] = bits << x if x >= 0 else bits >> -x
+
+    def lookup(self, kind, rotation, x):
+        """(N, PIECE_ROWS) masks and (N,) validity for arrays of kind/rotation/x."""
+        xi = np.clip(x - self.x_min, 0, self.masks.shape[2] - 1)
+        valid = self.valid_x[kind, rotation, xi] & (x >= self.x_min) & (x <= self.x_max)
+        return self.masks[kind, rotation, xi], valid
+
+
+class BatchSimulator:
+    def __init__(self, n, width=BOARD_WIDTH, height=BOARD_HEIGHT, seed=None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.table = PieceMasks(width)
+        self.rng = np.random.default_rng(seed)
+        self._index = np.arange(n)
+        self._row_offsets = np.arange(PIECE_ROWS)
+
+        self.boards = np.zeros((n, height + PIECE_ROWS), dtype=np.uint32)
+        self.boards[:, height:] = self.full_row  # 바닥 역할
+        self.kind = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.lines_cleared = np.zeros(n, dtype=np.int64)
+        self.pieces_placed = np.zeros(n, dtype=np.int64)
+        self.spawn()
+
+    def _rows_at(self, y):
+        return self.boards[self._index[:, None], y[:, None] + self._row_offsets]
+
+    def collides(self, kind=None, rotation=None, x=None, y=None):
+        """Per-board collision test; arguments default to the current pieces."""
+        kind = self.kind if kind is None else kind
+        rotation = self.rotation if rotation is None else rotation
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        masks, valid = self.table.lookup(kind, rotation, x)
+        hit = (self._rows_at(np.clip(y, 0, self.height)) & masks).any(axis=1)
+        return hit | ~valid | (y < 0)
+
+    def drop_y(self):
+        """Landing y for every current piece (straight down from its position)."""
+        masks, _ = self.table.lookup(self.kind, self.rotation, self.x)
+        y = self.y.copy()
+        falling = ~self.game_over
+        while falling.any():
+            blocked = (self._rows_at(np.minimum(y + 1, self.height)) & masks).any(axis=1)
+            falling &= ~blocked
+            y += falling
+        return y
+
+    def spawn(self, which=None):
+        """New random pieces for the boards in `which` (bool mask, default all)."""
+        which = np.ones(self.n, dtype=bool) if which is None else which
+        count = int(which.sum())
+        self.kind[which] = self.rng.integers(0, len(SHAPES), count)
+        self.rotation[which] = 0
+        self.x[which] = self.table.spawn_x[self.kind[which]]
+        self.y[which] = 0
+        self.game_over |= which & self.collides()
+
+    def place(self, rotation, x):
+        """Move every current piece to (rotation, x) at its spawn row; blocked placements end the game."""
+        self.rotation = np.asarray(rotation, dtype=np.int64) % ROTATIONS
+        self.x = np.asarray(x, dtype=np.int64).copy()
+        self.game_over |= self.collides()
+
+    def hard_drop(self):
+        """Drop, merge, clear full rows and spawn; returns lines cleared per board."""
+        self.y = self.drop_y()
+        return self.lock()
+
+    def gravity(self):
+        """One gravity tick for every live board; pieces that cannot fall are locked."""
+        live = ~self.game_over
+        can_fall = live & ~self.collides(y=self.y + 1)
+        self.y += can_fall
+        lines = np.zeros(self.n, dtype=np.int64)
+        landed = live & ~can_fall
+        if landed.any():
+            lines = self.lock(landed)
+        return lines
+
+    def lock(self, which=None):
+        which = ~self.game_over if which is None else which & ~self.game_over
+        idx = np.flatnonzero(which)
+        masks, _ = self.table.lookup(self.kind[idx], self.rotation[idx], self.x[idx])
+        rows = self.y[idx, None] + self._row_offsets
+        # 같은 보드 안에서 (보드, 행) 쌍이 겹치지 않으므로 팬시 인덱싱 OR가 안전함
+        self.boards[idx[:, None], rows] |= masks
+        self.pieces_placed[idx] += 1
+        lines = self.clear_lines()
+        self.spawn(which)
+        return lines
+
+    def clear_lines(self):
+        playfield = self.boards[:, :self.height]
+        full = playfield == self.full_row
+        lines = full.sum(axis=1)
+        hit = np.flatnonzero(lines)
+        if len(hit):
+            # 꽉 찬 행을 위로 보내는 안정 정렬 후 그 행들을 비움 (나머지 순서 유지)
+            order = np.argsort(~full[hit], axis=1, kind='stable')
+            compacted = np.take_along_axis(playfield[hit], order, axis=1)
+            compacted[np.arange(self.height) < lines[hit, None]] = 0
+            playfield[hit] = compacted
+
+            self.lines_cleared[hit] += lines[hit]
+            self.score[hit] += lines[hit] * 100 * self.level[hit]
+            self.level[hit] = self.lines_cleared[hit] // 10 + 1
+        return lines
+
+    def reset(self, which=None):
+        """Start fresh games on the boards in `which` (default: finished ones)."""
+        which = self.game_over.copy() if which is None else which
+        self.boards[which, :self.height] = 0
+        self.game_over[which] = False
+        self.score[which] = 0
+        self.level[which] = 1
+        self.lines_cleared[which] = 0
+        self.pieces_placed[which] = 0
+        self.spawn(which)
+
+    def occupancy(self):
+        """(N, height, width) bool view of the boards, e.g. for rendering or features."""
+        bits = np.uint32(1) << np.arange(self.width, dtype=np.uint32)
+        return (self.boards[:, :self.height, None] & bits) != 0
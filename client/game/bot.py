@@ -0,0 +1,240 @@
+"""Placement-search autoplayer.
+
+For the current piece every distinct rotation and every column is tried,
+exactly like pressing K_UP then K_LEFT/K_RIGHT and K_SPACE from the spawn
+position. Landing rows come from per-column heights and cached piece
+footprints instead of stepping is_valid_move down the board, and the
+resulting boards are scored with a configurable linear heuristic. An
+optional one-piece lookahead (averaged over every possible next piece)
+can be spread over a concurrent.futures process pool and falls back to
+the plain search when it would blow the frame budget.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import pygame
+
+from .core import BOARD_WIDTH, BOARD_HEIGHT, SHAPES, get_piece_table
+
+# 휴리스틱 가중치 (높이/제거 줄/구멍/울퉁불퉁함)
+DEFAULT_WEIGHTS = {
+    'height': -0.510066,
+    'lines': 0.760666,
+    'holes': -0.35663,
+    'bumpiness': -0.184483,
+}
+
+Placement = namedtuple('Placement', 'rotation x y lines score')
+
+
+def column_tops(rows, width):
+    """Row index of the highest filled cell per column (len(rows) if empty)."""
+    height = len(rows)
+    tops = [height] * width
+    remaining = (1 << width) - 1
+    for r, bits in enumerate(rows):
+        new = bits & remaining
+        while new:
+            low = new & -new
+            tops[low.bit_length() - 1] = r
+            new ^= low
+        remaining &= ~bits
+        if not remaining:
+            break
+    return tops
+
+
+def board_features(rows, width):
+    """(aggregate height, holes, bumpiness) of a bitboard."""
+    height = len(rows)
+    heights = [0] * width
+    covered = 0
+    holes = 0
+    for r, bits in enumerate(rows):
+        new = bits & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = height - r
+            new ^= low
+        covered |= bits
+        holes += (covered & ~bits).bit_count()
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(width - 1))
+    return sum(heights), holes, bumpiness
+
+
+def evaluate(rows, width, lines, weights):
+    aggregate, holes, bumpiness = board_features(rows, width)
+    return (weights['height'] * aggregate + weights['lines'] * lines
+            + weights['holes'] * holes + weights['bumpiness'] * bumpiness)
+
+
+class Footprint:
+    """Lowest occupied row of each column of one rotation."""
+    __slots__ = ('rotation', 'bottoms')
+
+    def __init__(self, rotation):
+        self.rotation = rotation
+        bottoms = {}
+        for i, j, _ in rotation.cells:
+            bottoms[j] = max(bottoms.get(j, -1), i)
+        self.bottoms = tuple(sorted(bottoms.items()))
+
+    def landing_y(self, tops, x):
+        return min(tops[x + j] - bottom - 1 for j, bottom in self.bottoms)
+
+
+class PlacementSearch:
+    def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT, weights=None,
+                 lookahead=False, workers=0, budget_ms=None):
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.lookahead = lookahead
+        self.budget_ms = budget_ms
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+
+        # 모양이 같은 회전(O, I/S/Z의 180도)은 한 번만 탐색
+        table = get_piece_table(width)
+        self.footprints = []
+        for chain in table.rotations:
+            seen = set()
+            unique = []
+            for rotation in chain:
+                if rotation.shape not in seen:
+                    seen.add(rotation.shape)
+                    unique.append(Footprint(rotation))
+            self.footprints.append(unique)
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def candidates(self, rows, kind):
+        """Yield (rotation index, x, y, rows after clearing, lines) for every reachable drop."""
+        tops = column_tops(rows, self.width)
+        full = self.full_row
+        for footprint in self.footprints[kind]:
+            rotation = footprint.rotation
+            for x in range(rotation.min_x, rotation.max_x + 1):
+                y = footprint.landing_y(tops, x)
+                if y < 0:
+                    continue
+                placed = list(rows)
+                r = y + rotation.top
+                for mask in rotation.masks[x - rotation.min_x]:
+                    placed[r] |= mask
+                    r += 1
+                lines = 0
+                if full in placed:
+                    kept = [bits for bits in placed if bits != full]
+                    lines = self.height - len(kept)
+                    placed = [0] * lines + kept
+                yield rotation.index, x, y, placed, lines
+
+    def best(self, rows, kind):
+        """Best Placement for `kind` on `rows`, or None if nothing fits."""
+        deadline = None
+        if self.budget_ms is not None:
+            deadline = time.perf_counter() + self.budget_ms / 1000
+
+        options = list(self.candidates(rows, kind))
+        if not options:
+            return None
+        scores = [evaluate(placed, self.width, lines, self.weights)
+                  for _, _, _, placed, lines in options]
+
+        if self.lookahead:
+            deeper = self._lookahead(options, deadline)
+            if deeper is not None:
+                scores = deeper
+
+        i = max(range(len(options)), key=scores.__getitem__)
+        rotation, x, y, _, lines = options[i]
+        return Placement(rotation, x, y, lines, scores[i])
+
+    def _lookahead(self, options, deadline):
+        args = [(placed, lines, self.width, self.height, self.weights)
+                for _, _, _, placed, lines in options]
+        if self.executor:
+            # 작업자 수만큼 묶어서 제출 (후보마다 제출하면 IPC 비용이 더 큼)
+            chunks = [args[i::self.workers] for i in range(min(self.workers, len(args)))]
+            futures = [self.executor.submit(_expected_values, chunk) for chunk in chunks]
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            done, pending = wait(futures, timeout=timeout)
+            if pending:
+                for future in pending:
+                    future.cancel()
+                return None
+            scores = [0.0] * len(args)
+            for i, future in enumerate(futures):
+                scores[i::len(futures)] = future.result()
+            return scores
+
+        scores = []
+        for a in args:
+            if deadline is not None and time.perf_counter() > deadline:
+                return None  # 예산 초과: 1단계 탐색 결과 사용
+            scores.append(_expected_value(*a))
+        return scores
+
+
+_worker_searches = {}
+
+
+def _expected_values(chunk):
+    return [_expected_value(*a) for a in chunk]
+
+
+def _expected_value(rows, lines, width, height, weights):
+    """Mean over every possible next piece of its best follow-up score."""
+    key = (width, height)
+    search = _worker_searches.get(key)
+    if search is None:
+        search = _worker_searches[key] = PlacementSearch(width, height)
+    total = 0.0
+    for kind in range(len(SHAPES)):
+        best = None
+        for _, _, _, placed, more in search.candidates(rows, kind):
+            score = evaluate(placed, width, lines + more, weights)
+            if best is None or score > best:
+                best = score
+        total += best if best is not None else -1e9
+    return total / len(SHAPES)
+
+
+class Autoplayer:
+    """Plays a TetrisGame by feeding handle_key() the keys for the chosen placement.
+
+    keys_per_frame=None issues the whole plan at once; a small number makes
+    the bot look (and send traffic) more like a human player.
+    """
+
+    def __init__(self, search=None, keys_per_frame=None):
+        self.search = search or PlacementSearch()
+        self.keys_per_frame = keys_per_frame
+        self.plan = []
+        self.planned_for = None
+
+    def plan_keys(self, core, placement):
+        keys = [pygame.K_UP] * placement.rotation
+        dx = placement.x - core.x
+        keys += [pygame.K_RIGHT if dx > 0 else pygame.K_LEFT] * abs(dx)
+        keys.append(pygame.K_SPACE)
+        return keys
+
+    def act(self, game):
+        core = game.core
+        if game.game_over:
+            return
+        if self.planned_for != core.pieces_spawned:
+            self.planned_for = core.pieces_spawned
+            placement = self.search.best(core.board.rows, core.piece.kind)
+            self.plan = self.plan_keys(core, placement) if placement else [pygame.K_SPACE]
+
+        count = len(self.plan) if self.keys_per_frame is None else self.keys_per_frame
+        for _ in range(min(count, len(self.plan))):
+            game.handle_key(self.plan.pop(0))
@@ -0,0 +1,35 @@
+"""Clocks that drive TetrisGame timing (milliseconds, like pygame.time.get_ticks)."""
+import time
+
+import pygame
+
+
+class SystemClock:
+    """Real time from pygame."""
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+
+class ManualClock:
+    """Clock that only moves when advanced; for headless runs, tests and replays."""
+
+    def __init__(self, start=0):
+        self.ticks = start
+
+    def get_ticks(self):
+        return self.ticks
+
+    def advance(self, ms):
+        self.ticks += ms
+        return self.ticks
+
+
+class MonotonicClock:
+    """Real time without pygame (headless bots and tools)."""
+
+    def __init__(self):
+        self._start = time.monotonic()
+
+    def get_ticks(self):
+        return int((time.monotonic() - self._start) * 1000)
@@ -0,0 +1,79 @@
+"""Allocation-free packet codec.
+
+Wire layout is the same as Packet (native byte order, 8-byte header), but
+all struct formats are precompiled and each socket owns one reusable send
+buffer and one receive buffer. Received packets are exposed through a
+PacketView over the receive buffer, so payloads (e.g. BOARD_UPDATE rows)
+can be read with np.frombuffer without copying.
+"""
+import struct
+
+HEADER = struct.Struct('=II')      # type, player_id
+MOVE = struct.Struct('=iiii')      # piece_type, x, y, rotation
+HEADER_SIZE = HEADER.size
+PACKET_SIZE = 1024
+
+
+class PacketView:
+    """Read-only view of the packet currently held in a receive buffer.
+
+    Only valid until the next receive into the same buffer.
+    """
+    __slots__ = ('buffer', 'length', 'type', 'player_id')
+
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        self.length = 0
+        self.type = 0
+        self.player_id = 0
+
+    def load(self, length):
+        self.length = length
+        self.type, self.player_id = HEADER.unpack_from(self.buffer)
+        return self
+
+    def move(self):
+        """(piece_type, x, y, rotation)"""
+        return MOVE.unpack_from(self.buffer, HEADER_SIZE)
+
+    def payload(self):
+        return self.buffer[HEADER_SIZE:self.length]
+
+
+class PacketCodec:
+    """Per-socket reusable send/receive buffers.
+
+    The send side is meant to be used from one thread (the game loop) and
+    the receive side from whichever thread drains the socket.
+    """
+
+    def __init__(self, size=PACKET_SIZE):
+        self.send_buffer = bytearray(size)
+        self.recv_buffer = bytearray(size)
+        self._send = memoryview(self.send_buffer)
+        self._header_packet = self._send[:HEADER_SIZE]
+        self._move_packet = self._send[:HEADER_SIZE + MOVE.size]
+        self.view = PacketView(self.recv_buffer)
+
+    def header(self, packet_type, player_id):
+        HEADER.pack_into(self.send_buffer, 0, packet_type, player_id)
+        return self._header_packet
+
+    def move(self, packet_type, player_id, piece_type, x, y, rotation):
+        HEADER.pack_into(self.send_buffer, 0, packet_type, player_id)
+        MOVE.pack_into(self.send_buffer, HEADER_SIZE, piece_type, x, y, rotation)
+        return self._move_packet
+
+    def finish(self, packet_type, player_id, payload_len):
+        """Write the header for a payload already placed at send_buffer[HEADER_SIZE:]."""
+        HEADER.pack_into(self.send_buffer, 0, packet_type, player_id)
+        return self._send[:HEADER_SIZE + payload_len]
+
+    def decode(self, length):
+        """Decode a packet already received into recv_buffer; None if it is too short."""
+        if length < HEADER_SIZE:
+            return None
+        return self.view.load(length)
+
+    def recv(self, sock):
+        return self.decode(sock.recv_into(self.recv_buffer))
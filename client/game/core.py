@@ -0,0 +1,304 @@
+"""Headless Tetris game core.
+
+Each board row is kept as an integer bitmask (bit j = column j) next to a
+colour grid used for drawing and networking. Every rotation of every shape
+is precomputed as row masks already shifted to each legal column, so
+collision checks, merges and line clears are a handful of integer ops.
+"""
+import random
+import numpy as np
+
+BOARD_WIDTH = 10
+BOARD_HEIGHT = 20
+
+# 테트리미노 모양 (색상 인덱스 = 블록 종류)
+SHAPES = [
+    [[1, 1, 1, 1]],  # I
+    [[2, 0, 0],      # J
+     [2, 2, 2]],
+    [[0, 0, 3],      # L
+     [3, 3, 3]],
+    [[4, 4],         # O
+     [4, 4]],
+    [[0, 5, 5],      # S
+     [5, 5, 0]],
+    [[0, 6, 0],      # T
+     [6, 6, 6]],
+    [[7, 7, 0],      # Z
+     [0, 7, 7]]
+]
+
+
+def rotate_shape(shape):
+    """Rotate a shape matrix clockwise (same as TetrisGame.rotate_piece)."""
+    return tuple(zip(*shape[::-1]))
+
+
+class Rotation:
+    """One orientation of a piece with its masks precomputed for a board width."""
+    __slots__ = ('kind', 'index', 'shape', 'width', 'height', 'cells',
+                 'top', 'min_x', 'max_x', 'masks', 'next')
+
+    def __init__(self, shape, board_width, kind=-1, index=0):
+        self.kind = kind
+        self.index = index
+        self.shape = tuple(tuple(row) for row in shape)
+        self.height = len(self.shape)
+        self.width = len(self.shape[0])
+        self.cells = tuple((i, j, cell)
+                           for i, row in enumerate(self.shape)
+                           for j, cell in enumerate(row) if cell)
+        self.next = self
+
+        row_bits = [sum(1 << j for j, cell in enumerate(row) if cell) for row in self.shape]
+        used_rows = [i for i, bits in enumerate(row_bits) if bits]
+        used_cols = [j for _, j, _ in self.cells]
+        # 빈 행은 경계 검사에서 제외 (원래 is_valid_move와 동일한 판정)
+        self.top = used_rows[0] if used_rows else 0
+        row_bits = row_bits[self.top:used_rows[-1] + 1] if used_rows else []
+        self.min_x = -min(used_cols) if used_cols else 0
+        self.max_x = board_width - 1 - max(used_cols) if used_cols else board_width - 1
+
+        self.masks = tuple(
+            tuple(bits << x if x >= 0 else bits >> -x for bits in row_bits)
+            for x in range(self.min_x, self.max_x + 1)
+        )
+
+
+class PieceTable:
+    """All rotations of every entry in SHAPES for one board width."""
+
+    def __init__(self, width):
+        self.width = width
+        self.rotations = []
+        self._by_shape = {}
+        for kind, shape in enumerate(SHAPES):
+            chain = []
+            for index in range(4):
+                rotation = Rotation(shape, width, kind, index)
+                chain.append(rotation)
+                self._by_shape.setdefault(rotation.shape, rotation)
+                shape = rotate_shape(shape)
+            for index, rotation in enumerate(chain):
+                rotation.next = chain[(index + 1) % 4]
+            self.rotations.append(chain)
+
+    def spawn(self, kind):
+        return self.rotations[kind][0]
+
+    def get(self, shape):
+        """Return the Rotation for an arbitrary shape matrix."""
+        if isinstance(shape, Rotation):
+            return shape
+        key = tuple(tuple(row) for row in shape)
+        rotation = self._by_shape.get(key)
+        if rotation is None:
+            rotation = Rotation(key, self.width)
+            self._by_shape[key] = rotation
+        return rotation
+
+
+_tables = {}
+
+
+def get_piece_table(width=BOARD_WIDTH):
+    table = _tables.get(width)
+    if table is None:
+        table = _tables[width] = PieceTable(width)
+    return table
+
+
+class Bitboard:
+    """Board stored as one bitmask per row plus an int32 colour grid."""
+
+    def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.rows = [0] * height
+        self.cells = np.zeros((height, width), dtype=np.int32)
+        self._col_bits = 1 << np.arange(width, dtype=np.int64)
+
+    def fits(self, rotation, x, y):
+        if x < rotation.min_x or x > rotation.max_x:
+            return False
+        masks = rotation.masks[x - rotation.min_x]
+        y += rotation.top
+        if y < 0 or y + len(masks) > self.height:
+            return False
+        rows = self.rows
+        for mask in masks:
+            if rows[y] & mask:
+                return False
+            y += 1
+        return True
+
+    def drop_y(self, rotation, x, y):
+        """Lowest y reachable from a valid position (x, y) by falling straight down."""
+        masks = rotation.masks[x - rotation.min_x]
+        rows = self.rows
+        limit = self.height - rotation.top - len(masks)
+        while y < limit:
+            r = y + 1 + rotation.top
+            for mask in masks:
+                if rows[r] & mask:
+                    return y
+                r += 1
+            y += 1
+        return y
+
+    def merge(self, rotation, x, y):
+        rows = self.rows
+        r = y + rotation.top
+        for mask in rotation.masks[x - rotation.min_x]:
+            rows[r] |= mask
+            r += 1
+        cells = self.cells
+        for i, j, cell in rotation.cells:
+            cells[y + i, x + j] = cell
+
+    def clear_lines(self):
+        """Remove full rows in one pass and return how many were cleared."""
+        rows = self.rows
+        full = self.full_row
+        if full not in rows:
+            return 0
+        keep = [i for i, bits in enumerate(rows) if bits != full]
+        cleared = self.height - len(keep)
+        self.rows = [0] * cleared + [rows[i] for i in keep]
+        # 팬시 인덱싱 결과는 복사본이므로 제자리 갱신이 안전함
+        self.cells[cleared:] = self.cells[keep]
+        self.cells[:cleared] = 0
+        return cleared
+
+    def load(self, cells):
+        """Replace the board contents from a (height, width) colour array."""
+        self.cells[:] = cells
+        self.rows = ((self.cells != 0) @ self._col_bits).tolist()
+
+    def reset(self):
+        self.rows = [0] * self.height
+        self.cells[:] = 0
+
+
+def random_piece():
+    return random.randrange(len(SHAPES))
+
+
+class SevenBag:
+    """7-bag randomizer: every run of 7 pieces is a shuffle of all kinds.
+
+    Built on xorshift32 + Fisher-Yates rather than the random module so the
+    sequence for a GAME_START seed is easy to reproduce outside Python.
+    """
+
+    def __init__(self, seed):
+        self.state = (seed & 0xFFFFFFFF) or 0x9E3779B9  # xorshift은 0 상태에서 멈춤
+        self.bag = []
+
+    def _next(self):
+        x = self.state
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self.state = x
+        return x
+
+    def __call__(self):
+        if not self.bag:
+            bag = list(range(len(SHAPES)))
+            for i in range(len(bag) - 1, 0, -1):
+                j = self._next() % (i + 1)
+                bag[i], bag[j] = bag[j], bag[i]
+            self.bag = bag[::-1]  # 앞에서부터 꺼내도록 뒤집어 pop()
+        return self.bag.pop()
+
+
+class GameCore:
+    """Board, falling piece and scoring without any pygame dependency."""
+
+    def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT, randomizer=None):
+        self.width = width
+        self.height = height
+        self.table = get_piece_table(width)
+        self.board = Bitboard(width, height)
+        self.randomizer = randomizer or random_piece
+
+        self.piece = None
+        self.x = 0
+        self.y = 0
+        self.pieces_spawned = 0
+        self.game_over = False
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.drop_speed = 1000  # 낙하 간격 (ms)
+        self.spawn()
+
+    def restart(self, randomizer=None):
+        """Empty board and fresh scoring, optionally with a new piece source."""
+        if randomizer is not None:
+            self.randomizer = randomizer
+        self.board.reset()
+        self.pieces_spawned = 0
+        self.game_over = False
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.drop_speed = 1000
+        self.spawn()
+
+    def spawn(self, kind=None):
+        if kind is None:
+            kind = self.randomizer()
+        self.piece = self.table.spawn(kind)
+        self.x = self.width // 2 - self.piece.width // 2
+        self.y = 0
+        self.pieces_spawned += 1
+        if not self.board.fits(self.piece, self.x, self.y):
+            self.game_over = True
+
+    def fits(self, rotation, x, y):
+        return self.board.fits(rotation, x, y)
+
+    def move(self, dx, dy=0):
+        if self.board.fits(self.piece, self.x + dx, self.y + dy):
+            self.x += dx
+            self.y += dy
+            return True
+        return False
+
+    def rotate(self):
+        rotated = self.piece.next
+        if self.board.fits(rotated, self.x, self.y):
+            self.piece = rotated
+            return True
+        return False
+
+    def ghost_y(self):
+        return self.board.drop_y(self.piece, self.x, self.y)
+
+    def hard_drop(self):
+        self.y = self.board.drop_y(self.piece, self.x, self.y)
+        return self.lock()
+
+    def step(self):
+        """Apply one gravity tick; returns lines cleared if the piece locked, else None."""
+        if self.move(0, 1):
+            return None
+        return self.lock()
+
+    def lock(self):
+        self.board.merge(self.piece, self.x, self.y)
+        lines = self.clear_lines()
+        self.spawn()
+        return lines
+
+    def clear_lines(self):
+        lines = self.board.clear_lines()
+        if lines > 0:
+            self.lines_cleared += lines
+            self.score += lines * 100 * self.level
+            self.level = self.lines_cleared // 10 + 1
+            self.drop_speed = max(100, 1000 - (self.level - 1) * 100)
+        return lines
@@ -0,0 +1,43 @@
+"""Headless TetrisGame: no window, no server, manually driven clock."""
+from .clock import ManualClock
+from .tetris import TetrisGame
+
+
+class NullNetwork:
+    """Stand-in for NetworkManager that is always 'started' and sends nothing."""
+
+    def __init__(self):
+        self.opponent_boards = (None, None)
+        self.seed = None
+        self.sent_moves = 0
+        self.sent_boards = 0
+
+    def poll(self):
+        return 0
+
+    def is_game_started(self):
+        return True
+
+    def is_server_disconnected(self):
+        return False
+
+    def disconnect(self):
+        pass
+
+    def send_move(self, piece_type, x, y, move_type=None, rotation=0):
+        self.sent_moves += 1
+
+    def flush_inputs(self):
+        pass
+
+    def send_board_state(self, board):
+        self.sent_boards += 1
+
+    def get_opponent_boards(self):
+        return self.opponent_boards
+
+
+def create_headless_game(width=10, height=20, clock=None, network=None):
+    """TetrisGame without a screen; advance `game.clock` and call update()/handle_key()."""
+    return TetrisGame(None, network or NullNetwork(), width, height,
+                      clock=clock or ManualClock())
@@ -0,0 +1,86 @@
+"""Redundant input-command channel (INPUT_COMMANDS / INPUT_ACK).
+
+Every command gets a monotonically increasing sequence number, and each
+datagram carries the oldest unacknowledged commands (up to the redundancy
+limit), so a lost datagram is covered by the next one instead of a
+retransmission round-trip. Commands stay queued until acknowledged: a
+backlog longer than the limit is sent over several datagrams in order,
+never dropped. The server deduplicates by sequence and acknowledges the
+highest one it has processed. Layout matches InputBatch/InputCommand in
+game_server.hpp.
+"""
+import struct
+from collections import deque
+from itertools import islice
+
+INPUT_BATCH_HEADER = struct.Struct('=B3x')      # count
+INPUT_COMMAND = struct.Struct('=IBBbbB3x')      # seq, type, piece_type, x, y, rotation
+INPUT_ACK = struct.Struct('=I')                 # seq
+MAX_INPUT_COMMANDS = 16
+
+
+class InputCommandSender:
+    """Queues local commands and encodes the first N unacknowledged ones."""
+
+    def __init__(self, redundancy=8):
+        self.redundancy = min(redundancy, MAX_INPUT_COMMANDS)
+        self.seq = 0
+        self.acked_seq = 0  # 수신 스레드에서 갱신, 정리는 송신 쪽에서만
+        self.pending = deque()
+
+    def push(self, move_type, piece_type, x, y, rotation):
+        self.seq += 1
+        self.pending.append((self.seq, int(move_type), piece_type, x, y, rotation))
+        return self.seq
+
+    def ack(self, seq):
+        if seq > self.acked_seq:
+            self.acked_seq = seq
+
+    def has_pending(self):
+        self._prune()
+        return bool(self.pending)
+
+    def _prune(self):
+        acked = self.acked_seq
+        pending = self.pending
+        while pending and pending[0][0] <= acked:
+            pending.popleft()
+
+    def encode_into(self, buffer, offset):
+        """Write the INPUT_COMMANDS payload at offset; returns its length (0 = nothing pending)."""
+        self._prune()
+        # 확인되지 않은 명령은 버리지 않고 오래된 것부터 N개씩 보냄 (서버는 순서대로 처리)
+        count = min(len(self.pending), self.redundancy)
+        if not count:
+            return 0
+        INPUT_BATCH_HEADER.pack_into(buffer, offset, count)
+        position = offset + INPUT_BATCH_HEADER.size
+        for command in islice(self.pending, count):
+            INPUT_COMMAND.pack_into(buffer, position, *command)
+            position += INPUT_COMMAND.size
+        return position - offset
+
+
+class InputCommandReceiver:
+    """Deduplicates forwarded opponent commands by per-player sequence."""
+
+    def __init__(self):
+        self.last_seq = {}
+
+    def accept(self, player_id, payload):
+        """Return the new commands in payload as (seq, type, piece_type, x, y, rotation) tuples."""
+        if len(payload) < INPUT_BATCH_HEADER.size:
+            return []
+        count, = INPUT_BATCH_HEADER.unpack_from(payload)
+        if count > MAX_INPUT_COMMANDS or len(payload) != INPUT_BATCH_HEADER.size + count * INPUT_COMMAND.size:
+            return []
+
+        last = self.last_seq.get(player_id, 0)
+        commands = []
+        for command in INPUT_COMMAND.iter_unpack(payload[INPUT_BATCH_HEADER.size:]):
+            if command[0] > last:
+                commands.append(command)
+                last = command[0]
+        self.last_seq[player_id] = last
+        return commands
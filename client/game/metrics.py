@@ -0,0 +1,189 @@
+"""Low-overhead client instrumentation.
+
+The game loop times its phases with time.perf_counter() into fixed-size
+rolling histograms. NetworkManager counts packets per type and times
+packet handling and input round trips in a NetworkStats. Percentiles are
+only computed when a report is taken (once per REPORT_INTERVAL), which
+feeds the F3 overlay and the optional JSON-lines export, so collection
+can stay on in normal play. Metrics(enabled=False) makes every timer
+call an early return.
+"""
+import json
+import time
+from array import array
+
+PHASES = ('poll', 'input', 'update', 'send', 'draw', 'flip')
+# 오버레이 히스토그램 구간 경계 (ms): 마지막 칸은 그 이상
+FRAME_BUCKETS_MS = (1, 2, 4, 8, 16, 33)
+
+
+class RollingHistogram:
+    """The last `size` samples in a ring buffer; statistics are computed on demand."""
+
+    def __init__(self, size=600):
+        self.size = size
+        self.samples = array('d', bytes(8 * size))
+        self.count = 0
+
+    def add(self, value):
+        self.samples[self.count % self.size] = value
+        self.count += 1
+
+    def values(self):
+        return sorted(self.samples[:min(self.count, self.size)])
+
+    def summary(self, scale=1.0):
+        """mean/p50/p99/max of the window multiplied by scale, or None if empty."""
+        values = self.values()
+        if not values:
+            return None
+        n = len(values)
+        return {'mean': sum(values) / n * scale,
+                'p50': values[n // 2] * scale,
+                'p99': values[min(n - 1, int(n * 0.99))] * scale,
+                'max': values[-1] * scale}
+
+    def buckets(self, edges, scale=1.0):
+        """Sample counts per [edge[i-1], edge[i]) bucket plus one overflow bucket."""
+        counts = [0] * (len(edges) + 1)
+        for value in self.samples[:min(self.count, self.size)]:
+            value *= scale
+            i = 0
+            while i < len(edges) and value >= edges[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+
+class NetworkStats:
+    """Packet counters, handling times and input RTT (updated from the receive thread)."""
+
+    def __init__(self, names=None):
+        self.names = names or {}  # packet type -> 보고서에 쓸 이름
+        self.received = {}  # packet type -> count
+        self.sent = {}
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.handle_time = RollingHistogram()
+        self.rtt = RollingHistogram(128)
+        self.srtt = None    # RFC 6298 평활 RTT (초)
+        self.rttvar = None
+
+    def on_receive(self, packet_type, length, seconds):
+        self.received[packet_type] = self.received.get(packet_type, 0) + 1
+        self.bytes_received += length
+        self.handle_time.add(seconds)
+
+    def on_send(self, packet_type, length):
+        self.sent[packet_type] = self.sent.get(packet_type, 0) + 1
+        self.bytes_sent += length
+
+    def named(self, counts):
+        return {self.names.get(k, str(k)): v for k, v in counts.items()}
+
+    def on_rtt(self, sample):
+        self.rtt.add(sample)
+        if self.srtt is None:
+            self.srtt, self.rttvar = sample, sample / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sample)
+            self.srtt = 0.875 * self.srtt + 0.125 * sample
+
+    def rto(self, initial=0.2, minimum=0.02, maximum=2.0):
+        """Retransmission timeout in seconds: SRTT + 4 * RTTVAR, `initial` before any sample."""
+        if self.srtt is None:
+            return initial
+        return min(maximum, max(minimum, self.srtt + 4 * self.rttvar))
+
+
+class Metrics:
+    """Per-phase frame timers, periodic reports and JSON-lines export."""
+    REPORT_INTERVAL = 1.0
+
+    def __init__(self, enabled=True, export_path=None):
+        self.enabled = enabled
+        self.phases = {name: RollingHistogram() for name in PHASES}
+        self.frame = RollingHistogram()
+        self.overlay = False
+        self.export = open(export_path, 'a') if export_path else None
+        self.report = None
+        self.last_report = time.perf_counter()
+        self.last_counts = (0, 0)
+
+    def now(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, phase, start):
+        """Record the time since start for phase; returns the new start."""
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.phases[phase].add(now - start)
+        return now
+
+    def end_frame(self, start):
+        if self.enabled:
+            self.frame.add(time.perf_counter() - start)
+
+    def tick(self, network_stats=None):
+        """Take a report every REPORT_INTERVAL; returns True when a new one is ready."""
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        elapsed = now - self.last_report
+        if elapsed < self.REPORT_INTERVAL:
+            return False
+        self.last_report = now
+        self.report = self.snapshot(network_stats, elapsed)
+        if self.export is not None:
+            self.export.write(json.dumps(self.report) + '\n')
+            self.export.flush()
+        return True
+
+    def snapshot(self, network_stats, elapsed):
+        ms = 1000.0
+        report = {
+            'time': time.time(),
+            'frame_ms': self.frame.summary(ms),
+            'frame_hist': dict(zip([f'<{edge}' for edge in FRAME_BUCKETS_MS] + ['>=33'],
+                                   self.frame.buckets(FRAME_BUCKETS_MS, ms))),
+            'phases_ms': {name: hist.summary(ms) for name, hist in self.phases.items()},
+        }
+        if network_stats is not None:
+            received = sum(network_stats.received.values())
+            sent = sum(network_stats.sent.values())
+            last_received, last_sent = self.last_counts
+            self.last_counts = (received, sent)
+            report['network'] = {
+                'rx_pps': (received - last_received) / elapsed,
+                'tx_pps': (sent - last_sent) / elapsed,
+                'received': network_stats.named(network_stats.received),
+                'sent': network_stats.named(network_stats.sent),
+                'handle_us': network_stats.handle_time.summary(1e6),
+                'rtt_ms': network_stats.rtt.summary(ms),
+                'srtt_ms': None if network_stats.srtt is None else network_stats.srtt * ms,
+            }
+        return report
+
+    def overlay_lines(self):
+        """Short text lines for the in-game overlay."""
+        report = self.report
+        if report is None or report['frame_ms'] is None:
+            return ["collecting..."]
+        frame = report['frame_ms']
+        phases = report['phases_ms']
+        lines = [f"frame {frame['mean']:.2f} ms  p99 {frame['p99']:.2f}  max {frame['max']:.1f}",
+                 " ".join(f"{name} {phases[name]['mean']:.2f}" for name in PHASES
+                          if phases[name] is not None),
+                 "hist " + " ".join(f"{k}:{v}" for k, v in report['frame_hist'].items())]
+        network = report.get('network')
+        if network is not None:
+            rtt = network['srtt_ms']
+            lines.append(f"rx {network['rx_pps']:.0f}/s  tx {network['tx_pps']:.0f}/s  "
+                         f"rtt {'-' if rtt is None else f'{rtt:.1f} ms'}")
+        return lines
+
+    def close(self):
+        if self.export is not None:
+            self.export.close()
+            self.export = None
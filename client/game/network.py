@@ -1,10 +1,18 @@
+import select
 import socket
 import struct
 import threading
 import json
 import numpy as np
 import os
+import time
+from collections import deque
 from enum import IntEnum
+from .core import BOARD_WIDTH, BOARD_HEIGHT
+from .codec import PacketCodec, HEADER, HEADER_SIZE
+from .input_stream import InputCommandSender, InputCommandReceiver, INPUT_ACK
+from .metrics import NetworkStats
+from .sync import OpponentSimulator, BOARD_HASH, RESYNC_REQUEST, board_hash
 
 class PacketType(IntEnum):
     CONNECT_REQUEST = 1
@@ -15,6 +23,172 @@ class PacketType(IntEnum):
     MOVE_PIECE = 6
     ROTATE_PIECE = 7
     DROP_PIECE = 8
+    BOARD_ACK = 9
+    INPUT_COMMANDS = 10
+    INPUT_ACK = 11
+    BOARD_HASH = 12       # (마지막 입력 seq, 보드 crc32): 상대가 복원한 보드 검사용
+    RESYNC_REQUEST = 13   # 복원 보드가 다를 때 해당 플레이어에게 키프레임 요청
+    STATS = 14            # 서버 통계 조회 (루프백 주소에만 응답, tools.server_stats)
+    CONTROL_ACK = 15      # 제어 패킷(CONNECT_RESPONSE/GAME_START/DISCONNECT) 수신 확인
+    SUBSCRIBE = 16        # 관전: 방 구독/갱신 (중계기 -> 서버, 관전자 -> 중계기)
+    PLAYER_SCORES = 17    # 관전: 방 플레이어 점수 목록
+
+# BOARD_UPDATE 가변 길이 포맷 (server/src/game_server.hpp의 BoardUpdate와 동일)
+# version(1) + flags(1) + seq(2) + base_seq(2) + input_seq(2) + row_mask(4) + rows(4 * n)
+# input_seq: 이 보드에 반영된 마지막 입력 명령 seq의 하위 16비트 (0 = 알 수 없음)
+BOARD_FORMAT_VERSION = 1
+BOARD_FLAG_KEYFRAME = 0x01
+BOARD_UPDATE_HEADER = struct.Struct('=BBHHHI')
+# GAME_START 페이로드: room_id, player_count, 같은 방 플레이어 ID (최대 3명), 블록 순서 seed
+ROOM_CAPACITY = 3
+GAME_START = struct.Struct('=II%dI' % ROOM_CAPACITY)
+GAME_START_SEED = struct.Struct('=I')
+# 제어 채널: 수신자가 CONTROL_ACK(seq)로 확인할 때까지 송신자가 지수 백오프로 재전송
+# CONNECT_REQUEST: seq, reserved, 세션 토큰 (0 = 새 세션)
+# CONNECT_RESPONSE: 응답한 요청 seq, 제어 seq, 세션 토큰, flags, reserved
+CONNECT_REQUEST = struct.Struct('=IIQ')
+CONNECT_RESPONSE = struct.Struct('=IIQII')
+CONNECT_FLAG_RECONNECTED = 0x01
+CONTROL_SEQ = struct.Struct('=I')  # GAME_START(seed 뒤), DISCONNECT, CONTROL_ACK
+# 관전 스트림 (tools.spectator_relay, game.spectator): SUBSCRIBE는 (room_id, flags),
+# PLAYER_SCORES는 count 뒤에 플레이어별 (player_id, score, lines, flags)
+SUBSCRIBE = struct.Struct('=II')
+SUBSCRIBE_FLAG_KEYFRAMES = 0x01  # 스냅샷(GAME_START, 점수, 키프레임)을 다시 요청
+PLAYER_SCORES_HEADER = struct.Struct('=I')
+PLAYER_SCORE = struct.Struct('=IIII')
+PLAYER_FLAG_GAME_OVER = 0x01
+_CELL_SHIFTS = np.arange(BOARD_WIDTH, dtype=np.uint32) * 3
+_ROW_BITS = np.uint32(1) << np.arange(BOARD_HEIGHT, dtype=np.uint32)
+
+
+def pack_board_rows(board):
+    """Pack a (20, 10) board into 20 uint32 rows, 3 bits per cell."""
+    cells = np.asarray(board).astype(np.uint32) & 7
+    return (cells << _CELL_SHIFTS).sum(axis=1, dtype=np.uint32)
+
+
+def unpack_board_rows(rows):
+    return ((rows[:, None] >> _CELL_SHIFTS) & 7).astype(np.int32)
+
+
+def _seq_newer(a, b):
+    return 0 < ((a - b) & 0xFFFF) < 0x8000
+
+
+class BoardEncoder:
+    """Encodes board snapshots as keyframes or XOR deltas against the last acked one."""
+    KEYFRAME_INTERVAL = 60
+    HISTORY = 32
+
+    def __init__(self):
+        self.seq = 0
+        self.acked_seq = None
+        self.history = [None] * self.HISTORY
+        self.last_rows = None
+        self.since_keyframe = 0
+        self.keyframe_requested = False
+
+    def force_keyframe(self):
+        """Make the next encode a keyframe even if nothing changed."""
+        self.keyframe_requested = True
+
+    def ack(self, seq):
+        if self.acked_seq is None or _seq_newer(seq, self.acked_seq):
+            self.acked_seq = seq
+
+    def _base(self, acked):
+        if acked is None:
+            return None
+        entry = self.history[acked % self.HISTORY]
+        if entry is None or entry[0] != acked:
+            return None
+        return entry[1]
+
+    def encode(self, board):
+        """Return the BOARD_UPDATE payload, or None when there is nothing new to send."""
+        buffer = bytearray(BOARD_UPDATE_HEADER.size + 4 * BOARD_HEIGHT)
+        length = self.encode_into(board, buffer, 0)
+        return bytes(buffer[:length]) if length else None
+
+    def encode_into(self, board, buffer, offset, input_seq=0):
+        """Write the payload into buffer at offset; returns its length (0 = nothing to send)."""
+        rows = pack_board_rows(board)
+        acked = self.acked_seq  # 수신 스레드가 갱신하므로 한 번만 읽음
+        self.since_keyframe += 1
+        keyframe_due = self.since_keyframe >= self.KEYFRAME_INTERVAL or self.keyframe_requested
+        self.keyframe_requested = False
+        unchanged = self.last_rows is not None and np.array_equal(rows, self.last_rows)
+        if unchanged and not keyframe_due and acked == self.seq:
+            return 0
+
+        base = None if keyframe_due else self._base(acked)
+        self.seq = (self.seq + 1) & 0xFFFF
+        if base is None:
+            flags, base_seq, values = BOARD_FLAG_KEYFRAME, self.seq, rows
+            self.since_keyframe = 0
+        else:
+            flags, base_seq, values = 0, acked, rows ^ base
+
+        changed = np.flatnonzero(values)
+        row_mask = int(_ROW_BITS[changed].sum())
+        BOARD_UPDATE_HEADER.pack_into(buffer, offset, BOARD_FORMAT_VERSION, flags,
+                                      self.seq, base_seq, input_seq & 0xFFFF, row_mask)
+        offset += BOARD_UPDATE_HEADER.size
+        np.frombuffer(buffer, dtype=np.uint32, count=len(changed), offset=offset)[:] = values[changed]
+        self.history[self.seq % self.HISTORY] = (self.seq, rows)
+        self.last_rows = rows
+        return BOARD_UPDATE_HEADER.size + 4 * len(changed)
+
+
+class BoardDecoder:
+    """Rebuilds one opponent's board from keyframes and deltas."""
+    HISTORY = 32
+
+    def __init__(self):
+        self.history = [None] * self.HISTORY
+        self.latest_seq = None
+
+    def decode(self, payload):
+        """Return the new board array, or None if the update is stale or cannot be applied."""
+        return self.board() if self.apply(payload) else None
+
+    def board(self):
+        """Unpack the latest snapshot into a new (20, 10) int32 array."""
+        return unpack_board_rows(self.history[self.latest_seq % self.HISTORY][1])
+
+    def apply(self, payload):
+        """Record an update in the snapshot history; True if it is now the latest one.
+
+        Cheap compared to board(), so a burst can be applied packet by packet
+        (later deltas may use any of them as base) and unpacked once.
+        """
+        if len(payload) < BOARD_UPDATE_HEADER.size:
+            return False
+        version, flags, seq, base_seq, _, row_mask = BOARD_UPDATE_HEADER.unpack_from(payload)
+        if version != BOARD_FORMAT_VERSION or row_mask >> BOARD_HEIGHT:
+            return False
+        count = bin(row_mask).count('1')
+        if len(payload) != BOARD_UPDATE_HEADER.size + count * 4:
+            return False
+        values = np.frombuffer(payload, dtype=np.uint32, count=count,
+                               offset=BOARD_UPDATE_HEADER.size)
+        changed = np.flatnonzero(row_mask & _ROW_BITS)
+
+        if flags & BOARD_FLAG_KEYFRAME:
+            rows = np.zeros(BOARD_HEIGHT, dtype=np.uint32)
+        else:
+            entry = self.history[base_seq % self.HISTORY]
+            if entry is None or entry[0] != base_seq:
+                return False  # 기준 스냅샷 유실: 다음 키프레임까지 대기
+            rows = entry[1].copy()
+        rows[changed] ^= values
+
+        self.history[seq % self.HISTORY] = (seq, rows)
+        if self.latest_seq is not None and not _seq_newer(seq, self.latest_seq):
+            return False
+        self.latest_seq = seq
+        return True
+
 
 class Packet:
     HEADER_SIZE = 8  # type(4) + player_id(4)
@@ -26,7 +200,7 @@ class Packet:
         self.type = 0
         self.player_id = 0
         self.move_data = {'piece_type': 0, 'x': 0, 'y': 0, 'rotation': 0}
-        self.board_data = bytearray(self.BOARD_DATA_SIZE)
+        self.board_data = b''  # 인코딩된 BOARD_UPDATE/BOARD_ACK 페이로드 (가변 길이)
 
     def pack(self):
         buffer = bytearray(self.TOTAL_SIZE)
@@ -41,12 +215,17 @@ class Packet:
                            self.move_data['x'],
                            self.move_data['y'],
                            self.move_data['rotation'])
-        elif self.type == PacketType.BOARD_UPDATE:
-            buffer[self.HEADER_SIZE:self.HEADER_SIZE + len(self.board_data)] = self.board_data
+        elif self.type in [PacketType.BOARD_UPDATE, PacketType.BOARD_ACK]:
+            # 가변 길이: 실제 페이로드 크기만큼만 전송
+            end = self.HEADER_SIZE + len(self.board_data)
+            buffer[self.HEADER_SIZE:end] = self.board_data
+            return buffer[:end]
             
         return buffer
 
-    def unpack(self, buffer):
+    def unpack(self, buffer, length=None):
+        if length is None:
+            length = len(buffer)
         # 헤더 언패킹
         self.type, self.player_id = struct.unpack('=II', buffer[:self.HEADER_SIZE])
         
@@ -59,26 +238,65 @@ class Packet:
                 'y': move_data[2],
                 'rotation': move_data[3]
             }
-        elif self.type == PacketType.BOARD_UPDATE:
-            self.board_data = buffer[self.HEADER_SIZE:self.HEADER_SIZE + self.BOARD_DATA_SIZE]
+        elif self.type in [PacketType.BOARD_UPDATE, PacketType.BOARD_ACK]:
+            self.board_data = bytes(buffer[self.HEADER_SIZE:length])
 
 class NetworkManager:
-    def __init__(self, client_id='client1'):
+    INPUT_RESEND_INTERVAL = 0.05  # 입력이 멈췄을 때 ACK 안 된 명령을 다시 보내는 간격 (초)
+    HASH_INTERVAL = 1.0           # seed 모드에서 BOARD_HASH를 보내는 간격 (초)
+    RESYNC_RETRY = 0.5            # 같은 상대에게 키프레임을 다시 요청하기까지 최소 간격 (초)
+    CONNECT_TIMEOUT = 5.0         # CONNECT_REQUEST 재전송을 포기하기까지 (초)
+    DISCONNECT_WAIT = 0.5         # DISCONNECT의 CONTROL_ACK를 기다리는 최대 시간 (초)
+    RECONNECT_AFTER = 2.0         # 입력이 ACK 없이 이만큼 밀리면 새 소켓으로 토큰 재접속 (초)
+    RECV_TIMEOUT = 0.25           # 수신 스레드가 소켓 교체/종료를 확인하는 간격 (초)
+    CONTROL_MAX_RTO = 2.0         # 제어 패킷 재전송 간격 상한 (초)
+
+    def __init__(self, client_id='client1', threaded=True, client_port=None):
         self.client_id = client_id
+        # threaded=False: 수신 스레드 없이 논블로킹 소켓을 프레임마다 poll()로 비움
+        self.threaded = threaded
         self.config = self._load_config()
         self.host = self.config[client_id]['host']
         self.port = self.config[client_id]['port']
-        self.client_port = self.config[client_id]['client_port']
+        # client_port=0이면 OS가 임시 포트를 할당 (봇/부하 테스트용)
+        self.client_port = self.config[client_id]['client_port'] if client_port is None else client_port
         
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.bind(('0.0.0.0', self.client_port))  # 클라이언트별 고유 포트 바인딩
+        self.socket = self._open_socket(self.client_port)  # 클라이언트별 고유 포트 바인딩
+        self.codec = PacketCodec()  # 소켓별 재사용 송수신 버퍼
         
-        self.connected = False
-        self.opponent_boards = [None, None]
+        self.running = False     # 소켓을 열고 수신 중 (수신 스레드/poll 동작 조건)
+        self.connected = False   # CONNECT_RESPONSE까지 받은 상태
+        self.token = 0           # 서버가 준 세션 토큰: 재접속 시 같은 자리로 복귀
+        self.connect_seq = 0
+        self.pending_connect = None  # [seq, 첫 전송 시각, 다음 전송 시각, RTO, 전송 횟수]
+        self.connect_deadline = 0.0
+        self.control_seq = 0     # 클라이언트가 보내는 제어 패킷(DISCONNECT) 시퀀스
+        self.awaited_ack = None
+        self.control_event = threading.Event()  # 연결 완료/기다리던 CONTROL_ACK 도착
+        self.last_receive = 0.0
+        self.opponent_boards = (None, None)  # 통째로 교체되는 불변 스냅샷
         self.player_id = None
+        self.room_id = None
+        self.opponent_ids = None  # GAME_START의 같은 방 상대 ID 목록 (화면 순서)
         self.receive_thread = None
         self.game_started = False
         self.server_disconnected = False
+        self.board_encoder = BoardEncoder()
+        self.board_decoders = {}
+        self.input_sender = InputCommandSender()
+        self.input_receiver = InputCommandReceiver()
+        self.opponent_inputs = deque(maxlen=1024)  # (player_id, seq, type, piece_type, x, y, rotation)
+        self.last_input_send = 0.0
+        # GAME_START에 seed가 있으면 상대 보드를 입력 재생으로 복원 (없으면 BOARD_UPDATE 중계 방식)
+        self.seed = None
+        self.opponent_sims = {}
+        self.resync_requested = False
+        self.resync_sent = {}
+        self.last_hash_send = 0.0
+        self.recorder = None  # ReplayRecorder: 받은 datagram을 그대로 기록
+        self.on_update = None  # 수신 스레드에서 상대 보드/게임 시작/종료가 바뀌면 호출 (게임 루프 깨우기)
+        self.stats = NetworkStats({int(t): t.name for t in PacketType})
+        self.rtt_probe = None  # (input seq, 전송 시각): 해당 seq 이상의 INPUT_ACK로 RTT 측정
 
     def _load_config(self):
         """Method to load configuration file"""
@@ -94,120 +312,469 @@ class NetworkManager:
                 "client3": {"host": "127.0.0.1", "port": 12345, "client_port": 50003}
             }
 
+    def _open_socket(self, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(('0.0.0.0', port))
+        if self.threaded:
+            sock.settimeout(self.RECV_TIMEOUT)
+        else:
+            sock.setblocking(False)
+        return sock
+
     def connect(self):
-        try:
-            # Set socket timeout (5 seconds)
-            self.socket.settimeout(5.0)
-            
-            # Send connection request packet
-            packet = Packet()
-            packet.type = PacketType.CONNECT_REQUEST
-            
-            self.socket.sendto(packet.pack(), (self.host, self.port))
-            
-            # Wait for response
-            buffer = bytearray(Packet.TOTAL_SIZE)
-            self.socket.recv_into(buffer)
-            
-            # Remove timeout after successful connection (for receive loop)
-            self.socket.settimeout(None)
-            
-            response = Packet()
-            response.unpack(buffer)
-            
-            if response.type == PacketType.CONNECT_RESPONSE:
-                self.player_id = response.player_id
-                self.connected = True
-                
-                # Start receive thread
-                self.receive_thread = threading.Thread(target=self._receive_loop)
-                self.receive_thread.daemon = True
-                self.receive_thread.start()
-                
-                return True
-                
-        except socket.timeout:
+        """Blocking handshake (bots/tools); the menu uses start_connect()/poll_connect()."""
+        self.start_connect()
+        while True:
+            result = self.poll_connect()
+            if result is not None:
+                return result
+            self._wait_control(self.connect_wait())
+
+    def start_connect(self):
+        """Send CONNECT_REQUEST and return at once; poll_connect() retransmits and reports."""
+        self.connected = False
+        self.control_event.clear()
+        self._start_receiving()
+        self._send_connect_request(time.monotonic())
+        self.connect_deadline = time.monotonic() + self.CONNECT_TIMEOUT
+
+    def poll_connect(self):
+        """True once connected, False after CONNECT_TIMEOUT, None while still waiting."""
+        self.poll()
+        if self.connected:
+            return True
+        now = time.monotonic()
+        if now >= self.connect_deadline:
             print("Connection attempt timed out")
+            self.pending_connect = None
             return False
-        except Exception as e:
+        self._retransmit_connect(now)
+        return None
+
+    def connect_wait(self):
+        """Seconds until poll_connect() has something to do (next retransmission or timeout)."""
+        pending = self.pending_connect
+        if self.connected or pending is None:
+            return 0.0
+        return max(0.0, min(pending[2], self.connect_deadline) - time.monotonic())
+
+    def _start_receiving(self):
+        if self.running:
+            return
+        self.running = True
+        self.last_receive = time.monotonic()
+        if self.threaded:
+            self.receive_thread = threading.Thread(target=self._receive_loop)
+            self.receive_thread.daemon = True
+            self.receive_thread.start()
+
+    def _send_connect_request(self, now):
+        self.connect_seq += 1
+        rto = self.stats.rto()
+        self.pending_connect = [self.connect_seq, now, now + rto, rto, 1]
+        self._send_connect(self.connect_seq)
+
+    def _send_connect(self, seq):
+        data = HEADER.pack(PacketType.CONNECT_REQUEST, self.player_id or 0) + \
+            CONNECT_REQUEST.pack(seq, 0, self.token)
+        try:
+            self._send(PacketType.CONNECT_REQUEST, data)
+        except OSError as e:
             print(f"Connection failed: {e}")
-            return False
+
+    def _retransmit_connect(self, now):
+        pending = self.pending_connect
+        if pending is None or now < pending[2]:
+            return
+        # 지수 백오프: 재전송한 요청의 응답은 RTT 표본으로 쓰지 않음 (Karn)
+        pending[3] = min(pending[3] * 2, self.CONTROL_MAX_RTO)
+        pending[2] = now + pending[3]
+        pending[4] += 1
+        self._send_connect(pending[0])
+
+    def reconnect(self):
+        """Rejoin the same room slot with the session token from a fresh socket.
+
+        Used when the server stops answering (e.g. the local address changed);
+        the old socket is replaced and the receive thread picks up the new one.
+        """
+        if not self.token or self.pending_connect is not None:
+            return
+        print("Connection lost, reconnecting...")
+        old = self.socket
+        self.socket = self._open_socket(0)
+        self._shutdown(old)
+        self.last_receive = time.monotonic()
+        self._send_connect_request(time.monotonic())
+        self.connect_deadline = time.monotonic() + self.CONNECT_TIMEOUT
+
+    def _wait_control(self, timeout):
+        """Block until a control event arrives or timeout seconds pass."""
+        if self.threaded:
+            self.control_event.wait(timeout)
+            self.control_event.clear()
+        elif self.socket is not None:
+            select.select([self.socket], [], [], timeout)
+
+    def _send_control_ack(self, seq):
+        # 수신 스레드에서 호출되므로 공유 송신 버퍼 대신 새 바이트열 사용
+        self._send(PacketType.CONTROL_ACK,
+                   HEADER.pack(PacketType.CONTROL_ACK, self.player_id or 0) + CONTROL_SEQ.pack(seq))
 
     def disconnect(self):
+        """Send DISCONNECT and wait briefly (RTO-paced retransmits) for its CONTROL_ACK."""
+        if not self.running:
+            return
         if self.connected:
-            packet = Packet()
-            packet.type = PacketType.DISCONNECT
-            packet.player_id = self.player_id
-            
-            self.socket.sendto(packet.pack(), (self.host, self.port))
-            self.connected = False
-            self.socket.close()
+            self.control_seq += 1
+            seq = self.control_seq
+            data = HEADER.pack(PacketType.DISCONNECT, self.player_id) + CONTROL_SEQ.pack(seq)
+            self.awaited_ack = seq
+            self.control_event.clear()
+            deadline = time.monotonic() + self.DISCONNECT_WAIT
+            rto = self.stats.rto()
+            try:
+                while True:
+                    self._send(PacketType.DISCONNECT, data)
+                    wait = min(rto, deadline - time.monotonic())
+                    if wait <= 0:
+                        break
+                    self._wait_control(wait)
+                    self.poll()
+                    if self.awaited_ack is None:
+                        break
+                    rto = min(rto * 2, self.CONTROL_MAX_RTO)
+            except OSError:
+                pass
+            self.awaited_ack = None
+        self._close()
+
+    def _close(self):
+        self.connected = False
+        self.running = False
+        self.pending_connect = None
+        if self.socket is not None:
+            self._shutdown(self.socket)
+            self.socket = None
+
+    @staticmethod
+    def _shutdown(sock):
+        # close()만으로는 다른 스레드의 recv가 깨어나지 않으므로 빈 datagram을 자기 자신에게 보냄
+        try:
+            sock.sendto(b'', ('127.0.0.1', sock.getsockname()[1]))
+        except OSError:
+            pass
+        sock.close()
 
     def send_move(self, piece_type, x, y, move_type=PacketType.MOVE_PIECE, rotation=0):
+        """Queue a command on the input stream and send it with the unacked ones before it."""
         if not self.connected:
             return
-            
-        packet = Packet()
-        packet.type = move_type
-        packet.player_id = self.player_id
-        packet.move_data = {
-            'piece_type': piece_type,
-            'x': x,
-            'y': y,
-            'rotation': rotation
-        }
-        
-        self.socket.sendto(packet.pack(), (self.host, self.port))
+
+        seq = self.input_sender.push(move_type, piece_type, x, y, rotation)
+        if self.rtt_probe is None:
+            self.rtt_probe = (seq, time.perf_counter())
+        self._send_inputs()
+
+    def flush_inputs(self):
+        """Resend unacknowledged commands if nothing was sent recently; call once per frame.
+
+        Also drives the token reconnect when the server has gone quiet.
+        """
+        if not self.connected:
+            return
+        now = time.monotonic()
+        if self.pending_connect is not None:
+            self._retransmit_connect(now)
+        if now - self.last_input_send >= self.INPUT_RESEND_INTERVAL and self.input_sender.has_pending():
+            self.rtt_probe = None  # 재전송이 섞인 ACK는 RTT 표본으로 쓰지 않음 (Karn)
+            self._send_inputs()
+            if now - self.last_receive > self.RECONNECT_AFTER:
+                self.reconnect()
+
+    def _send_inputs(self):
+        length = self.input_sender.encode_into(self.codec.send_buffer, HEADER_SIZE)
+        if not length:
+            return
+        data = self.codec.finish(PacketType.INPUT_COMMANDS, self.player_id, length)
+        self._send(PacketType.INPUT_COMMANDS, data)
+        self.last_input_send = time.monotonic()
+
+    def _send(self, packet_type, data):
+        sock = self.socket
+        if sock is None:
+            return
+        sock.sendto(data, (self.host, self.port))
+        self.stats.on_send(packet_type, len(data))
 
     def send_board_state(self, board):
+        """Send the board as a keyframe or delta; cheap enough to call every frame.
+
+        With a shared seed the board is only sent when an opponent asked for a
+        resync; otherwise a BOARD_HASH goes out every HASH_INTERVAL seconds.
+        """
         if not self.connected:
             return
-            
-        packet = Packet()
-        packet.type = PacketType.BOARD_UPDATE
-        packet.player_id = self.player_id
-        
-        # NumPy 배열을 바이트로 변환
-        board_bytes = board.tobytes()
-        packet.board_data[:len(board_bytes)] = board_bytes
-        
-        self.socket.sendto(packet.pack(), (self.host, self.port))
+
+        if self.seed is not None:
+            if self.resync_requested:
+                self.resync_requested = False
+                self.board_encoder.force_keyframe()
+            else:
+                now = time.monotonic()
+                if now - self.last_hash_send >= self.HASH_INTERVAL:
+                    self.last_hash_send = now
+                    BOARD_HASH.pack_into(self.codec.send_buffer, HEADER_SIZE,
+                                         self.input_sender.seq, board_hash(board))
+                    data = self.codec.finish(PacketType.BOARD_HASH, self.player_id, BOARD_HASH.size)
+                    self._send(PacketType.BOARD_HASH, data)
+                return
+
+        length = self.board_encoder.encode_into(board, self.codec.send_buffer, HEADER_SIZE,
+                                                self.input_sender.seq)
+        if not length:
+            return
+
+        data = self.codec.finish(PacketType.BOARD_UPDATE, self.player_id, length)
+        self._send(PacketType.BOARD_UPDATE, data)
+
+    def _request_resync(self, player_id):
+        if not self.connected:
+            return
+        now = time.monotonic()
+        if now - self.resync_sent.get(player_id, 0.0) < self.RESYNC_RETRY:
+            return
+        self.resync_sent[player_id] = now
+        # 수신 스레드에서 호출되므로 공유 송신 버퍼 대신 새 바이트열 사용
+        data = HEADER.pack(PacketType.RESYNC_REQUEST, self.player_id) + RESYNC_REQUEST.pack(player_id)
+        self._send(PacketType.RESYNC_REQUEST, data)
+
+    def _opponent_index(self, player_id):
+        if self.opponent_ids is not None:
+            try:
+                idx = self.opponent_ids.index(player_id)
+            except ValueError:
+                return None
+            return idx if idx < len(self.opponent_boards) else None
+        # 구 서버 (단일 방, ID 1~3)
+        if player_id < self.player_id:
+            idx = player_id - 1
+        else:
+            idx = player_id - 2
+        return idx if 0 <= idx < len(self.opponent_boards) else None
+
+    def _handle_packet(self, packet, updated):
+        """Process one received packet; returns False once the server has gone away.
+
+        Opponent BOARD_UPDATEs are only applied to their decoder here and the
+        player id is added to `updated`; boards are published by _publish_boards.
+        """
+        if packet.type == PacketType.CONNECT_RESPONSE:
+            self._handle_connect_response(packet)
+
+        elif packet.type == PacketType.CONTROL_ACK:
+            if packet.length >= HEADER_SIZE + CONTROL_SEQ.size:
+                if CONTROL_SEQ.unpack_from(packet.buffer, HEADER_SIZE)[0] == self.awaited_ack:
+                    self.awaited_ack = None
+                    self.control_event.set()
+
+        elif packet.type == PacketType.BOARD_UPDATE:
+            if packet.player_id != self.player_id:
+                # Update opponent's board state (수신 버퍼에서 바로 디코딩)
+                decoder = self.board_decoders.get(packet.player_id)
+                if decoder is None:
+                    decoder = self.board_decoders[packet.player_id] = BoardDecoder()
+                if decoder.apply(packet.payload()):
+                    sim = self.opponent_sims.get(packet.player_id)
+                    if sim is not None:
+                        # 키프레임으로 재동기화: 그 뒤의 입력은 복원기가 다시 적용
+                        input_seq = BOARD_UPDATE_HEADER.unpack_from(packet.buffer, HEADER_SIZE)[4]
+                        sim.load(decoder.board(), input_seq)
+                    updated.add(packet.player_id)
+
+        elif packet.type == PacketType.BOARD_ACK:
+            if packet.length >= HEADER_SIZE + BOARD_UPDATE_HEADER.size:
+                self.board_encoder.ack(BOARD_UPDATE_HEADER.unpack_from(packet.buffer, HEADER_SIZE)[2])
+
+        elif packet.type == PacketType.INPUT_ACK:
+            if packet.length >= HEADER_SIZE + INPUT_ACK.size:
+                acked = INPUT_ACK.unpack_from(packet.buffer, HEADER_SIZE)[0]
+                self.input_sender.ack(acked)
+                probe = self.rtt_probe
+                if probe is not None and acked >= probe[0]:
+                    self.rtt_probe = None
+                    self.stats.on_rtt(time.perf_counter() - probe[1])
+
+        elif packet.type == PacketType.INPUT_COMMANDS:
+            if packet.player_id != self.player_id:
+                sim = self.opponent_sims.get(packet.player_id)
+                for command in self.input_receiver.accept(packet.player_id, packet.payload()):
+                    self.opponent_inputs.append((packet.player_id,) + command)
+                    if sim is not None and sim.apply(command):
+                        updated.add(packet.player_id)
+                if sim is not None and sim.desynced:
+                    self._request_resync(packet.player_id)
+
+        elif packet.type == PacketType.BOARD_HASH:
+            sim = self.opponent_sims.get(packet.player_id)
+            if sim is not None and packet.length >= HEADER_SIZE + BOARD_HASH.size:
+                seq, value = BOARD_HASH.unpack_from(packet.buffer, HEADER_SIZE)
+                if sim.check_hash(seq, value) is False:
+                    self._request_resync(packet.player_id)
+
+        elif packet.type == PacketType.RESYNC_REQUEST:
+            if packet.length >= HEADER_SIZE + RESYNC_REQUEST.size:
+                if RESYNC_REQUEST.unpack_from(packet.buffer, HEADER_SIZE)[0] == self.player_id:
+                    self.resync_requested = True
+
+        elif packet.type == PacketType.GAME_START:
+            control_offset = HEADER_SIZE + GAME_START.size + GAME_START_SEED.size
+            if packet.length >= control_offset + CONTROL_SEQ.size:
+                self._send_control_ack(CONTROL_SEQ.unpack_from(packet.buffer, control_offset)[0])
+            if self.game_started:
+                return True  # 재전송/재접속으로 다시 온 GAME_START
+            if packet.length >= HEADER_SIZE + GAME_START.size:
+                room_id, count, *player_ids = GAME_START.unpack_from(packet.buffer, HEADER_SIZE)
+                if 0 < count <= ROOM_CAPACITY:
+                    self.room_id = room_id
+                    # 재정렬로 CONNECT_RESPONSE보다 먼저 올 수 있으므로 헤더의 수신자 ID를 우선 사용
+                    own_id = packet.player_id or self.player_id
+                    self.opponent_ids = sorted(pid for pid in player_ids[:count] if pid != own_id)
+                    if packet.length >= HEADER_SIZE + GAME_START.size + GAME_START_SEED.size:
+                        self.seed, = GAME_START_SEED.unpack_from(packet.buffer,
+                                                                 HEADER_SIZE + GAME_START.size)
+                        self.opponent_sims = {pid: OpponentSimulator(self.seed)
+                                              for pid in self.opponent_ids}
+            print("Game started!")
+            self.game_started = True
+
+        elif packet.type == PacketType.DISCONNECT:
+            if packet.length >= HEADER_SIZE + CONTROL_SEQ.size:
+                self._send_control_ack(CONTROL_SEQ.unpack_from(packet.buffer, HEADER_SIZE)[0])
+            print("Server has shut down.")
+            self.server_disconnected = True
+            self._close()
+            return False
+        return True
+
+    def _handle_connect_response(self, packet):
+        if packet.length >= HEADER_SIZE + CONNECT_RESPONSE.size:
+            request_seq, seq, token, flags, _ = CONNECT_RESPONSE.unpack_from(packet.buffer, HEADER_SIZE)
+            self.player_id = packet.player_id
+            self._send_control_ack(seq)  # 중복 응답에도 확인을 보내야 서버 재전송이 멈춤
+        else:
+            request_seq, token, flags = None, 0, 0  # 구 서버: 시퀀스 없는 응답
+        pending = self.pending_connect
+        if pending is None or (request_seq is not None and request_seq != pending[0]):
+            return
+        self.pending_connect = None
+        if pending[4] == 1:
+            self.stats.on_rtt(time.monotonic() - pending[1])
+        self.player_id = packet.player_id
+        self.token = token
+        if flags & CONNECT_FLAG_RECONNECTED:
+            print(f"Reconnected as player {self.player_id}")
+        self.connected = True
+        self.control_event.set()
+
+    def _publish_boards(self, updated):
+        # 새 튜플을 만들어 한 번에 교체: 렌더 쪽은 항상 일관된 스냅샷을 읽음
+        boards = list(self.opponent_boards)
+        for player_id in updated:
+            idx = self._opponent_index(player_id)
+            if idx is None:
+                continue
+            sim = self.opponent_sims.get(player_id)
+            if sim is not None:
+                boards[idx] = sim.core.board.cells.copy()
+            else:
+                boards[idx] = self.board_decoders[player_id].board()
+        self.opponent_boards = tuple(boards)
+        updated.clear()
 
     def _receive_loop(self):
-        buffer = bytearray(Packet.TOTAL_SIZE)
-        
-        while self.connected:
+        updated = set()
+        while self.running:
+            sock = self.socket
             try:
-                self.socket.recv_into(buffer)
-                packet = Packet()
-                packet.unpack(buffer)
-                
-                if packet.type == PacketType.BOARD_UPDATE:
-                    if packet.player_id != self.player_id:
-                        # Update opponent's board state
-                        board_array = np.frombuffer(packet.board_data, dtype=np.int32)
-                        board_array = board_array.reshape((20, 10))  # Tetris board size
-                        
-                        if packet.player_id < self.player_id:
-                            idx = packet.player_id - 1
-                        else:
-                            idx = packet.player_id - 2
-                        self.opponent_boards[idx] = board_array
-                
-                elif packet.type == PacketType.GAME_START:
-                    print("Game started!")
-                    self.game_started = True
-
-                elif packet.type == PacketType.DISCONNECT:
-                    print("Server has shut down.")
-                    self.server_disconnected = True
-                    self.disconnect()
+                if sock is None:
+                    break
+                packet = self.codec.recv(sock)
+                if packet is None:
+                    continue
+                self.last_receive = time.monotonic()
+                if self.recorder is not None:
+                    self.recorder.packet(packet.buffer[:packet.length])
+                started, connected = self.game_started, self.connected
+                start = time.perf_counter()
+                running = self._handle_packet(packet, updated)
+                changed = (bool(updated) or not running or self.game_started != started
+                           or self.connected != connected)
+                if updated:
+                    self._publish_boards(updated)
+                self.stats.on_receive(packet.type, packet.length, time.perf_counter() - start)
+                if changed and self.on_update is not None:
+                    self.on_update()
+                if not running:
                     break
                     
+            except socket.timeout:
+                continue
             except Exception as e:
-                print(f"Receive loop error: {e}")
-                if not self.connected:
+                # 재접속으로 소켓이 바뀌었거나 닫힌 경우는 조용히 다음 소켓으로
+                if not self.running:
                     break
+                if sock is self.socket:
+                    print(f"Receive loop error: {e}")
+
+    def poll(self, max_packets=512):
+        """Drain all pending datagrams (non-threaded mode); call once per frame.
+
+        Only the newest BOARD_UPDATE per player is unpacked and published, so a
+        burst costs one board decode per player. Returns the packet count.
+        """
+        if self.threaded or not self.running:
+            return 0
+
+        updated = set()
+        count = 0
+        while count < max_packets:
+            try:
+                length = self.socket.recv_into(self.codec.recv_buffer)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                print(f"Receive error: {e}")
+                break
+            count += 1
+            self.last_receive = time.monotonic()
+            packet = self.codec.decode(length)
+            if packet is None:
+                continue
+            if self.recorder is not None:
+                self.recorder.packet(self.codec.recv_buffer[:length])
+            start = time.perf_counter()
+            running = self._handle_packet(packet, updated)
+            self.stats.on_receive(packet.type, length, time.perf_counter() - start)
+            if not running:
+                break
+
+        if updated:
+            self._publish_boards(updated)
+        return count
+
+    def feed(self, data):
+        """Handle one datagram that did not come from the socket (replays); returns False on DISCONNECT."""
+        length = len(data)
+        self.codec.recv_buffer[:length] = data
+        packet = self.codec.decode(length)
+        if packet is None:
+            return True
+        updated = set()
+        running = self._handle_packet(packet, updated)
+        if updated:
+            self._publish_boards(updated)
+        return running
 
     def get_opponent_boards(self):
         return self.opponent_boards
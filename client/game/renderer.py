@@ -0,0 +1,130 @@
+import pygame
+import numpy as np
+
+
+class BoardRenderer:
+    """Dirty-rectangle renderer for one board area.
+
+    Locked cells are kept on a cached background surface and each colour has
+    a pre-rendered block sprite, so a frame only re-blits the cells that
+    changed since the previous one (piece moved, cells locked, rows cleared).
+    """
+
+    def __init__(self, x, y, cols, rows, block_width, block_height, colors):
+        self.x = x
+        self.y = y
+        self.cols = cols
+        self.rows = rows
+        self.block_width = block_width
+        self.block_height = block_height
+        self.rect = pygame.Rect(x, y, cols * block_width, rows * block_height)
+
+        # 색상별 블록 스프라이트 (draw_board와 같은 1px 간격 포함)
+        self.sprites = []
+        for color in colors:
+            sprite = pygame.Surface((block_width, block_height))
+            sprite.fill((0, 0, 0))
+            sprite.fill(color, (0, 0, block_width - 1, block_height - 1))
+            self.sprites.append(sprite)
+
+        self.background = pygame.Surface(self.rect.size)
+        self._board = np.zeros((rows, cols), dtype=np.int32)
+        for i in range(rows):
+            for j in range(cols):
+                self._blit_cell(self.background, 0, 0, i, j, self.sprites[0])
+        self._piece = ()
+        self._on_screen = False
+
+    def invalidate(self):
+        """Force the next draw to repaint the whole board area."""
+        self._on_screen = False
+
+    def _blit_cell(self, surface, ox, oy, row, col, sprite):
+        surface.blit(sprite, (ox + col * self.block_width, oy + row * self.block_height))
+
+    def _sync_background(self, board):
+        changed = np.argwhere(board != self._board)
+        if len(changed):
+            self._board[:] = board
+            for row, col in changed.tolist():
+                self._blit_cell(self.background, 0, 0, row, col,
+                                self.sprites[self._board[row, col]])
+        return changed
+
+    def draw(self, surface, board, piece_cells=()):
+        """Draw board + piece and return the screen rects that changed.
+
+        piece_cells is a sequence of (row, col, color) for the falling piece.
+        """
+        piece_cells = tuple(piece_cells)
+        changed = self._sync_background(board)
+
+        if not self._on_screen:
+            surface.blit(self.background, self.rect.topleft)
+            for row, col, color in piece_cells:
+                self._blit_cell(surface, self.x, self.y, row, col, self.sprites[color])
+            self._piece = piece_cells
+            self._on_screen = True
+            return [self.rect.copy()]
+
+        if not len(changed) and piece_cells == self._piece:
+            return []
+
+        dirty = {(row, col) for row, col in changed.tolist()}
+        dirty.update((row, col) for row, col, _ in self._piece)
+        dirty.update((row, col) for row, col, _ in piece_cells)
+
+        bw, bh = self.block_width, self.block_height
+        area = pygame.Rect(0, 0, bw, bh)
+        spans = {}
+        for row, col in dirty:
+            if not (0 <= row < self.rows and 0 <= col < self.cols):
+                continue
+            area.topleft = (col * bw, row * bh)
+            surface.blit(self.background, (self.x + area.x, self.y + area.y), area)
+            lo, hi = spans.get(row, (col, col))
+            spans[row] = (min(lo, col), max(hi, col))
+        for row, col, color in piece_cells:
+            self._blit_cell(surface, self.x, self.y, row, col, self.sprites[color])
+        self._piece = piece_cells
+
+        # 행 단위로 묶어서 display.update에 넘길 사각형 수를 줄임
+        return [pygame.Rect(self.x + lo * bw, self.y + row * bh, (hi - lo + 1) * bw, bh)
+                for row, (lo, hi) in spans.items()]
+
+
+class OpponentRenderer:
+    """Renders an opponent board with a colour lookup table and one scaled blit.
+
+    The board is turned into an RGB array (one pixel per cell) through the
+    COLORS LUT, written with pygame.surfarray and scaled up to the target
+    rect. Work is only done when a different board object arrives.
+    """
+
+    PLACEHOLDER = (128, 128, 128)
+
+    def __init__(self, x, y, width, height, cols, rows, colors):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.lut = np.array(colors, dtype=np.uint8)
+        self.cells = pygame.Surface((cols, rows))
+        self.scaled = pygame.Surface((width, height))
+        self._board = None
+        self._drawn = False
+
+    def draw(self, surface, board, force=False):
+        """Blit the board if it changed (or force); returns the dirty rect or None."""
+        if self._drawn and board is self._board and not force:
+            return None
+        self._board = board
+        self._drawn = True
+
+        if board is None:
+            surface.fill(self.PLACEHOLDER, self.rect)
+            return self.rect.copy()
+
+        # surfarray은 (x, y) 순서이므로 전치해서 LUT 적용
+        rgb = self.lut.take(np.asarray(board).T, axis=0, mode='clip')
+        pygame.surfarray.blit_array(self.cells, rgb)
+        pygame.transform.scale(self.cells, self.rect.size, self.scaled)
+        surface.blit(self.scaled, self.rect.topleft)
+        return self.rect.copy()
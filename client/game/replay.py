@@ -0,0 +1,117 @@
+"""Compact append-only binary replay log.
+
+Layout: a 12-byte file header (magic, version, board size, local player
+id) followed by records of a 7-byte header (type, game time in ms,
+payload length) and the payload. The seed, every handled key press, every
+gravity tick and every received datagram are recorded, so a replay only
+needs the log: pieces come from the SevenBag seed and gravity is applied
+at the recorded ticks instead of from a clock. An END record holds the
+final score, lines and board crc32 so replays can be checked.
+
+ReplayLog memory-maps the file and yields records without copying;
+a truncated last record (e.g. after a crash) ends the iteration.
+"""
+import mmap
+import os
+import random
+import struct
+import threading
+
+from .sync import board_hash
+
+MAGIC = b'TRPL'
+VERSION = 1
+FILE_HEADER = struct.Struct('=4sBBBxI')  # magic, version, width, height, player_id
+RECORD = struct.Struct('=BIH')           # type, time (ms), payload length
+
+SEED = 1
+KEY = 2
+GRAVITY = 3
+PACKET = 4
+END = 5
+
+SEED_PAYLOAD = struct.Struct('=I')
+KEY_PAYLOAD = struct.Struct('=i')
+END_PAYLOAD = struct.Struct('=III')      # score, lines cleared, board crc32
+
+
+class ReplayRecorder:
+    """Appends records to a replay file; safe to call from the network receive thread."""
+
+    def __init__(self, path, clock, width, height, player_id=0):
+        self.clock = clock
+        self.file = open(path, 'wb', buffering=64 * 1024)
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, width, height, player_id or 0))
+        self.lock = threading.Lock()
+        self.records = 0
+
+    def _write(self, record_type, payload=b''):
+        header = RECORD.pack(record_type, self.clock.get_ticks() & 0xFFFFFFFF, len(payload))
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(header)
+            if payload:
+                self.file.write(payload)
+            self.records += 1
+
+    def seed(self, seed):
+        self._write(SEED, SEED_PAYLOAD.pack(seed))
+
+    def key(self, key):
+        self._write(KEY, KEY_PAYLOAD.pack(key))
+
+    def gravity(self):
+        self._write(GRAVITY)
+
+    def packet(self, data):
+        self._write(PACKET, data)
+
+    def close(self, core=None):
+        """Write the END record (when given the final GameCore) and close the file."""
+        if core is not None:
+            self._write(END, END_PAYLOAD.pack(core.score, core.lines_cleared,
+                                              board_hash(core.board.cells)))
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def new_local_seed():
+    """Seed for recorded games that did not get one from GAME_START."""
+    return random.getrandbits(32)
+
+
+class ReplayLog:
+    """Read-only, memory-mapped view of a replay file."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < FILE_HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path}: not a replay log (file too short)")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.player_id = FILE_HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a replay log (version {VERSION})")
+
+    def __iter__(self):
+        """Yield (type, time_ms, payload memoryview) tuples."""
+        # 반복자를 닫으면(예외로 빠져나가도) 매핑에 대한 참조를 바로 놓음
+        with memoryview(self.data) as view:
+            offset = FILE_HEADER.size
+            end = len(self.data)
+            while offset + RECORD.size <= end:
+                record_type, time_ms, length = RECORD.unpack_from(view, offset)
+                offset += RECORD.size
+                if offset + length > end:
+                    break  # 기록 도중 종료된 마지막 레코드
+                yield record_type, time_ms, view[offset:offset + length]
+                offset += length
+
+    def close(self):
+        """Close the mapping; the record iterator and its payload views must have been released."""
+        self.data.close()
+        self._file.close()
@@ -0,0 +1,75 @@
+"""Fixed-timestep game loop scheduling with idle-aware event waiting.
+
+Game logic advances in fixed STEP_MS steps on the game clock, independent
+of how often frames are drawn; a late wake-up runs the missed steps in one
+go. Between steps the loop blocks in pygame.event.wait() until the next
+timer is due, so an idle window costs (almost) no CPU while key presses
+still wake it immediately. The network receive thread wakes the loop with
+a posted WAKE_EVENT when opponent boards or the game state change.
+"""
+import math
+import threading
+
+import pygame
+
+STEP_MS = 1000 / 60
+MAX_CATCH_UP_STEPS = 30  # 오래 멈춘 뒤(창 이동 등)에는 밀린 스텝을 버리고 현재 시각으로 이동
+WAKE_EVENT = pygame.USEREVENT + 1
+
+
+def wait_events(timeout_ms=None):
+    """Return pending events, blocking up to timeout_ms (None = until one arrives)."""
+    events = pygame.event.get()
+    if events or (timeout_ms is not None and timeout_ms < 1):
+        return events
+    # pygame.event.wait(0)은 무한 대기이므로 타임아웃은 최소 1ms
+    event = pygame.event.wait() if timeout_ms is None else pygame.event.wait(max(1, int(timeout_ms)))
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+class FrameScheduler:
+    """Accumulator for fixed logic steps plus a thread-safe wake-up."""
+
+    def __init__(self, clock, step_ms=STEP_MS):
+        self.clock = clock
+        self.step_ms = step_ms
+        self.logic_time = clock.get_ticks()
+        self._wake_lock = threading.Lock()
+        self._wake_pending = False
+
+    def reset(self):
+        self.logic_time = self.clock.get_ticks()
+
+    def steps(self):
+        """Yield the logic time of every fixed step that is due."""
+        now = self.clock.get_ticks()
+        if now - self.logic_time > MAX_CATCH_UP_STEPS * self.step_ms:
+            self.logic_time = now - self.step_ms
+        while self.logic_time + self.step_ms <= now:
+            self.logic_time += self.step_ms
+            yield self.logic_time
+
+    def until(self, due_ms):
+        """Milliseconds from now until the logic step that reaches due_ms."""
+        steps = max(1, math.ceil((due_ms - self.logic_time) / self.step_ms))
+        return max(0.0, self.logic_time + steps * self.step_ms - self.clock.get_ticks())
+
+    def wake(self):
+        """Interrupt wait(); safe to call from other threads, coalesces repeated calls."""
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+    def wait(self, timeout_ms=None):
+        """wait_events() that also clears a pending wake-up."""
+        events = wait_events(timeout_ms)
+        for event in events:
+            if event.type == WAKE_EVENT:
+                with self._wake_lock:
+                    self._wake_pending = False
+                break
+        return events
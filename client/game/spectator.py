@@ -0,0 +1,162 @@
+"""Read-only spectator client for the streams of tools.spectator_relay.
+
+A spectator sends SUBSCRIBE (player_id 0) to the relay to join and again
+every REFRESH_INTERVAL as a keepalive, and DISCONNECT to leave. On joining
+it gets the relay's snapshot: GAME_START with the room's players,
+PLAYER_SCORES and one keyframe BOARD_UPDATE per player. After that the
+relay sends coalesced deltas at its tick rate and PLAYER_SCORES whenever a
+score changes. A delta whose base was lost is answered by asking for the
+snapshot again (SUBSCRIBE_FLAG_KEYFRAMES). DISCONNECT from the relay means
+the match is over; the next GAME_START starts a new one.
+"""
+import socket
+import threading
+import time
+
+from .codec import HEADER, HEADER_SIZE, PacketCodec
+from .network import (PacketType, BoardDecoder, BOARD_UPDATE_HEADER, BOARD_FLAG_KEYFRAME,
+                      GAME_START, ROOM_CAPACITY, SUBSCRIBE, SUBSCRIBE_FLAG_KEYFRAMES,
+                      PLAYER_SCORES_HEADER, PLAYER_SCORE, _seq_newer)
+
+RELAY_PORT = 12348  # tools.spectator_relay의 기본 관전자 포트
+
+
+class SpectatorClient:
+    """Receives one relay stream on a background thread and publishes snapshots."""
+    REFRESH_INTERVAL = 2.0   # 중계기는 10초 동안 갱신이 없는 관전자를 정리
+    KEYFRAME_RETRY = 0.5
+    RECV_TIMEOUT = 0.25
+
+    def __init__(self, host='127.0.0.1', port=RELAY_PORT):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('0.0.0.0', 0))
+        self.socket.settimeout(self.RECV_TIMEOUT)
+        self.codec = PacketCodec()
+        self.running = False
+        self.thread = None
+        self.on_update = None  # 새 스냅샷이 나오면 수신 스레드에서 호출
+        self.last_subscribe = 0.0
+        self.last_keyframe_request = 0.0
+
+        self.room_id = None
+        self.player_ids = ()
+        self.decoders = {}
+        self.boards = {}
+        self.scores = {}  # player_id -> (score, lines, flags)
+        # 화면이 읽는 스냅샷: (room_id, ((player_id, board, (score, lines, flags)), ...))
+        # room_id가 None이면 진행 중인 경기가 없음
+        self.view = (None, ())
+        self.updates = 0
+
+    def start(self):
+        self.running = True
+        self.subscribe()
+        self.thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.thread.start()
+
+    def subscribe(self, keyframes=False):
+        self.last_subscribe = time.monotonic()
+        flags = SUBSCRIBE_FLAG_KEYFRAMES if keyframes else 0
+        self._send(HEADER.pack(PacketType.SUBSCRIBE, 0) + SUBSCRIBE.pack(0, flags))
+
+    def refresh(self):
+        """Send the keepalive when due; returns seconds until the next one."""
+        wait = self.last_subscribe + self.REFRESH_INTERVAL - time.monotonic()
+        if wait <= 0:
+            self.subscribe()
+            wait = self.REFRESH_INTERVAL
+        return wait
+
+    def close(self):
+        if not self.running:
+            return
+        self.running = False
+        self._send(HEADER.pack(PacketType.DISCONNECT, 0))
+        # 수신 스레드는 다음 recv 타임아웃에 running을 보고 끝남 (데몬 스레드라 기다리지 않음)
+        self.socket.close()
+
+    def _send(self, data):
+        try:
+            self.socket.sendto(data, self.address)
+        except OSError as e:
+            print(f"Spectator send error: {e}")
+
+    def _request_keyframes(self):
+        now = time.monotonic()
+        if now - self.last_keyframe_request >= self.KEYFRAME_RETRY:
+            self.last_keyframe_request = now
+            self.subscribe(keyframes=True)
+
+    def _reset(self, room_id, player_ids):
+        self.room_id = room_id
+        self.player_ids = tuple(player_ids)
+        self.decoders = {pid: BoardDecoder() for pid in player_ids}
+        self.boards = {}
+        self.scores = {}
+
+    def _handle_packet(self, packet):
+        """Process one relay packet; returns True if the published view changed."""
+        if packet.type == PacketType.BOARD_UPDATE:
+            decoder = self.decoders.get(packet.player_id)
+            if decoder is None or packet.length < HEADER_SIZE + BOARD_UPDATE_HEADER.size:
+                return False
+            _, flags, seq, _, _, _ = BOARD_UPDATE_HEADER.unpack_from(packet.buffer, HEADER_SIZE)
+            if decoder.apply(packet.payload()):
+                self.boards[packet.player_id] = decoder.board()
+                return True
+            if not flags & BOARD_FLAG_KEYFRAME and (decoder.latest_seq is None
+                                                    or _seq_newer(seq, decoder.latest_seq)):
+                self._request_keyframes()  # 기준 스냅샷 유실
+            return False
+
+        elif packet.type == PacketType.PLAYER_SCORES:
+            if packet.length < HEADER_SIZE + PLAYER_SCORES_HEADER.size:
+                return False
+            count, = PLAYER_SCORES_HEADER.unpack_from(packet.buffer, HEADER_SIZE)
+            offset = HEADER_SIZE + PLAYER_SCORES_HEADER.size
+            if count > ROOM_CAPACITY or packet.length < offset + count * PLAYER_SCORE.size:
+                return False
+            for i in range(count):
+                player_id, *entry = PLAYER_SCORE.unpack_from(packet.buffer, offset + i * PLAYER_SCORE.size)
+                self.scores[player_id] = tuple(entry)
+            return True
+
+        elif packet.type == PacketType.GAME_START:
+            if packet.length < HEADER_SIZE + GAME_START.size:
+                return False
+            room_id, count, *player_ids = GAME_START.unpack_from(packet.buffer, HEADER_SIZE)
+            if not 0 < count <= ROOM_CAPACITY or room_id == self.room_id:
+                return False
+            print(f"Spectating room {room_id}")
+            self._reset(room_id, sorted(player_ids[:count]))
+            return True
+
+        elif packet.type == PacketType.DISCONNECT:
+            if self.room_id is not None:
+                print(f"Room {self.room_id} is over")
+            self._reset(None, ())
+            return True
+        return False
+
+    def _publish(self):
+        # 새 튜플로 한 번에 교체: 화면 쪽은 항상 일관된 스냅샷을 읽음
+        players = tuple((pid, self.boards.get(pid), self.scores.get(pid))
+                        for pid in self.player_ids)
+        self.view = (self.room_id, players)
+        self.updates += 1
+        if self.on_update is not None:
+            self.on_update()
+
+    def _receive_loop(self):
+        while self.running:
+            try:
+                packet = self.codec.recv(self.socket)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self.running:
+                    print(f"Spectator receive error: {e}")
+                continue
+            if packet is not None and self._handle_packet(packet):
+                self._publish()
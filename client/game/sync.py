@@ -0,0 +1,119 @@
+"""Opponent board reconstruction from the shared seed and input stream.
+
+Every client in a room gets the same GAME_START seed and draws pieces from
+a SevenBag built on it. Opponent boards are rebuilt by replaying their
+forwarded INPUT_COMMANDS (every lock is a DROP_PIECE) through a headless
+GameCore instead of decoding full boards every frame. Senders periodically
+publish a BOARD_HASH of (last input seq, crc32 of the board); a receiver
+that finds a different board at that seq asks for a keyframe with
+RESYNC_REQUEST. The keyframe's input_seq field says which commands it
+already contains, so newer ones are replayed on top of it.
+"""
+import struct
+import zlib
+from collections import deque
+
+import numpy as np
+
+from .core import BOARD_WIDTH, BOARD_HEIGHT, GameCore, SevenBag
+
+BOARD_HASH = struct.Struct('=II')     # input seq, crc32
+RESYNC_REQUEST = struct.Struct('=I')  # 키프레임을 다시 보내야 할 플레이어 ID
+
+DROP_PIECE = 8  # PacketType.DROP_PIECE (network.py가 이 모듈을 import하므로 값만 사용)
+
+
+def board_hash(cells):
+    """crc32 of an int32 (height, width) colour grid."""
+    return zlib.crc32(np.ascontiguousarray(cells, dtype=np.int32)) & 0xFFFFFFFF
+
+
+def _seq16_newer(a, b):
+    return 0 < ((a - b) & 0xFFFF) < 0x8000
+
+
+class OpponentSimulator:
+    """Rebuilds one opponent's board by replaying their input commands."""
+    RECENT = 256
+
+    def __init__(self, seed, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.core = GameCore(width, height, randomizer=SevenBag(seed))
+        self.last_seq = 0
+        self.last_drop_seq = 0
+        self.recent = deque(maxlen=self.RECENT)  # 키프레임 이후 다시 적용할 명령
+        self.pending_hashes = {}
+        self.skip_through = None
+        self.mismatches = 0
+        self.checks = 0
+
+    def apply(self, command):
+        """Apply one (seq, type, piece_type, x, y, rotation) command; True if the board changed."""
+        seq = command[0]
+        if self.pending_hashes:
+            # 서버가 거부해 전달되지 않은 seq의 해시: 그 사이 명령이 없으므로 지금 보드와 비교
+            for older in [s for s in self.pending_hashes if s < seq]:
+                self._compare(self.pending_hashes.pop(older))
+        self.recent.append(command)
+        self.last_seq = seq
+        if self.skip_through is not None:
+            # 키프레임에 이미 반영된 명령은 건너뜀
+            if not _seq16_newer(seq & 0xFFFF, self.skip_through):
+                return False
+            self.skip_through = None
+        changed = self._replay(command)
+        expected = self.pending_hashes.pop(seq, None)
+        if expected is not None:
+            self._compare(expected)
+        return changed
+
+    def _replay(self, command):
+        seq, move_type, kind, x, y, rotation = command
+        core = self.core
+        table = core.table
+        if not (0 <= kind < len(table.rotations) and 0 <= rotation < 4):
+            return False
+        piece = table.rotations[kind][rotation]
+        core.piece, core.x, core.y = piece, x, y
+        if move_type != DROP_PIECE:
+            return False
+        if not core.fits(piece, x, y):
+            self.mismatches += 1  # 복원 보드가 이미 다름: 다음 해시 검사에서 재동기화
+            return False
+        core.lock()
+        self.last_drop_seq = seq
+        return True
+
+    def check_hash(self, seq, value):
+        """Compare a BOARD_HASH; returns True (match), False (mismatch) or None (checked later)."""
+        if seq > self.last_seq:
+            self.pending_hashes[seq] = value
+            if len(self.pending_hashes) > self.RECENT:
+                self.pending_hashes.pop(min(self.pending_hashes))
+            return None
+        if self.last_drop_seq > seq:
+            return None  # 그 뒤로 보드가 또 바뀜: 다음 해시로 검사
+        return self._compare(value)
+
+    def _compare(self, value):
+        self.checks += 1
+        if board_hash(self.core.board.cells) == value:
+            return True
+        self.mismatches += 1
+        return False
+
+    @property
+    def desynced(self):
+        return self.mismatches > 0
+
+    def load(self, cells, input_seq):
+        """Replace the board with a keyframe that already contains commands up to input_seq (16 bits)."""
+        self.core.board.load(cells)
+        self.mismatches = 0
+        self.pending_hashes.clear()
+        newer = [c for c in self.recent if _seq16_newer(c[0] & 0xFFFF, input_seq)]
+        if newer:
+            for command in newer:
+                self._replay(command)
+            self.skip_through = None
+        else:
+            self.skip_through = input_seq
@@ -1,6 +1,12 @@
 import pygame
-import random
-import numpy as np
+from .core import GameCore, SevenBag, SHAPES  # noqa: F401  (SHAPES: 기존 import 경로 호환)
+from .renderer import BoardRenderer, OpponentRenderer
+from .network import PacketType
+from .clock import SystemClock
+from .replay import new_local_seed
+from .scheduler import FrameScheduler, WAKE_EVENT
+from .text import get_font, render_text
+from .metrics import Metrics
 
 # 테트리스 블록 색상을 TETRIS BLOCK COLORS로 변경
 COLORS = [
@@ -14,105 +20,116 @@ COLORS = [
     (128, 0, 128)     # Z
 ]
 
-# 테트리미노 모양을 TETRIMINO SHAPES로 변경
-SHAPES = [
-    [[1, 1, 1, 1]],  # I
-    [[2, 0, 0],      # J
-     [2, 2, 2]],
-    [[0, 0, 3],      # L
-     [3, 3, 3]],
-    [[4, 4],         # O
-     [4, 4]],
-    [[0, 5, 5],      # S
-     [5, 5, 0]],
-    [[0, 6, 0],      # T
-     [6, 6, 6]],
-    [[7, 7, 0],      # Z
-     [0, 7, 7]]
-]
+GAME_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_UP, pygame.K_SPACE)
+
+
+def _core_attr(name):
+    """Expose a GameCore attribute as a read/write TetrisGame attribute."""
+    return property(lambda self: getattr(self.core, name),
+                    lambda self, value: setattr(self.core, name, value))
+
 
 class TetrisGame:
-    def __init__(self, screen, network, width=10, height=20):
+    # 게임 로직 상태는 GameCore(비트보드)에 위임
+    current_x = _core_attr('x')
+    current_y = _core_attr('y')
+    game_over = _core_attr('game_over')
+    score = _core_attr('score')
+    level = _core_attr('level')
+    lines_cleared = _core_attr('lines_cleared')
+    drop_speed = _core_attr('drop_speed')
+
+    # 유휴 시 최대 블록 시간: ACK 안 된 입력 재전송(50ms) 주기를 넘지 않도록
+    IDLE_TIMEOUT_MS = 50
+
+    def __init__(self, screen, network, width=10, height=20, full_redraw=False, clock=None,
+                 metrics=None):
         self.screen = screen
         self.network = network
+        # 단계별 프레임 타이머 (F3: 오버레이 토글), 기본으로 켜져 있음
+        self.metrics = metrics or Metrics()
+        self.overlay_surfaces = None
         self.width = width
         self.height = height
         self.block_size = 30
-        self.board = np.zeros((height, width), dtype=int)
+        self.core = GameCore(width, height)
         
+        # screen=None이면 헤드리스 모드 (렌더링 없음, 레이아웃은 800x600 기준)
+        self.headless = screen is None
+        screen_width, screen_height = (800, 600) if self.headless else screen.get_size()
+
         # 메인 게임 영역 크기 및 위치
         self.game_width = self.block_size * width
         self.game_height = self.block_size * height
-        self.game_x = (screen.get_width() - self.game_width) // 2
-        self.game_y = (screen.get_height() - self.game_height) // 2
+        self.game_x = (screen_width - self.game_width) // 2
+        self.game_y = (screen_height - self.game_height) // 2
 
         # 상대방 게임 영역 크기 및 위치 (축소된 크기)
         self.opponent_scale = 0.5
         self.opponent_width = int(self.game_width * self.opponent_scale)
         self.opponent_height = int(self.game_height * self.opponent_scale)
-        
-        # 현재 블록 초기화
-        self.current_piece = None
-        self.current_x = 0
-        self.current_y = 0
-        self.new_piece()
-
-        # 게임 상태
-        self.game_over = False
-        self.score = 0
-        self.level = 1
-        self.lines_cleared = 0
-        
-        # 타이머 설정
+        opponent_x = screen_width - self.opponent_width - 20
+
+        # 렌더링: 기본은 변경된 칸만 다시 그림, full_redraw=True면 매 프레임 전체 그리기
+        self.full_redraw = full_redraw
+        self.needs_full_frame = True
+        self.renderer = None
+        self.opponent_views = []
+        if not self.headless:
+            self.renderer = BoardRenderer(self.game_x, self.game_y, width, height,
+                                          self.block_size, self.block_size, COLORS)
+            self.opponent_views = [
+                OpponentRenderer(opponent_x, oy, self.opponent_width, self.opponent_height,
+                                 width, height, COLORS)
+                for oy in (20, screen_height - self.opponent_height - 20)
+            ]
+
+        # 타이머 설정 (clock은 get_ticks()만 있으면 됨, 헤드리스에서는 ManualClock)
+        self.clock = clock or SystemClock()
         self.drop_time = 0
-        self.drop_speed = 1000  # 초기 낙하 속도 (ms)
-        self.last_drop = pygame.time.get_ticks()
+        self.last_drop = self.clock.get_ticks()
+        self.recorder = None  # ReplayRecorder: seed, 키 입력, 중력 틱 기록
+        self.dirty = True  # 마지막 렌더 이후 화면에 보일 상태가 바뀌었는지
+
+    @property
+    def board(self):
+        return self.core.board.cells
+
+    @board.setter
+    def board(self, cells):
+        self.core.board.load(cells)
+
+    @property
+    def current_piece(self):
+        return self.core.piece.shape
 
     def new_piece(self):
-        self.current_piece = random.choice(SHAPES)
-        self.current_x = self.width // 2 - len(self.current_piece[0]) // 2
-        self.current_y = 0
-        
-        if not self.is_valid_move(self.current_piece, self.current_x, self.current_y):
-            self.game_over = True
+        self.core.spawn()
 
     def rotate_piece(self):
-        rotated = list(zip(*self.current_piece[::-1]))
-        if self.is_valid_move(rotated, self.current_x, self.current_y):
-            self.current_piece = rotated
+        self.core.rotate()
 
     def is_valid_move(self, piece, x, y):
-        for i, row in enumerate(piece):
-            for j, cell in enumerate(row):
-                if cell:
-                    if (y + i >= self.height or
-                        x + j < 0 or
-                        x + j >= self.width or
-                        y + i < 0 or
-                        self.board[y + i][x + j]):
-                        return False
-        return True
+        return self.core.fits(self.core.table.get(piece), x, y)
 
     def merge_piece(self):
-        for i, row in enumerate(self.current_piece):
-            for j, cell in enumerate(row):
-                if cell:
-                    self.board[self.current_y + i][self.current_x + j] = cell
-        self.clear_lines()
-        self.new_piece()
+        self.core.lock()
+
+    def hard_drop(self):
+        piece, x, y = self.core.piece, self.core.x, self.core.ghost_y()
+        self.core.hard_drop()
+        self.send_move(PacketType.DROP_PIECE, piece, x, y)
+
+    def send_move(self, move_type, piece=None, x=None, y=None):
+        """입력 명령 스트림으로 현재(또는 고정 직전) 블록 위치 전송"""
+        if self.network is None:
+            return
+        if piece is None:
+            piece, x, y = self.core.piece, self.current_x, self.current_y
+        self.network.send_move(piece.kind, x, y, move_type, piece.index)
 
     def clear_lines(self):
-        lines = 0
-        for i in range(self.height):
-            if all(self.board[i]):
-                self.board = np.vstack((np.zeros((1, self.width)), self.board[:i], self.board[i+1:]))
-                lines += 1
-        
-        if lines > 0:
-            self.lines_cleared += lines
-            self.score += lines * 100 * self.level
-            self.level = self.lines_cleared // 10 + 1
-            self.drop_speed = max(100, 1000 - (self.level - 1) * 100)
+        self.core.clear_lines()
 
     def draw_board(self, surface, x, y, width, height, board):
         block_width = width // self.width
@@ -137,100 +154,211 @@ class TetrisGame:
                                         block_width - 1,
                                         block_height - 1))
 
+    def piece_cells(self):
+        x, y = self.current_x, self.current_y
+        return [(y + i, x + j, cell) for i, j, cell in self.core.piece.cells]
+
     def draw(self):
         # 메인 게임 영역 그리기
         self.draw_board(self.screen, self.game_x, self.game_y, 
                        self.game_width, self.game_height, self.board)
         self.draw_current_piece(self.screen, self.game_x, self.game_y,
                               self.block_size, self.block_size)
+        self.draw_opponents()
 
-        # 상대방 게임 영역 그리기 (우측 상단, 하단)
-        opponent_x = self.screen.get_width() - self.opponent_width - 20
-        opponent_y1 = 20
-        opponent_y2 = self.screen.get_height() - self.opponent_height - 20
-        
-        pygame.draw.rect(self.screen, (128, 128, 128),
-                        (opponent_x, opponent_y1,
-                         self.opponent_width, self.opponent_height))
-        pygame.draw.rect(self.screen, (128, 128, 128),
-                        (opponent_x, opponent_y2,
-                         self.opponent_width, self.opponent_height))
-
-    def handle_input(self):
-        for event in pygame.event.get():
+    def draw_opponents(self, force=True):
+        """상대방 보드 그리기 (우측 상단, 하단); 새 보드가 도착한 경우에만 다시 그림"""
+        boards = self.network.get_opponent_boards() if self.network else ()
+        rects = []
+        for i, view in enumerate(self.opponent_views):
+            board = boards[i] if i < len(boards) else None
+            rect = view.draw(self.screen, board, force)
+            if rect:
+                rects.append(rect)
+        return rects
+
+    def render(self):
+        """Draw one frame and present it to the display."""
+        if self.headless:
+            return
+        metrics = self.metrics
+        start = metrics.now()
+        if self.full_redraw or self.needs_full_frame:
+            self.screen.fill((0, 0, 0))
+            if self.full_redraw:
+                self.draw()
+            else:
+                self.draw_opponents()
+                self.renderer.invalidate()
+                self.renderer.draw(self.screen, self.board, self.piece_cells())
+                self.needs_full_frame = False
+            self.draw_metrics_overlay(force=True)
+            start = metrics.lap('draw', start)
+            pygame.display.flip()
+            metrics.lap('flip', start)
+            return
+
+        rects = self.renderer.draw(self.screen, self.board, self.piece_cells())
+        rects += self.draw_opponents(force=False)
+        rect = self.draw_metrics_overlay()
+        if rect:
+            rects.append(rect)
+        start = metrics.lap('draw', start)
+        if rects:
+            pygame.display.update(rects)
+        metrics.lap('flip', start)
+
+    def draw_metrics_overlay(self, force=False):
+        """Draw the metrics overlay (top left) if enabled; returns its rect when redrawn."""
+        if not self.metrics.overlay:
+            return None
+        if self.overlay_surfaces is None:
+            font = get_font(20)
+            self.overlay_surfaces = [font.render(line, True, (255, 255, 255))
+                                     for line in self.metrics.overlay_lines()]
+        elif not force:
+            return None
+        rect = pygame.Rect(4, 4, max(s.get_width() for s in self.overlay_surfaces) + 8,
+                           len(self.overlay_surfaces) * 18 + 6)
+        self.screen.fill((32, 32, 32), rect)
+        for i, surface in enumerate(self.overlay_surfaces):
+            self.screen.blit(surface, (rect.x + 4, rect.y + 4 + i * 18))
+        return rect
+
+    def handle_input(self, events=None):
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 return False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    if self.is_valid_move(self.current_piece,
-                                        self.current_x - 1,
-                                        self.current_y):
-                        self.current_x -= 1
-                elif event.key == pygame.K_RIGHT:
-                    if self.is_valid_move(self.current_piece,
-                                        self.current_x + 1,
-                                        self.current_y):
-                        self.current_x += 1
-                elif event.key == pygame.K_DOWN:
-                    if self.is_valid_move(self.current_piece,
-                                        self.current_x,
-                                        self.current_y + 1):
-                        self.current_y += 1
-                elif event.key == pygame.K_UP:
-                    self.rotate_piece()
-                elif event.key == pygame.K_SPACE:
-                    while self.is_valid_move(self.current_piece,
-                                           self.current_x,
-                                           self.current_y + 1):
-                        self.current_y += 1
-                    self.merge_piece()
+                if event.key == pygame.K_F3:
+                    self.metrics.overlay = not self.metrics.overlay
+                    self.overlay_surfaces = None
+                    self.needs_full_frame = True  # 오버레이를 끌 때 지워지도록 전체 다시 그리기
+                else:
+                    self.handle_key(event.key)
+                self.dirty = True
+            elif event.type == WAKE_EVENT:
+                self.dirty = True  # 수신 스레드가 상대 보드/게임 상태를 갱신함
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.needs_full_frame = True
         return True
 
-    def update(self):
-        current_time = pygame.time.get_ticks()
+    def handle_key(self, key):
+        """Apply one key press (also used directly by headless drivers)."""
+        if self.recorder is not None and key in GAME_KEYS:
+            self.recorder.key(key)
+        if key == pygame.K_LEFT:
+            if self.core.move(-1):
+                self.send_move(PacketType.MOVE_PIECE)
+        elif key == pygame.K_RIGHT:
+            if self.core.move(1):
+                self.send_move(PacketType.MOVE_PIECE)
+        elif key == pygame.K_DOWN:
+            if self.core.move(0, 1):
+                self.send_move(PacketType.MOVE_PIECE)
+        elif key == pygame.K_UP:
+            if self.core.rotate():
+                self.send_move(PacketType.ROTATE_PIECE)
+        elif key == pygame.K_SPACE:
+            self.hard_drop()
+
+    def update(self, now=None):
+        """Advance game logic to `now` (a fixed-step logic time; defaults to the clock)."""
+        current_time = self.clock.get_ticks() if now is None else now
         if current_time - self.last_drop > self.drop_speed:
-            if self.is_valid_move(self.current_piece,
-                                self.current_x,
-                                self.current_y + 1):
-                self.current_y += 1
-            else:
-                self.merge_piece()
+            self.gravity_tick()
             self.last_drop = current_time
+            self.dirty = True
+
+    def idle_timeout(self, scheduler, idle_ms):
+        """How long the loop may block before the next gravity step is due."""
+        return min(idle_ms, scheduler.until(self.last_drop + self.drop_speed + 1))
+
+    def gravity_tick(self):
+        """Move the piece down one row, locking it if it cannot fall."""
+        if self.recorder is not None:
+            self.recorder.gravity()
+        piece, x, y = self.core.piece, self.core.x, self.core.y
+        if self.core.step() is not None:
+            # 중력으로 고정된 블록도 서버 시뮬레이션이 알 수 있도록 DROP으로 전송
+            self.send_move(PacketType.DROP_PIECE, piece, x, y)
+
+    def start_round(self):
+        """Restart on the room's shared 7-bag sequence once GAME_START carried a seed.
+
+        A recorded game without a shared seed picks a local one so the replay
+        can reproduce the piece sequence.
+        """
+        seed = self.network.seed
+        if seed is None and self.recorder is not None:
+            seed = new_local_seed()
+        if seed is not None:
+            if self.recorder is not None:
+                self.recorder.seed(seed)
+            self.core.restart(SevenBag(seed))
+            self.last_drop = self.clock.get_ticks()
+            self.needs_full_frame = True
 
     def run(self):
-        clock = pygame.time.Clock()
-        
-        # Wait for game to start
+        scheduler = FrameScheduler(self.clock)
+        # 수신 스레드가 있으면 상대 보드 도착 시 WAKE_EVENT로 깨우고, poll 모드는 스텝마다 소켓 확인
+        threaded = getattr(self.network, 'threaded', True)
+        if threaded:
+            self.network.on_update = scheduler.wake
+        idle_ms = self.IDLE_TIMEOUT_MS if threaded else scheduler.step_ms
+
+        # Wait for game to start (GAME_START/DISCONNECT 수신 시 스레드가 깨움)
+        self.show_message("Waiting for other players...")
         while not self.network.is_game_started():
+            self.network.poll()
             if self.network.is_server_disconnected():
                 self.show_message("Server has shut down")
                 return
 
-            self.screen.fill((0, 0, 0))
-            self.show_message("Waiting for other players...")
-            
-            for event in pygame.event.get():
+            for event in scheduler.wait(None if threaded else idle_ms):
                 if event.type == pygame.QUIT:
                     self.network.disconnect()
                     return
-                    
-            pygame.display.flip()
-            clock.tick(60)
+                if event.type == pygame.VIDEOEXPOSE:
+                    self.show_message("Waiting for other players...")
 
+        self.start_round()
+        scheduler.reset()
+        events = []
+        metrics = self.metrics
+        network_stats = getattr(self.network, 'stats', None)
         while not self.game_over:
+            frame_start = phase = metrics.now()
+            # 논블로킹 모드에서는 깨어날 때마다 수신 버퍼를 비움 (스레드 모드에서는 no-op)
+            if self.network.poll():
+                self.dirty = True
             if self.network.is_server_disconnected():
                 self.show_message("Server has shut down")
                 return
+            phase = metrics.lap('poll', phase)
 
-            if not self.handle_input():
+            if not self.handle_input(events):
                 self.network.disconnect()
                 break
-            
-            self.update()
-            self.screen.fill((0, 0, 0))
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
+            phase = metrics.lap('input', phase)
+
+            # 렌더링과 무관하게 고정 간격 스텝으로 로직 진행
+            for now in scheduler.steps():
+                self.update(now)
+            phase = metrics.lap('update', phase)
+            self.network.flush_inputs()
+            self.network.send_board_state(self.board)
+            metrics.lap('send', phase)
+
+            if metrics.tick(network_stats) and metrics.overlay:
+                self.overlay_surfaces = None  # 새 보고서로 오버레이 갱신
+                self.dirty = True
+            if self.dirty or self.needs_full_frame:
+                self.render()
+                self.dirty = False
+            metrics.end_frame(frame_start)
+            # 다음 중력 스텝(또는 입력/수신 깨우기)까지 블록
+            events = scheduler.wait(self.idle_timeout(scheduler, idle_ms))
 
         # Game over handling
         self.show_message("Game Over")
@@ -239,9 +367,9 @@ class TetrisGame:
     def show_message(self, text):
         """Helper method to display a message in the center of the screen"""
         self.screen.fill((0, 0, 0))
-        font = pygame.font.Font(None, 48)
-        text_surface = font.render(text, True, (255, 255, 255))
+        text_surface = render_text(text, 48, (255, 255, 255))
         text_rect = text_surface.get_rect(center=(self.screen.get_width() // 2,
                                                  self.screen.get_height() // 2))
         self.screen.blit(text_surface, text_rect)
-        pygame.display.flip() 
\ No newline at end of file
+        pygame.display.flip()
+        self.needs_full_frame = True 
\ No newline at end of file
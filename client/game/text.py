@@ -0,0 +1,15 @@
+"""Cached fonts and rendered text surfaces (pygame.font.Font is slow to create)."""
+import functools
+
+import pygame
+
+
+@functools.lru_cache(maxsize=None)
+def get_font(size):
+    return pygame.font.Font(None, size)
+
+
+@functools.lru_cache(maxsize=64)
+def render_text(text, size, color):
+    """Rendered (antialiased) text surface; color must be a tuple."""
+    return get_font(size).render(text, True, color)
@@ -2,6 +2,10 @@ import pygame
 import sys
 from game.tetris import TetrisGame
 from game.network import NetworkManager
+from game.replay import ReplayRecorder
+from game.metrics import Metrics
+from game.scheduler import STEP_MS, WAKE_EVENT, wait_events
+from game.text import render_text
 
 # 상수 정의
 WINDOW_WIDTH = 800
@@ -15,23 +19,34 @@ BLACK = (0, 0, 0)
 GRAY = (128, 128, 128)
 RED = (255, 0, 0)
 
+ERROR_DISPLAY_MS = 3000
+
 class MainMenu:
-    def __init__(self, client_id='client1'):
+    def __init__(self, client_id='client1', threaded=True, record_path=None, metrics_path=None):
         self.client_id = client_id
+        self.threaded = threaded
+        self.record_path = record_path
+        self.metrics_path = metrics_path
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption(f"Tetris - {client_id}")
         self.clock = pygame.time.Clock()
-        self.network = NetworkManager(client_id)
+        self.network = NetworkManager(client_id, threaded=threaded)
+        self.connecting = False
         self.show_error = False
         self.error_message = ""
         self.error_timer = 0
+        self.connect_button = pygame.Rect(
+            WINDOW_WIDTH // 2 - BUTTON_WIDTH // 2,
+            WINDOW_HEIGHT // 2 - BUTTON_HEIGHT // 2,
+            BUTTON_WIDTH,
+            BUTTON_HEIGHT
+        )
         
     def draw_button(self, text, x, y, width, height):
         button_rect = pygame.Rect(x, y, width, height)
         pygame.draw.rect(self.screen, GRAY, button_rect)
-        font = pygame.font.Font(None, 36)
-        text_surface = font.render(text, True, BLACK)
+        text_surface = render_text(text, 36, BLACK)
         text_rect = text_surface.get_rect(center=button_rect.center)
         self.screen.blit(text_surface, text_rect)
         return button_rect
@@ -41,59 +56,136 @@ class MainMenu:
         self.error_message = message
         self.error_timer = pygame.time.get_ticks()
         
+    def error_time_left(self):
+        """Milliseconds until the error message disappears (None if none is shown)."""
+        if not self.show_error:
+            return None
+        return max(0, self.error_timer + ERROR_DISPLAY_MS - pygame.time.get_ticks())
+
     def draw_error_message(self):
         if self.show_error:
             # Display error message for 3 seconds
-            if pygame.time.get_ticks() - self.error_timer > 3000:
+            if self.error_time_left() == 0:
                 self.show_error = False
                 return
                 
-            font = pygame.font.Font(None, 36)
-            text_surface = font.render(self.error_message, True, RED)
+            text_surface = render_text(self.error_message, 36, RED)
             text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 100))
             self.screen.blit(text_surface, text_rect)
 
+    def start_recording(self, game):
+        if self.record_path is None:
+            return None
+        recorder = ReplayRecorder(self.record_path, game.clock, game.width, game.height,
+                                  self.network.player_id)
+        game.recorder = recorder
+        self.network.recorder = recorder
+        return recorder
+
+    def start_connect(self):
+        # 응답이 오면 수신 스레드가 WAKE_EVENT로 메뉴 루프를 깨움 (poll 모드는 대기 시간으로 확인)
+        self.network.on_update = lambda: pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        self.network.start_connect()
+        self.connecting = True
+
+    def connect_time_left(self):
+        """Milliseconds until the pending connection attempt needs attention (None if idle)."""
+        if not self.connecting:
+            return None
+        wait = self.network.connect_wait() * 1000
+        # poll 모드에는 깨워 줄 수신 스레드가 없으므로 프레임 간격으로 확인
+        return wait if self.threaded else min(wait, STEP_MS)
+
+    def play(self):
+        metrics = Metrics(export_path=self.metrics_path)
+        game = TetrisGame(self.screen, self.network, metrics=metrics)
+        recorder = self.start_recording(game)
+        game.run()
+        self.network.disconnect()
+        metrics.close()
+        if recorder is not None:
+            recorder.close(game.core)
+        # 다음 게임은 새 세션 상태로 시작
+        self.network = NetworkManager(self.client_id, threaded=self.threaded)
+
+    def draw(self):
+        self.screen.fill(WHITE)
+        
+        # Place button in center
+        self.draw_button("Connecting..." if self.connecting else "Connect to Server",
+                         *self.connect_button)
+        
+        # Display error message if any
+        self.draw_error_message()
+        pygame.display.flip()
+
     def run(self):
+        # 메뉴는 입력이나 오류 메시지 만료 때만 다시 그리고, 그 사이에는 이벤트 대기로 블록
+        dirty = True
         while True:
-            self.screen.fill(WHITE)
-            
-            # Place button in center
-            connect_button = self.draw_button(
-                "Connect to Server",
-                WINDOW_WIDTH // 2 - BUTTON_WIDTH // 2,
-                WINDOW_HEIGHT // 2 - BUTTON_HEIGHT // 2,
-                BUTTON_WIDTH,
-                BUTTON_HEIGHT
-            )
-            
-            # Display error message if any
-            self.draw_error_message()
-
-            for event in pygame.event.get():
+            if dirty:
+                self.draw()
+                dirty = False
+
+            timeouts = [t for t in (self.error_time_left(), self.connect_time_left()) if t is not None]
+            events = wait_events(min(timeouts) if timeouts else None)
+            if self.show_error and self.error_time_left() == 0:
+                dirty = True
+
+            if self.connecting:
+                # 요청은 RTO 간격으로 재전송되고, 그동안 메뉴는 계속 입력을 받음
+                result = self.network.poll_connect()
+                if result is not None:
+                    self.connecting = False
+                    if result:
+                        self.play()
+                    else:
+                        self.show_error_message("Failed to connect to server")
+                    dirty = True
+
+            for event in events:
                 if event.type == pygame.QUIT:
+                    self.network.disconnect()
                     pygame.quit()
                     sys.exit()
                 
+                if event.type == pygame.VIDEOEXPOSE:
+                    dirty = True
+
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if connect_button.collidepoint(event.pos):
-                        if self.network.connect():
-                            game = TetrisGame(self.screen, self.network)
-                            game.run()
-                            self.network.disconnect()
-                        else:
-                            self.show_error_message("Failed to connect to server")
+                    if self.connect_button.collidepoint(event.pos) and not self.connecting:
+                        self.start_connect()
+                        dirty = True
 
-            pygame.display.flip()
-            self.clock.tick(60)
+def take_option(args, name):
+    """Remove `name VALUE` from args and return VALUE (None if absent)."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"{name} needs a file path")
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
 
 def main():
     # Get client ID from command line arguments
-    if len(sys.argv) != 2 or sys.argv[1] not in ['client1', 'client2', 'client3']:
-        print("Usage: python main.py [client1|client2|client3]")
+    args = sys.argv[1:]
+    poll = '--poll' in args  # 수신 스레드 대신 프레임 루프에서 논블로킹 수신
+    if poll:
+        args.remove('--poll')
+    # --record: 리플레이 로그 기록 (python -m tools.replay로 재생)
+    # --metrics: 초당 한 줄씩 프레임/네트워크 지표를 JSON lines로 추가 기록
+    record_path = take_option(args, '--record')
+    metrics_path = take_option(args, '--metrics')
+    if len(args) != 1 or args[0] not in ['client1', 'client2', 'client3']:
+        print("Usage: python main.py [client1|client2|client3] [--poll] [--record PATH] [--metrics PATH]")
         sys.exit(1)
         
-    client_id = sys.argv[1]
-    menu = MainMenu(client_id)
+    client_id = args[0]
+    menu = MainMenu(client_id, threaded=not poll, record_path=record_path,
+                    metrics_path=metrics_path)
     menu.run()
 
 if __name__ == "__main__":
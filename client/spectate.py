@@ -0,0 +1,101 @@
+import argparse
+
+import pygame
+
+from game.headless import create_headless_game
+from game.network import PLAYER_FLAG_GAME_OVER
+from game.scheduler import WAKE_EVENT, wait_events
+from game.spectator import SpectatorClient, RELAY_PORT
+from game.text import render_text
+
+# 상수 정의
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+SPECTATOR_SCALE = 0.6  # 플레이 화면 보드(블록 30px) 대비 축소 비율
+BOARD_GAP = 60
+
+# 색상 정의
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRAY = (128, 128, 128)
+RED = (255, 0, 0)
+
+
+class SpectatorView:
+    """Read-only view of every board in the relayed room, redrawn only when it changes."""
+
+    def __init__(self, client):
+        self.client = client
+        pygame.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Tetris - spectator")
+        # 보드는 플레이 화면과 같은 TetrisGame.draw_board로 그림 (화면 없는 게임을 그리기 도구로 사용)
+        self.painter = create_headless_game()
+        self.board_width = int(self.painter.game_width * SPECTATOR_SCALE)
+        self.board_height = int(self.painter.game_height * SPECTATOR_SCALE)
+        self.empty_board = [[0] * self.painter.width for _ in range(self.painter.height)]
+
+    def draw_player(self, x, y, player_id, board, score):
+        label = render_text(f"Player {player_id}", 30, WHITE)
+        self.screen.blit(label, label.get_rect(midbottom=(x + self.board_width // 2, y - 8)))
+        pygame.draw.rect(self.screen, GRAY, (x - 2, y - 2, self.board_width + 3, self.board_height + 3), 1)
+        self.painter.draw_board(self.screen, x, y, self.board_width, self.board_height,
+                                self.empty_board if board is None else board)
+        if score is None:
+            return
+        points, lines, flags = score
+        text = render_text(f"Score {points}  Lines {lines}", 24, WHITE)
+        self.screen.blit(text, text.get_rect(midtop=(x + self.board_width // 2, y + self.board_height + 8)))
+        if flags & PLAYER_FLAG_GAME_OVER:
+            over = render_text("GAME OVER", 36, RED)
+            self.screen.blit(over, over.get_rect(center=(x + self.board_width // 2,
+                                                         y + self.board_height // 2)))
+
+    def draw(self):
+        self.screen.fill(BLACK)
+        room_id, players = self.client.view
+        if room_id is None:
+            text = render_text("Waiting for a match...", 36, WHITE)
+            self.screen.blit(text, text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+        else:
+            title = render_text(f"Room {room_id}", 36, WHITE)
+            self.screen.blit(title, title.get_rect(midtop=(WINDOW_WIDTH // 2, 16)))
+            total = len(players) * self.board_width + (len(players) - 1) * BOARD_GAP
+            x = (WINDOW_WIDTH - total) // 2
+            y = (WINDOW_HEIGHT - self.board_height) // 2 + 10
+            for player_id, board, score in players:
+                self.draw_player(x, y, player_id, board, score)
+                x += self.board_width + BOARD_GAP
+        pygame.display.flip()
+
+    def run(self):
+        # 수신 스레드가 새 스냅샷마다 WAKE_EVENT로 깨움: 중계기 틱보다 자주 그리지 않음
+        self.client.on_update = lambda: pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        self.client.start()
+        dirty = True
+        try:
+            while True:
+                if dirty:
+                    self.draw()
+                    dirty = False
+                events = wait_events(self.client.refresh() * 1000)
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type in (WAKE_EVENT, pygame.VIDEOEXPOSE):
+                        dirty = True
+        finally:
+            self.client.close()
+            pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the room streamed by tools.spectator_relay.")
+    parser.add_argument('--host', default='127.0.0.1', help='relay host')
+    parser.add_argument('--port', type=int, default=RELAY_PORT, help='relay spectator port')
+    args = parser.parse_args()
+    SpectatorView(SpectatorClient(args.host, args.port)).run()
+
+
+if __name__ == "__main__":
+    main()
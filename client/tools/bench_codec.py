@@ -0,0 +1,109 @@
+"""Encode/decode throughput of the legacy Packet class vs PacketCodec.
+
+Run from the client directory:
+    python -m tools.bench_codec [--count N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game.codec import PacketCodec, HEADER_SIZE
+from game.network import Packet, PacketType, BoardEncoder, BoardDecoder
+
+
+def rate(func, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def sample_board_payload():
+    board = np.zeros((20, 10), dtype=np.int32)
+    board[16:] = np.arange(1, 11) % 7 + 1
+    return BoardEncoder().encode(board)
+
+
+def legacy_cases(payload):
+    move = Packet()
+    move.type = PacketType.MOVE_PIECE
+    move.player_id = 1
+
+    def encode_move():
+        packet = Packet()
+        packet.type = PacketType.MOVE_PIECE
+        packet.player_id = 1
+        packet.move_data = {'piece_type': 1, 'x': 4, 'y': 7, 'rotation': 1}
+        packet.pack()
+
+    move_wire = move.pack()
+
+    def decode_move():
+        packet = Packet()
+        packet.unpack(move_wire)
+        return packet.move_data
+
+    board = Packet()
+    board.type = PacketType.BOARD_UPDATE
+    board.player_id = 1
+    board.board_data = payload
+    board_wire = board.pack()
+    decoder = BoardDecoder()
+
+    def decode_board():
+        packet = Packet()
+        packet.unpack(board_wire, len(board_wire))
+        decoder.latest_seq = None
+        return decoder.decode(packet.board_data)
+
+    return encode_move, decode_move, decode_board
+
+
+def codec_cases(payload):
+    codec = PacketCodec()
+
+    def encode_move():
+        codec.move(PacketType.MOVE_PIECE, 1, 1, 4, 7, 1)
+
+    move_wire = bytes(codec.move(PacketType.MOVE_PIECE, 1, 1, 4, 7, 1))
+    codec.recv_buffer[:len(move_wire)] = move_wire
+
+    def decode_move():
+        return codec.decode(len(move_wire)).move()
+
+    board_wire = bytes(codec.header(PacketType.BOARD_UPDATE, 1)) + payload
+    decoder = BoardDecoder()
+
+    def decode_board():
+        codec.recv_buffer[:len(board_wire)] = board_wire  # recv_into 대용
+        decoder.latest_seq = None
+        return decoder.decode(codec.decode(len(board_wire)).payload())
+
+    return encode_move, decode_move, decode_board
+
+
+LABELS = ('encode MOVE_PIECE', 'decode MOVE_PIECE', 'decode BOARD_UPDATE')
+
+
+def run(count):
+    """{'Packet': {label: packets/s}, 'PacketCodec': {...}}"""
+    payload = sample_board_payload()
+    return {name: dict(zip(LABELS, (rate(case, count) for case in cases(payload))))
+            for name, cases in (('Packet', legacy_cases), ('PacketCodec', codec_cases))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    args = parser.parse_args()
+
+    results = run(args.count)
+    print(f"{'':22s}{'Packet':>14s}{'PacketCodec':>14s}   (packets/s, header {HEADER_SIZE} B)")
+    for label in LABELS:
+        legacy, codec = results['Packet'][label], results['PacketCodec'][label]
+        print(f"{label:22s}{legacy:14,.0f}{codec:14,.0f}   x{codec / legacy:.1f}")
+
+
+if __name__ == '__main__':
+    main()
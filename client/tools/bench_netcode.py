@@ -0,0 +1,278 @@
+"""Netcode benchmark: move-to-opponent-display latency and board staleness.
+
+Run from the client directory with a GameServer running (and no other
+players waiting for a room):
+    python -m tools.bench_netcode [--duration 20] [--latency 40 --jitter 10 --loss 2 ...]
+    python -m tools.bench_netcode --preset clean lan wifi mobile [--json report.json]
+
+Three bot players (one room) connect through an in-process
+tools.udp_proxy with the given impairment (--no-proxy connects them to
+the server directly) and play at 60 Hz. Every locked piece is logged with
+its send time and the crc32 of the sender's board. Each receiver compares
+the opponent board it publishes for display with those hashes, so the
+numbers hold for any protocol (input replay, relayed or authoritative
+boards) as long as the displayed board ends up equal to the sender's.
+
+- latency: time from sending a DROP to the first displayed board that
+  contains it (pieces that were never displayed are counted as missed).
+- staleness: sampled at the start of every frame for every (viewer,
+  opponent) pair: how long the displayed board has been missing the
+  oldest undisplayed lock (0 when it is current). stale_fraction counts
+  samples more than one frame behind.
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from game.bot import Autoplayer, PlacementSearch
+from game.clock import MonotonicClock
+from game.headless import create_headless_game
+from game.network import NetworkManager, PacketType
+from game.sync import board_hash
+from tools.loadgen import percentile
+from tools.udp_proxy import (Impairment, add_impairment_arguments, describe, start_proxy,
+                             DEFAULT_SERVER_PORT)
+
+FRAME_TIME = 1 / 60
+PLAYERS = 3  # 방이 시작되려면 ROOM_CAPACITY명이 필요
+
+# 이름 -> (latency, jitter, loss, duplicate, reorder): 한 방향 기준, ms / %
+PRESETS = {
+    'clean': (0, 0, 0, 0, 0),
+    'lan': (2, 1, 0, 0, 0),
+    'wifi': (15, 10, 1, 0, 1),
+    'mobile': (50, 25, 3, 1, 3),
+    'lossy': (30, 5, 10, 0, 0),
+}
+
+
+class TimedNetwork(NetworkManager):
+    """NetworkManager that logs (send time, board hash) for every DROP it sends."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.game = None
+        self.drops = []  # [보낸 시각, 고정 직후 보드 crc32]: 수신 스레드가 읽기 전에 추가
+
+    def send_move(self, piece_type, x, y, move_type=PacketType.MOVE_PIECE, rotation=0):
+        if move_type == PacketType.DROP_PIECE and self.connected:
+            # 블록은 이미 고정된 상태: 이 보드가 상대 화면에 나타나야 함
+            self.drops.append((time.perf_counter(), board_hash(self.game.board)))
+        super().send_move(piece_type, x, y, move_type, rotation)
+
+
+class DisplayTracker:
+    """Matches boards published for display against the senders' drop logs."""
+
+    def __init__(self, networks):
+        self.networks = {n.player_id: n for n in networks}
+        self.shown = {}      # (viewer, sender) -> 화면에 반영된 DROP 개수
+        self.latency = []    # 초
+        self.staleness = []  # 초
+        self.lock = threading.Lock()
+
+    def on_update(self, viewer):
+        now = time.perf_counter()
+        boards = viewer.opponent_boards
+        for sender_id in viewer.opponent_ids or ():
+            sender = self.networks.get(sender_id)
+            idx = viewer._opponent_index(sender_id)
+            if sender is None or idx is None or boards[idx] is None:
+                continue
+            value = board_hash(boards[idx])
+            key = (viewer.player_id, sender_id)
+            with self.lock:
+                start = self.shown.get(key, 0)
+                drops = sender.drops
+                # 가장 최근 것부터 찾음: 같은 보드가 다시 나오는 드문 경우에도 앞으로만 진행
+                for i in range(len(drops) - 1, start - 1, -1):
+                    if drops[i][1] == value:
+                        self.latency.extend(now - sent for sent, _ in drops[start:i + 1])
+                        self.shown[key] = i + 1
+                        break
+
+    def sample(self):
+        now = time.perf_counter()
+        with self.lock:
+            for viewer in self.networks.values():
+                for sender_id in viewer.opponent_ids or ():
+                    sender = self.networks.get(sender_id)
+                    if sender is None:
+                        continue
+                    shown = self.shown.get((viewer.player_id, sender_id), 0)
+                    drops = sender.drops
+                    self.staleness.append(now - drops[shown][0] if shown < len(drops) else 0.0)
+
+    def missed(self):
+        total = 0
+        for viewer in self.networks.values():
+            for sender_id in viewer.opponent_ids or ():
+                sender = self.networks.get(sender_id)
+                if sender is not None:
+                    total += len(sender.drops) - self.shown.get((viewer.player_id, sender_id), 0)
+        return total
+
+
+def summary_ms(values):
+    if not values:
+        return None
+    return {'samples': len(values),
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': max(values) * 1000}
+
+
+def start_proxy_thread(args, listen_port):
+    """Run tools.udp_proxy on its own event loop thread; returns (loop, proxy)."""
+    loop = asyncio.new_event_loop()
+    rng = random.Random(args.seed)
+    proxy = loop.run_until_complete(start_proxy(
+        ('127.0.0.1', listen_port), (args.server_host, args.server_port),
+        Impairment.from_args(args, rng), Impairment.from_args(args, rng)))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    return loop, proxy
+
+
+def stop_proxy(loop, proxy):
+    loop.call_soon_threadsafe(proxy.close)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def run_scenario(args, listen_port):
+    loop = proxy = None
+    if args.no_proxy:
+        host, port = args.server_host, args.server_port
+    else:
+        loop, proxy = start_proxy_thread(args, listen_port)
+        host, port = '127.0.0.1', listen_port
+
+    search = PlacementSearch(budget_ms=FRAME_TIME * 1000)
+    players = []
+    try:
+        for _ in range(PLAYERS):
+            network = TimedNetwork('client1', client_port=0)
+            network.host, network.port = host, port
+            if not network.connect():
+                raise RuntimeError("failed to connect (is the server running?)")
+            game = create_headless_game(clock=MonotonicClock(), network=network)
+            network.game = game
+            players.append((game, Autoplayer(search, args.keys_per_frame or None)))
+
+        networks = [game.network for game, _ in players]
+        tracker = DisplayTracker(networks)
+        deadline = time.monotonic() + args.start_timeout
+        while not all(n.is_game_started() for n in networks):
+            if time.monotonic() > deadline:
+                raise RuntimeError("room did not start (other clients waiting on the server?)")
+            time.sleep(0.01)
+        for n in networks:
+            n.on_update = lambda n=n: tracker.on_update(n)
+        for game, _ in players:
+            game.start_round()
+
+        start = time.monotonic()
+        while time.monotonic() - start < args.duration:
+            frame_start = time.monotonic()
+            tracker.sample()  # 이번 프레임이 그릴 상대 보드 기준
+            for game, bot in players:
+                if game.game_over or game.network.is_server_disconnected():
+                    continue
+                bot.act(game)
+                game.update()
+                game.network.flush_inputs()
+                game.network.send_board_state(game.board)
+            time.sleep(max(0.0, FRAME_TIME - (time.monotonic() - frame_start)))
+        time.sleep(args.drain)  # 지연 도착분 반영
+        elapsed = time.monotonic() - start
+
+        names = {int(t): t.name for t in PacketType}
+        sent, received = {}, {}
+        for n in networks:
+            for counts, total in ((n.stats.sent, sent), (n.stats.received, received)):
+                for k, v in counts.items():
+                    total[names.get(k, str(k))] = total.get(names.get(k, str(k)), 0) + v
+        stale = tracker.staleness
+        report = {
+            'duration_s': elapsed,
+            'drops_sent': sum(len(n.drops) for n in networks),
+            'drops_missed': tracker.missed(),
+            'game_overs': sum(1 for game, _ in players if game.game_over),
+            'latency': summary_ms(tracker.latency),
+            'staleness': summary_ms(stale),
+            'stale_fraction': sum(1 for s in stale if s > FRAME_TIME) / len(stale) if stale else None,
+            'client_rtt_ms': [None if n.stats.srtt is None else n.stats.srtt * 1000 for n in networks],
+            'sent': sent,
+            'received': received,
+        }
+        if proxy is not None:
+            report['proxy'] = {'up': dict(proxy.upstream.counts), 'down': dict(proxy.downstream.counts)}
+        return report
+    finally:
+        for game, _ in players:
+            game.network.disconnect()
+        if loop is not None:
+            stop_proxy(loop, proxy)
+
+
+def print_summary(name, report):
+    def fmt(summary, key):
+        return '-' if summary is None else f"{summary[key]:.1f}"
+    latency, staleness = report['latency'], report['staleness']
+    print(f"{name}: latency p50 {fmt(latency, 'p50_ms')} / p99 {fmt(latency, 'p99_ms')} ms, "
+          f"staleness mean {fmt(staleness, 'mean_ms')} / p99 {fmt(staleness, 'p99_ms')} ms "
+          f"(stale {report['stale_fraction'] or 0:.0%} of frames), "
+          f"{report['drops_missed']}/{report['drops_sent']} locks never shown")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server-host', default='127.0.0.1')
+    parser.add_argument('--server-port', type=int, default=DEFAULT_SERVER_PORT)
+    parser.add_argument('--listen-port', type=int, default=12347, help='port of the in-process proxy')
+    parser.add_argument('--no-proxy', action='store_true', help='connect directly to the server')
+    parser.add_argument('--preset', nargs='+', choices=sorted(PRESETS),
+                        help='run these impairment presets in turn instead of the flags below')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--drain', type=float, default=1.0, help='wait for late packets (s)')
+    parser.add_argument('--start-timeout', type=float, default=10.0)
+    parser.add_argument('--keys-per-frame', type=int, default=1,
+                        help='bot inputs per frame (0 = whole plan at once)')
+    parser.add_argument('--json', help='also write the reports to this file')
+    add_impairment_arguments(parser)
+    args = parser.parse_args()
+
+    if args.preset:
+        scenarios = []
+        for name in args.preset:
+            latency, jitter, loss, duplicate, reorder = PRESETS[name]
+            scenario = argparse.Namespace(**vars(args))
+            scenario.latency, scenario.jitter, scenario.loss = latency, jitter, loss
+            scenario.duplicate, scenario.reorder = duplicate, reorder
+            scenarios.append((name, scenario))
+    else:
+        scenarios = [('direct' if args.no_proxy else 'custom', args)]
+
+    reports = {}
+    for i, (name, scenario) in enumerate(scenarios):
+        conditions = 'no proxy' if scenario.no_proxy else describe(scenario)
+        print(f"[{name}] {conditions}, {scenario.duration:g} s", flush=True)
+        report = run_scenario(scenario, args.listen_port + i)
+        report['conditions'] = conditions
+        reports[name] = report
+        print_summary(name, report)
+
+    text = json.dumps(reports, indent=2)
+    if args.json:
+        with open(args.json, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
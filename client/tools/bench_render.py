@@ -0,0 +1,71 @@
+"""Headless frame-time benchmark: dirty-rectangle vs full-redraw rendering.
+
+Run from the client directory:
+    python -m tools.bench_render [--frames N]
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from game.tetris import TetrisGame
+from game.headless import NullNetwork
+
+
+def play_frame(game, frame, rng):
+    # 대략 사람 입력 속도: 몇 프레임마다 이동/회전, 30프레임마다 중력
+    if frame % 6 == 0:
+        action = rng.randrange(4)
+        if action == 0:
+            game.core.move(-1)
+        elif action == 1:
+            game.core.move(1)
+        elif action == 2:
+            game.core.rotate()
+        else:
+            game.core.move(0, 1)
+    if frame % 30 == 0:
+        game.core.step()
+    if frame % 240 == 0:
+        game.hard_drop()
+    if game.game_over:
+        game.core.board.reset()
+        game.game_over = False
+
+
+def measure(screen, full_redraw, frames, seed=0):
+    random.seed(seed)
+    rng = random.Random(seed)
+    game = TetrisGame(screen, NullNetwork(), full_redraw=full_redraw)
+    times = []
+    for frame in range(frames):
+        play_frame(game, frame, rng)
+        start = time.perf_counter()
+        game.render()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        'mean_ms': sum(times) / len(times) * 1000,
+        'p99_ms': times[int(len(times) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    for label, full_redraw in (('full redraw', True), ('dirty rects', False)):
+        result = measure(screen, full_redraw, args.frames)
+        print(f"{label:12s}  mean {result['mean_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Headless performance benchmark suite; writes machine-readable JSON.
+
+Run from the client directory:
+    python -m tools.benchmark [--output bench.json] [--quick]
+
+Reports pieces placed and line clears per second (merge_piece /
+clear_lines), worst-case hard-drop collision cost, batched simulator
+throughput, render frame time under the SDL dummy driver and Packet
+encode/decode rates.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from game.batch import BatchSimulator
+from game.core import SHAPES
+from game.headless import create_headless_game
+from tools import bench_codec, bench_render
+
+
+def bench_piece_placement(pieces, seed=0):
+    """Random rotation/column + hard drop + merge_piece, resetting on game over."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    game = create_headless_game()
+    core = game.core
+    start = time.perf_counter()
+    for _ in range(pieces):
+        for _ in range(rng.randrange(4)):
+            core.rotate()
+        core.move(rng.randrange(-5, 6))
+        core.y = core.ghost_y()
+        game.merge_piece()
+        if game.game_over:
+            core.board.reset()
+            game.game_over = False
+    elapsed = time.perf_counter() - start
+    return {'pieces': pieces, 'pieces_per_sec': pieces / elapsed}
+
+
+def bench_line_clears(iterations, seed=0):
+    """clear_lines on boards with 1-4 full rows at the bottom."""
+    rng = np.random.default_rng(seed)
+    boards = []
+    for _ in range(64):
+        board = rng.integers(0, 8, (20, 10)).astype(np.int32)
+        board[:8] = 0
+        full = rng.integers(1, 5)
+        board[20 - full:] = rng.integers(1, 8, (full, 10))
+        board[8:20 - full, 0] = 0
+        boards.append((board, int(full)))
+
+    game = create_headless_game()
+    lines = 0
+    elapsed = 0.0
+    for i in range(iterations):
+        board, full = boards[i % len(boards)]
+        game.board = board
+        start = time.perf_counter()
+        game.clear_lines()
+        elapsed += time.perf_counter() - start
+        lines += full
+    return {'clears': iterations, 'clears_per_sec': iterations / elapsed,
+            'lines_per_sec': lines / elapsed}
+
+
+def bench_hard_drop(iterations):
+    """Worst case: vertical I piece dropped the full height of an empty board."""
+    game = create_headless_game()
+    core = game.core
+    vertical_i = core.table.rotations[0][1]
+    spawn_x = core.x
+
+    def legacy_drop():
+        # 기존 K_SPACE 방식: is_valid_move를 한 칸씩 반복
+        y = 0
+        while game.is_valid_move(vertical_i.shape, spawn_x, y + 1):
+            y += 1
+        return y
+
+    def core_drop():
+        return core.board.drop_y(vertical_i, spawn_x, 0)
+
+    results = {}
+    for name, func in (('is_valid_move_loop', legacy_drop), ('drop_y', core_drop)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        results[name + '_us'] = (time.perf_counter() - start) / iterations * 1e6
+    results['rows'] = legacy_drop()
+    return results
+
+
+def bench_batch_simulator(boards, steps, seed=0):
+    """Random placements + hard drops on N boards at once, restarting finished games."""
+    sim = BatchSimulator(boards, seed=seed)
+    rng = np.random.default_rng(seed)
+    placements = 0
+    lines = 0
+    games = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        placements += int((~sim.game_over).sum())
+        sim.place(rng.integers(0, 4, boards), rng.integers(-1, 9, boards))
+        lines += int(sim.hard_drop().sum())
+        finished = sim.game_over.copy()
+        games += int(finished.sum())
+        sim.reset(finished)
+    elapsed = time.perf_counter() - start
+    return {'boards': boards, 'steps': steps,
+            'placements_per_sec': placements / elapsed,
+            'games_per_sec': games / elapsed,
+            'lines_per_sec': lines / elapsed}
+
+
+def bench_render_frames(frames):
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    try:
+        return {'full_redraw': bench_render.measure(screen, True, frames),
+                'dirty_rects': bench_render.measure(screen, False, frames)}
+    finally:
+        pygame.quit()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(quick=False):
+    scale = 10 if quick else 1
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'shapes': len(SHAPES),
+        },
+        'results': {
+            'piece_placement': bench_piece_placement(50000 // scale),
+            'line_clears': bench_line_clears(50000 // scale),
+            'hard_drop_worst_case': bench_hard_drop(20000 // scale),
+            'batch_simulator': bench_batch_simulator(4096, 500 // scale),
+            'render_frame_ms': bench_render_frames(3000 // scale),
+            'packet_rates': bench_codec.run(200000 // scale),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', help='JSON file to write (default: stdout)')
+    parser.add_argument('--quick', action='store_true', help='10x fewer iterations')
+    args = parser.parse_args()
+
+    report = run(args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"Wrote {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Run autoplayer bots as network clients (opponent filler / traffic source).
+
+Run from the client directory:
+    python -m tools.bot_client [--bots N] [--keys-per-frame K] [--record 'bot{id}.trpl']
+
+Each bot binds an ephemeral port, connects like a normal client, plays a
+headless TetrisGame with the placement-search bot and sends its inputs
+and board updates at 60 Hz until the game ends or the server goes away.
+"""
+import argparse
+import time
+
+from game.bot import Autoplayer, PlacementSearch
+from game.clock import MonotonicClock
+from game.headless import create_headless_game
+from game.network import NetworkManager
+from game.replay import ReplayRecorder
+
+FRAME_TIME = 1 / 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bots', type=int, default=1)
+    parser.add_argument('--keys-per-frame', type=int, default=1,
+                        help='inputs issued per frame (0 = whole plan at once)')
+    parser.add_argument('--lookahead', action='store_true')
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--record', metavar='PATTERN',
+                        help='write a replay log per bot; {id} is replaced by the player id')
+    args = parser.parse_args()
+
+    search = PlacementSearch(lookahead=args.lookahead, budget_ms=FRAME_TIME * 1000)
+    bots = []
+    for i in range(args.bots):
+        network = NetworkManager('client1', threaded=False, client_port=0)
+        network.host = args.host or network.host
+        network.port = args.port or network.port
+        if not network.connect():
+            print(f"Bot {i + 1}: failed to connect")
+            continue
+        game = create_headless_game(clock=MonotonicClock(), network=network)
+        if args.record:
+            game.recorder = network.recorder = ReplayRecorder(
+                args.record.format(id=network.player_id), game.clock,
+                game.width, game.height, network.player_id)
+        bots.append((game, Autoplayer(search, args.keys_per_frame or None)))
+        print(f"Bot {i + 1} connected as player {network.player_id}")
+
+    started = set()
+    try:
+        while bots:
+            frame_start = time.monotonic()
+            for game, bot in list(bots):
+                network = game.network
+                network.poll()
+                if network.is_server_disconnected() or game.game_over:
+                    print(f"Player {network.player_id} finished with score {game.score}")
+                    network.disconnect()
+                    if game.recorder is not None:
+                        game.recorder.close(game.core)
+                    bots.remove((game, bot))
+                    continue
+                if not network.is_game_started():
+                    game.last_drop = game.clock.get_ticks()
+                    continue
+                if game not in started:
+                    started.add(game)
+                    game.start_round()
+                bot.act(game)
+                game.update()
+                network.flush_inputs()
+                network.send_board_state(game.board)
+            time.sleep(max(0.0, FRAME_TIME - (time.monotonic() - frame_start)))
+    except KeyboardInterrupt:
+        for game, _ in bots:
+            game.network.disconnect()
+            if game.recorder is not None:
+                game.recorder.close(game.core)
+    finally:
+        search.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""Asyncio UDP load generator for GameServer.
+
+Run from the client directory:
+    python -m tools.loadgen --clients 300 --duration 30 [--json report.json]
+
+Every simulated client binds an ephemeral port, performs the
+CONNECT_REQUEST/CONNECT_RESPONSE handshake and then streams MOVE_PIECE
+input commands (INPUT_COMMANDS) and BOARD_UPDATEs at the configured rates
+from a headless GameCore steered by PlacementSearch, so the traffic stays
+legal for the server's own simulation. Moves start once the room's
+GAME_START arrives and follow its shared 7-bag seed, like a real client
+(so clients left in a room that never fills send no moves). A client that
+tops out stops sending moves (the server board cannot be reset) and is
+counted.
+Because all clients live in one process, a sender's timestamp can be
+looked up by every receiver: the report has throughput, p50/p99
+sender->peer broadcast latency and loss estimated from sequence gaps.
+Against a server started with --authoritative, pass --authoritative too:
+peers then get the server's simulated boards with the server's own
+sequence numbers, which cannot be matched to a sender's BOARD_UPDATE, so
+board latency and loss are reported as null instead.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from game.bot import PlacementSearch
+from game.codec import HEADER, HEADER_SIZE
+from game.core import GameCore, SevenBag
+from game.input_stream import InputCommandSender, InputCommandReceiver
+from game.network import (NetworkManager, PacketType, BoardEncoder, BOARD_UPDATE_HEADER,
+                          CONNECT_RESPONSE, CONTROL_SEQ, GAME_START, GAME_START_SEED)
+
+SEND_TIME_SLOTS = 4096
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Stats:
+    """Shared by all clients: send timestamps, latencies and sequence tracking."""
+
+    def __init__(self, relayed_boards=True):
+        self.relayed_boards = relayed_boards  # False면 상대 보드가 서버 시뮬레이션 결과라 측정 불가
+        self.send_times = {}       # (kind, player_id) -> [(seq, t)] 링 버퍼
+        self.latency = {PacketType.BOARD_UPDATE: [], PacketType.INPUT_COMMANDS: []}
+        self.sent = {}
+        self.received = {}
+        self.bytes_received = 0
+        self.game_overs = 0
+        self.seq_windows = {}      # (kind, sender, receiver) -> [first, last, count]
+
+    def count(self, table, packet_type):
+        table[packet_type] = table.get(packet_type, 0) + 1
+
+    def record_send(self, kind, player_id, seq, now):
+        ring = self.send_times.get((kind, player_id))
+        if ring is None:
+            ring = self.send_times[(kind, player_id)] = [None] * SEND_TIME_SLOTS
+        ring[seq % SEND_TIME_SLOTS] = (seq, now)
+
+    def record_receive(self, kind, sender, receiver, seq, now):
+        ring = self.send_times.get((kind, sender))
+        entry = ring[seq % SEND_TIME_SLOTS] if ring else None
+        if entry and entry[0] == seq:
+            self.latency[kind].append(now - entry[1])
+        window = self.seq_windows.get((kind, sender, receiver))
+        if window is None:
+            self.seq_windows[(kind, sender, receiver)] = [seq, seq, 1]
+        else:
+            window[0] = min(window[0], seq)
+            window[1] = max(window[1], seq)
+            window[2] += 1
+
+    def loss(self, kind):
+        expected = received = 0
+        for (k, _, _), (first, last, count) in self.seq_windows.items():
+            if k == kind:
+                expected += last - first + 1
+                received += count
+        return None if not expected else max(0.0, 1 - received / expected)
+
+
+class LoadClient(asyncio.DatagramProtocol):
+    def __init__(self, stats, rng, search):
+        self.stats = stats
+        self.rng = rng
+        self.search = search
+        self.plan = []
+        self.transport = None
+        self.player_id = None
+        self.connected = asyncio.get_running_loop().create_future()
+        self.core = GameCore()
+        self.started = False  # GAME_START의 seed로 블록 순서를 맞춘 뒤에만 이동 전송
+        self.board_encoder = BoardEncoder()
+        self.inputs = InputCommandSender()
+        self.input_receiver = InputCommandReceiver()
+        self.buffer = bytearray(1024)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        now = time.perf_counter()
+        if len(data) < HEADER_SIZE:
+            return
+        packet_type, player_id = HEADER.unpack_from(data)
+        stats = self.stats
+        stats.bytes_received += len(data)
+        stats.count(stats.received, packet_type)
+
+        if packet_type == PacketType.CONNECT_RESPONSE:
+            # 확인하지 않으면 서버가 제어 패킷을 RTO마다 다시 보냄
+            if len(data) >= HEADER_SIZE + CONNECT_RESPONSE.size:
+                self.send_control_ack(CONNECT_RESPONSE.unpack_from(data, HEADER_SIZE)[1], player_id)
+            if not self.connected.done():
+                self.player_id = player_id
+                self.connected.set_result(player_id)
+        elif packet_type == PacketType.GAME_START:
+            offset = HEADER_SIZE + GAME_START.size + GAME_START_SEED.size
+            if len(data) >= offset + CONTROL_SEQ.size:
+                self.send_control_ack(CONTROL_SEQ.unpack_from(data, offset)[0], self.player_id)
+            if not self.started and len(data) >= offset:
+                seed, = GAME_START_SEED.unpack_from(data, HEADER_SIZE + GAME_START.size)
+                self.core.restart(SevenBag(seed))
+                self.plan = []
+                self.started = True
+        elif packet_type == PacketType.BOARD_ACK:
+            self.board_encoder.ack(BOARD_UPDATE_HEADER.unpack_from(data, HEADER_SIZE)[2])
+        elif packet_type == PacketType.INPUT_ACK:
+            self.inputs.ack(int.from_bytes(data[HEADER_SIZE:HEADER_SIZE + 4], 'little'))
+        elif (packet_type == PacketType.BOARD_UPDATE and player_id != self.player_id
+              and stats.relayed_boards):
+            seq = BOARD_UPDATE_HEADER.unpack_from(data, HEADER_SIZE)[2]
+            stats.record_receive(PacketType.BOARD_UPDATE, player_id, self.player_id, seq, now)
+        elif packet_type == PacketType.INPUT_COMMANDS and player_id != self.player_id:
+            payload = memoryview(data)[HEADER_SIZE:]
+            for command in self.input_receiver.accept(player_id, payload):
+                stats.record_receive(PacketType.INPUT_COMMANDS, player_id, self.player_id,
+                                     command[0], now)
+
+    def error_received(self, exc):
+        pass
+
+    def send(self, packet_type, payload_len):
+        HEADER.pack_into(self.buffer, 0, packet_type, self.player_id or 0)
+        self.transport.sendto(memoryview(self.buffer)[:HEADER_SIZE + payload_len])
+        self.stats.count(self.stats.sent, packet_type)
+
+    def send_control_ack(self, seq, player_id):
+        HEADER.pack_into(self.buffer, 0, PacketType.CONTROL_ACK, player_id or 0)
+        CONTROL_SEQ.pack_into(self.buffer, HEADER_SIZE, seq)
+        self.transport.sendto(memoryview(self.buffer)[:HEADER_SIZE + CONTROL_SEQ.size])
+        self.stats.count(self.stats.sent, PacketType.CONTROL_ACK)
+
+    async def connect(self, timeout, attempts=3):
+        for _ in range(attempts):
+            self.send(PacketType.CONNECT_REQUEST, 0)
+            try:
+                return await asyncio.wait_for(asyncio.shield(self.connected), timeout)
+            except asyncio.TimeoutError:
+                continue
+        return None
+
+    def plan_moves(self):
+        core = self.core
+        placement = self.search.best(core.board.rows, core.piece.kind)
+        if placement is None:
+            return ['drop']
+        dx = placement.x - core.x
+        return ['rotate'] * placement.rotation + [1 if dx > 0 else -1] * abs(dx) + ['drop']
+
+    def send_move(self):
+        """One key press of the current placement plan (like Autoplayer with keys_per_frame=1)."""
+        core = self.core
+        if not self.started or core.game_over:
+            return
+        if not self.plan:
+            self.plan = self.plan_moves()
+        action = self.plan.pop(0)
+        if action == 'rotate':
+            moved, move_type = core.rotate(), PacketType.ROTATE_PIECE
+        elif action == 'drop':
+            piece, x, y = core.piece, core.x, core.ghost_y()
+            core.hard_drop()
+            seq = self.inputs.push(PacketType.DROP_PIECE, piece.kind, x, y, piece.index)
+            self._send_inputs(seq)
+            if core.game_over:
+                self.stats.game_overs += 1
+            return
+        else:
+            moved, move_type = core.move(action), PacketType.MOVE_PIECE
+        if moved:
+            seq = self.inputs.push(move_type, core.piece.kind, core.x, core.y, core.piece.index)
+            self._send_inputs(seq)
+
+    def _send_inputs(self, seq):
+        length = self.inputs.encode_into(self.buffer, HEADER_SIZE)
+        if length:
+            self.stats.record_send(PacketType.INPUT_COMMANDS, self.player_id, seq, time.perf_counter())
+            self.send(PacketType.INPUT_COMMANDS, length)
+
+    def send_board(self):
+        length = self.board_encoder.encode_into(self.core.board.cells, self.buffer, HEADER_SIZE)
+        if length:
+            self.stats.record_send(PacketType.BOARD_UPDATE, self.player_id,
+                                   self.board_encoder.seq, time.perf_counter())
+            self.send(PacketType.BOARD_UPDATE, length)
+
+    async def stream(self, every, action, deadline):
+        if every <= 0:
+            return
+        next_time = time.perf_counter() + self.rng.random() * every
+        while next_time < deadline:
+            await asyncio.sleep(max(0.0, next_time - time.perf_counter()))
+            action()
+            next_time += every
+
+    def disconnect(self):
+        if self.player_id is not None:
+            self.send(PacketType.DISCONNECT, 0)
+        self.transport.close()
+
+
+async def run(args):
+    loop = asyncio.get_running_loop()
+    stats = Stats(relayed_boards=not args.authoritative)
+    rng = random.Random(args.seed)
+    search = PlacementSearch()
+    clients = []
+    for _ in range(args.clients):
+        _, client = await loop.create_datagram_endpoint(
+            lambda: LoadClient(stats, random.Random(rng.random()), search),
+            local_addr=('0.0.0.0', 0), remote_addr=(args.host, args.port))
+        clients.append(client)
+
+    # 연결 요청은 묶음 단위로 보내 서버 큐를 한 번에 넘치게 하지 않음
+    for i in range(0, len(clients), args.connect_batch):
+        await asyncio.gather(*(c.connect(args.connect_timeout)
+                               for c in clients[i:i + args.connect_batch]))
+    connected = [c for c in clients if c.player_id is not None]
+    print(f"Connected {len(connected)}/{len(clients)} clients")
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    tasks = []
+    for c in connected:
+        tasks.append(c.stream(1 / args.move_rate if args.move_rate else 0, c.send_move, deadline))
+        tasks.append(c.stream(1 / args.board_rate if args.board_rate else 0, c.send_board, deadline))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.5)  # 지연 도착분 수집
+
+    for c in clients:
+        c.disconnect()
+
+    def latency_ms(kind):
+        values = stats.latency[kind]
+        return {'samples': len(values),
+                'p50_ms': None if not values else percentile(values, 0.50) * 1000,
+                'p99_ms': None if not values else percentile(values, 0.99) * 1000}
+
+    names = {int(t): t.name for t in PacketType}
+    return {
+        'clients': len(clients),
+        'connected': len(connected),
+        'game_overs': stats.game_overs,
+        'duration_s': elapsed,
+        'sent_pps': sum(stats.sent.values()) / elapsed,
+        'received_pps': sum(stats.received.values()) / elapsed,
+        'received_bytes_per_s': stats.bytes_received / elapsed,
+        'sent': {names.get(k, str(k)): v for k, v in stats.sent.items()},
+        'received': {names.get(k, str(k)): v for k, v in stats.received.items()},
+        'board_update': dict(latency_ms(PacketType.BOARD_UPDATE),
+                             loss=stats.loss(PacketType.BOARD_UPDATE)),
+        'move_input': dict(latency_ms(PacketType.INPUT_COMMANDS),
+                           loss=stats.loss(PacketType.INPUT_COMMANDS)),
+    }
+
+
+def main():
+    # config.json의 서버 주소를 기본값으로 사용
+    defaults = NetworkManager._load_config(None)['client1']
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=defaults['host'])
+    parser.add_argument('--port', type=int, default=defaults['port'])
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--move-rate', type=float, default=10.0, help='moves per client per second')
+    parser.add_argument('--board-rate', type=float, default=60.0, help='board updates per client per second (unchanged boards are skipped like the real client)')
+    parser.add_argument('--connect-batch', type=int, default=50)
+    parser.add_argument('--connect-timeout', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--authoritative', action='store_true',
+                        help='the server relays its own simulated boards (board latency/loss not measured)')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Replay a binary game log at maximum speed (optionally rendered).
+
+Run from the client directory:
+    python -m tools.replay game.trpl [--render] [--realtime]
+
+The log is memory-mapped and applied record by record: SEED restarts the
+game on the recorded 7-bag, KEY and GRAVITY drive the local TetrisGame
+and PACKET datagrams go through NetworkManager.feed(), so opponent boards
+are rebuilt by the same code as in a live game. Nothing is sent. The
+final board is checked against the END record.
+"""
+import argparse
+import os
+import sys
+import time
+
+from game import replay
+from game.clock import ManualClock
+from game.core import SevenBag
+from game.network import NetworkManager
+from game.sync import board_hash
+
+RENDER_INTERVAL_MS = 16
+
+
+def create_game(log, render):
+    if not render:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from game.tetris import TetrisGame
+
+    screen = None
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((800, 600))
+        pygame.display.set_caption("Tetris - replay")
+    # 수신 스레드 없는 네트워크 매니저: connected=False라 아무것도 전송하지 않음
+    network = NetworkManager('client1', threaded=False, client_port=0)
+    network.player_id = log.player_id
+    game = TetrisGame(screen, network, log.width, log.height, clock=ManualClock())
+    return game, screen
+
+
+def play(log, game, render, realtime):
+    import pygame
+
+    counts = {}
+    end = None
+    last_frame = None
+    wall_start = time.perf_counter()
+    # 레코드 뷰와 반복자는 예외로 빠져나가도 해제해야 log.close()가 가능
+    records = iter(log)
+    try:
+        for record_type, time_ms, payload in records:
+            with payload:
+                counts[record_type] = counts.get(record_type, 0) + 1
+                game.clock.ticks = time_ms
+                if record_type == replay.SEED:
+                    game.core.restart(SevenBag(replay.SEED_PAYLOAD.unpack(payload)[0]))
+                elif record_type == replay.KEY:
+                    game.handle_key(replay.KEY_PAYLOAD.unpack(payload)[0])
+                elif record_type == replay.GRAVITY:
+                    game.gravity_tick()
+                elif record_type == replay.PACKET:
+                    game.network.feed(bytes(payload))
+                elif record_type == replay.END:
+                    end = replay.END_PAYLOAD.unpack(payload)
+
+            if render and (last_frame is None or time_ms - last_frame >= RENDER_INTERVAL_MS):
+                if last_frame is not None and realtime:
+                    time.sleep((time_ms - last_frame) / 1000)
+                last_frame = time_ms
+                pygame.event.pump()
+                game.render()
+    finally:
+        records.close()
+    return counts, end, time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log')
+    parser.add_argument('--render', action='store_true', help='draw the game while replaying')
+    parser.add_argument('--realtime', action='store_true',
+                        help='with --render, pace frames by the recorded timestamps')
+    args = parser.parse_args()
+
+    try:
+        log = replay.ReplayLog(args.log)
+    except ValueError as e:
+        sys.exit(str(e))
+    game, _ = create_game(log, args.render)
+    try:
+        counts, end, elapsed = play(log, game, args.render, args.realtime)
+    finally:
+        game.network.socket.close()
+        log.close()
+
+    total = sum(counts.values())
+    names = {replay.SEED: 'seed', replay.KEY: 'key', replay.GRAVITY: 'gravity',
+             replay.PACKET: 'packet', replay.END: 'end'}
+    print(f"{total} records in {elapsed * 1000:.1f} ms "
+          f"({total / elapsed if elapsed else 0:,.0f} records/s)")
+    print("  " + ", ".join(f"{names.get(k, k)}={v}" for k, v in sorted(counts.items())))
+    print(f"Final score {game.score}, lines {game.lines_cleared}, game over: {game.game_over}")
+    if end is None:
+        print("No END record (log was not closed); final state not verified")
+        return
+    result = (game.score, game.lines_cleared, board_hash(game.core.board.cells))
+    if result != end:
+        print(f"MISMATCH: replay {result} vs recorded {end}")
+        sys.exit(1)
+    print("Final state matches the recording")
+
+
+if __name__ == '__main__':
+    main()
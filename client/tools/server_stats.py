@@ -0,0 +1,202 @@
+"""Poll GameServer's STATS packet and print counters, rates and histograms.
+
+Run from the client directory on the server machine (the server only
+answers STATS requests from loopback addresses):
+    python -m tools.server_stats [--interval 1] [--count N] [--json]
+
+Every response holds cumulative counters since server start; rates are
+the difference between two polls. Histograms are log2 buckets, so the
+percentiles shown are bucket upper bounds. Lock wait histograms count
+uncontended acquisitions in bucket 0.
+"""
+import argparse
+import json
+import socket
+import struct
+import sys
+import time
+
+from game.codec import HEADER, HEADER_SIZE
+from game.network import NetworkManager, PacketType
+
+# server/src/server_stats.hpp의 ServerStatsSnapshot (version 2)과 같은 배치
+STATS_VERSION = 2
+PACKET_TYPES = 20
+BUCKETS = 16
+SNAPSHOT = struct.Struct(f'=II5Q{PACKET_TYPES}Q{PACKET_TYPES}Q')
+HISTOGRAM = struct.Struct(f'=QQ{BUCKETS}Q')
+HISTOGRAMS = (('batch_size', 0), ('handle_ns', 7),
+              ('room_lock_wait_ns', 7), ('directory_lock_wait_ns', 7))
+
+
+def type_name(index):
+    try:
+        return PacketType(index).name
+    except ValueError:
+        return 'OTHER' if index == 0 else str(index)
+
+
+def decode(data):
+    """ServerStatsSnapshot payload -> dict (None if the format is unknown)."""
+    values = SNAPSHOT.unpack_from(data)
+    if values[0] != STATS_VERSION:
+        return None
+    received = values[7:7 + PACKET_TYPES]
+    sent = values[7 + PACKET_TYPES:7 + 2 * PACKET_TYPES]
+    stats = {
+        'workers': values[1],
+        'uptime_ms': values[2],
+        'sessions': values[3],
+        'rooms': values[4],
+        'dropped_packets': values[5],
+        'invalid_moves': values[6],
+        'received': {type_name(i): n for i, n in enumerate(received) if n},
+        'sent': {type_name(i): n for i, n in enumerate(sent) if n},
+    }
+    offset = SNAPSHOT.size
+    for name, shift in HISTOGRAMS:
+        count, total, *buckets = HISTOGRAM.unpack_from(data, offset)
+        offset += HISTOGRAM.size
+        stats[name] = {'count': count, 'sum': total, 'shift': shift, 'buckets': buckets}
+    return stats
+
+
+def bucket_upper(index, shift):
+    """Exclusive upper bound of a bucket (None for the open-ended last one)."""
+    return None if index == BUCKETS - 1 else 1 << (index + shift)
+
+
+def percentile(histogram, fraction):
+    count = histogram['count']
+    if not count:
+        return None
+    target = count * fraction
+    seen = 0
+    for i, n in enumerate(histogram['buckets']):
+        seen += n
+        if seen >= target:
+            return bucket_upper(i, histogram['shift'])
+    return None
+
+
+def diff_histogram(new, old):
+    if old is None:
+        return new
+    return {'count': new['count'] - old['count'], 'sum': new['sum'] - old['sum'],
+            'shift': new['shift'],
+            'buckets': [a - b for a, b in zip(new['buckets'], old['buckets'])]}
+
+
+def summarize(histogram):
+    count = histogram['count']
+    p50, p99 = percentile(histogram, 0.5), percentile(histogram, 0.99)
+    return {'count': count,
+            'mean': histogram['sum'] / count if count else None,
+            'p50_le': p50, 'p99_le': p99,
+            'zero_fraction': histogram['buckets'][0] / count if count else None}
+
+
+def query(sock, address, timeout):
+    sock.settimeout(timeout)
+    sock.sendto(HEADER.pack(PacketType.STATS, 0), address)
+    while True:
+        data = sock.recv(2048)
+        if len(data) >= HEADER_SIZE and HEADER.unpack_from(data)[0] == PacketType.STATS:
+            return decode(memoryview(data)[HEADER_SIZE:])
+
+
+def report(stats, previous, elapsed):
+    """Derived view: rates and histogram summaries over the last interval (or since start)."""
+    def rates(key):
+        old = previous[key] if previous else {}
+        return {name: (n - old.get(name, 0)) / elapsed for name, n in stats[key].items()}
+
+    result = {key: stats[key] for key in ('workers', 'uptime_ms', 'sessions', 'rooms',
+                                          'dropped_packets', 'invalid_moves')}
+    result['received_per_s'] = rates('received')
+    result['sent_per_s'] = rates('sent')
+    for name, _ in HISTOGRAMS:
+        result[name] = summarize(diff_histogram(stats[name], previous and previous[name]))
+    return result
+
+
+def fmt_ns(value):
+    if value is None:
+        return '-'
+    if value >= 1e6:
+        return f'{value / 1e6:.1f}ms'
+    if value >= 1e3:
+        return f'{value / 1e3:.1f}us'
+    return f'{value:.0f}ns'
+
+
+def print_report(result):
+    print(f"uptime {result['uptime_ms'] / 1000:.0f}s  workers {result['workers']}  "
+          f"sessions {result['sessions']}  rooms {result['rooms']}  "
+          f"dropped {result['dropped_packets']}  invalid moves {result['invalid_moves']}")
+    for direction in ('received_per_s', 'sent_per_s'):
+        items = sorted(result[direction].items(), key=lambda item: -item[1])
+        print(f"  {direction[:-6]:>8}/s: " + ", ".join(f"{k} {v:,.0f}" for k, v in items if v >= 0.5))
+    batch = result['batch_size']
+    if batch['count']:
+        print(f"  recv batch: {batch['count']} batches, mean {batch['mean']:.1f} packets, "
+              f"p99 <{batch['p99_le'] or '-'}")
+    for name, label in (('handle_ns', 'handle'), ('room_lock_wait_ns', 'room lock'),
+                        ('directory_lock_wait_ns', 'directory lock')):
+        h = result[name]
+        if not h['count']:
+            continue
+        line = f"  {label}: {h['count']} samples, mean {fmt_ns(h['mean'])}, " \
+               f"p50 <{fmt_ns(h['p50_le'])}, p99 <{fmt_ns(h['p99_le'])}"
+        if name != 'handle_ns':
+            line += f", contended {1 - h['zero_fraction']:.2%}"
+        print(line)
+
+
+def main():
+    defaults = NetworkManager._load_config(None)['client1']
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=defaults['port'])
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--count', type=int, default=0, help='number of polls (0 = until Ctrl+C)')
+    parser.add_argument('--timeout', type=float, default=1.0)
+    parser.add_argument('--json', action='store_true',
+                        help='print one JSON object per poll (raw counters + derived rates)')
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = (args.host, args.port)
+    previous = None
+    last_time = None
+    polls = 0
+    try:
+        while True:
+            try:
+                stats = query(sock, address, args.timeout)
+            except socket.timeout:
+                print("No STATS response (server down, or not a loopback address?)", file=sys.stderr)
+                sys.exit(1)
+            if stats is None:
+                print("Unknown STATS format version", file=sys.stderr)
+                sys.exit(1)
+            now = time.monotonic()
+            elapsed = (now - last_time) if last_time else max(stats['uptime_ms'] / 1000, 1e-3)
+            result = report(stats, previous, elapsed)
+            if args.json:
+                print(json.dumps({'raw': stats, 'interval': result}), flush=True)
+            else:
+                print_report(result)
+            previous, last_time = stats, now
+            polls += 1
+            if args.count and polls >= args.count:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""Spectator relay: one room subscription on GameServer, fanned out to many viewers.
+
+Run from the client directory (spectators run `python spectate.py --host RELAY_HOST`):
+    python -m tools.spectator_relay [--room 0] [--tick 20] [--listen-port 12348]
+                                    [--server-host 127.0.0.1] [--server-port 12345]
+
+The relay subscribes to a room once (SUBSCRIBE, refreshed every few
+seconds) and rebuilds every player's board from the relayed
+INPUT_COMMANDS, keyframes and BOARD_HASH checks, like a player client
+does for its opponents. Nothing is forwarded as it arrives: every tick
+(--tick per second) it encodes the latest board of each player that
+changed as one BoardEncoder delta against the previous tick, and sends
+that one packet to every spectator, plus PLAYER_SCORES when a score or
+game-over flag changed. The server's load therefore does not depend on
+the number of viewers, and a viewer gets at most one board per player
+per tick however fast the match is.
+
+A spectator that joins (or lost a delta and asks again with
+SUBSCRIBE_FLAG_KEYFRAMES) gets GAME_START, PLAYER_SCORES and a keyframe
+per player at the current tick's sequence, so the next tick's deltas
+apply on top of it. Spectators that stop refreshing their subscription
+for SPECTATOR_TIMEOUT seconds are dropped. --room 0 follows the lowest
+running room and moves on to the next one when it ends.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from game.codec import HEADER, HEADER_SIZE
+from game.input_stream import InputCommandReceiver
+from game.network import (NetworkManager, PacketType, BoardEncoder, BoardDecoder,
+                          BOARD_UPDATE_HEADER, BOARD_FORMAT_VERSION, BOARD_FLAG_KEYFRAME,
+                          GAME_START, GAME_START_SEED, ROOM_CAPACITY, SUBSCRIBE,
+                          SUBSCRIBE_FLAG_KEYFRAMES, PLAYER_SCORES_HEADER, PLAYER_SCORE,
+                          PLAYER_FLAG_GAME_OVER)
+from game.spectator import RELAY_PORT
+from game.sync import OpponentSimulator, BOARD_HASH
+
+SPECTATOR_TIMEOUT = 10.0  # game.spectator.SpectatorClient는 2초마다 갱신
+SEARCH_INTERVAL = 0.5     # 구독할 방을 찾는 동안의 SUBSCRIBE 간격
+REFRESH_INTERVAL = 2.0    # 서버 구독 유지 (서버는 10초 뒤 해지)
+RESYNC_RETRY = 0.5
+
+
+def scores_packet(scores):
+    """PLAYER_SCORES packet for [(player_id, score, lines, flags), ...]."""
+    return (HEADER.pack(PacketType.PLAYER_SCORES, 0) + PLAYER_SCORES_HEADER.pack(len(scores))
+            + b''.join(PLAYER_SCORE.pack(*entry) for entry in scores))
+
+
+def keyframe_payload(rows, seq):
+    """Keyframe BOARD_UPDATE payload for packed rows, reusing the stream's sequence number."""
+    changed = np.flatnonzero(rows)
+    row_mask = sum(1 << int(i) for i in changed)
+    return (BOARD_UPDATE_HEADER.pack(BOARD_FORMAT_VERSION, BOARD_FLAG_KEYFRAME, seq, seq, 0, row_mask)
+            + rows[changed].astype(np.uint32).tobytes())
+
+
+class Match:
+    """Boards and scores of one subscribed room, rebuilt like a client rebuilds opponents."""
+
+    def __init__(self, room_id, player_ids, seed):
+        self.room_id = room_id
+        self.player_ids = player_ids
+        self.start_packet = (HEADER.pack(PacketType.GAME_START, 0)
+                             + GAME_START.pack(room_id, len(player_ids),
+                                               *(player_ids + [0] * (ROOM_CAPACITY - len(player_ids))))
+                             + GAME_START_SEED.pack(seed))
+        self.sims = {pid: OpponentSimulator(seed) for pid in player_ids}
+        self.decoders = {pid: BoardDecoder() for pid in player_ids}
+        self.receiver = InputCommandReceiver()
+        # 관전자 전체가 공유하는 스트림: 틱마다 직전 틱 대비 델타
+        self.encoders = {pid: BoardEncoder() for pid in player_ids}
+        self.loaded = set()  # 키프레임을 받은 플레이어 (그 전의 복원 보드는 믿을 수 없음)
+        self.sent_scores = None
+
+    def load_board(self, player_id, payload):
+        """Apply a BOARD_UPDATE from the server; keyframes always replace the board."""
+        if len(payload) < BOARD_UPDATE_HEADER.size:
+            return
+        _, flags, _, _, input_seq, _ = BOARD_UPDATE_HEADER.unpack_from(payload)
+        decoder = self.decoders[player_id]
+        if flags & BOARD_FLAG_KEYFRAME:
+            # 스냅샷 키프레임은 서버 시퀀스가 그대로라 기존 기록보다 새롭지 않을 수 있음
+            decoder = self.decoders[player_id] = BoardDecoder()
+        if decoder.apply(payload):
+            self.sims[player_id].load(decoder.board(), input_seq)
+            self.loaded.add(player_id)
+
+    def set_scores(self, payload):
+        if len(payload) < PLAYER_SCORES_HEADER.size:
+            return
+        count, = PLAYER_SCORES_HEADER.unpack_from(payload)
+        if count > ROOM_CAPACITY or len(payload) < PLAYER_SCORES_HEADER.size + count * PLAYER_SCORE.size:
+            return
+        for i in range(count):
+            player_id, score, lines, _ = PLAYER_SCORE.unpack_from(
+                payload, PLAYER_SCORES_HEADER.size + i * PLAYER_SCORE.size)
+            sim = self.sims.get(player_id)
+            if sim is not None:
+                core = sim.core
+                core.score, core.lines_cleared = score, lines
+                core.level = lines // 10 + 1
+
+    def scores(self):
+        result = []
+        for pid in self.player_ids:
+            core = self.sims[pid].core
+            flags = PLAYER_FLAG_GAME_OVER if core.game_over else 0
+            result.append((pid, core.score, core.lines_cleared, flags))
+        return result
+
+    def tick(self):
+        """Packets for this tick: one delta per changed board, PLAYER_SCORES if they changed."""
+        packets = []
+        for pid in self.player_ids:
+            if pid not in self.loaded:
+                continue
+            encoder = self.encoders[pid]
+            payload = encoder.encode(self.sims[pid].core.board.cells)
+            if payload is None:
+                continue
+            encoder.ack(encoder.seq)  # 다음 틱 델타의 기준 (놓친 관전자는 키프레임 요청)
+            packets.append(HEADER.pack(PacketType.BOARD_UPDATE, pid) + payload)
+        scores = self.scores()
+        if scores != self.sent_scores:
+            self.sent_scores = scores
+            packets.append(scores_packet(scores))
+        return packets
+
+    def snapshot(self):
+        """GAME_START, scores and a keyframe per player for a joining spectator."""
+        packets = [self.start_packet, scores_packet(self.scores())]
+        for pid in self.player_ids:
+            encoder = self.encoders[pid]
+            if encoder.last_rows is not None:
+                packets.append(HEADER.pack(PacketType.BOARD_UPDATE, pid)
+                               + keyframe_payload(encoder.last_rows, encoder.seq))
+        return packets
+
+
+class _Upstream(asyncio.DatagramProtocol):
+    """Socket subscribed to the server; everything it receives goes to the relay."""
+
+    def __init__(self, relay):
+        self.relay = relay
+
+    def datagram_received(self, data, addr):
+        self.relay.server_packet(data)
+
+    def error_received(self, exc):
+        pass  # 서버가 아직 없을 때의 ICMP 오류: 다음 SUBSCRIBE로 다시 시도
+
+
+class SpectatorRelay(asyncio.DatagramProtocol):
+    """Spectator-facing listen socket plus the room subscription and tick loop."""
+
+    def __init__(self, room_id, tick_rate, max_spectators):
+        self.room_id = room_id  # 0: 진행 중인 방을 따라감
+        self.tick_interval = 1 / tick_rate
+        self.max_spectators = max_spectators
+        self.spectators = {}  # 주소 -> 만료 시각
+        self.match = None
+        self.finished = None  # 고정 방이 끝나면 설정되는 Future
+        self.transport = None
+        self.upstream = None
+        self.loop = None
+        self.last_subscribe = 0.0
+        self.last_resync = 0.0
+        self.counts = {'upstream': 0, 'fanout': 0, 'fanout_bytes': 0, 'snapshots': 0}
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_running_loop()
+        self.finished = self.loop.create_future()
+
+    def error_received(self, exc):
+        pass
+
+    # --- 서버 쪽 ---
+
+    def subscribe(self, keyframes=False):
+        self.last_subscribe = time.monotonic()
+        room_id = self.match.room_id if self.match else self.room_id
+        flags = SUBSCRIBE_FLAG_KEYFRAMES if keyframes else 0
+        self.upstream.sendto(HEADER.pack(PacketType.SUBSCRIBE, 0) + SUBSCRIBE.pack(room_id, flags))
+
+    def request_resync(self):
+        now = time.monotonic()
+        if now - self.last_resync >= RESYNC_RETRY:
+            self.last_resync = now
+            self.subscribe(keyframes=True)
+
+    def server_packet(self, data):
+        if len(data) < HEADER_SIZE:
+            return
+        self.counts['upstream'] += 1
+        packet_type, player_id = HEADER.unpack_from(data)
+        payload = memoryview(data)[HEADER_SIZE:]
+        match = self.match
+
+        if packet_type == PacketType.GAME_START:
+            if len(payload) < GAME_START.size + GAME_START_SEED.size:
+                return
+            room_id, count, *player_ids = GAME_START.unpack_from(payload)
+            if not 0 < count <= ROOM_CAPACITY or (match and match.room_id == room_id):
+                return  # KEYFRAMES 요청에 딸려 온 같은 방의 GAME_START
+            seed, = GAME_START_SEED.unpack_from(payload, GAME_START.size)
+            self.match = Match(room_id, sorted(player_ids[:count]), seed)
+            print(f"Relaying room {room_id} (players {self.match.player_ids}) "
+                  f"to {len(self.spectators)} spectators", flush=True)
+            for packet in self.match.snapshot():
+                self.fan_out(packet)
+            return
+
+        if packet_type == PacketType.DISCONNECT:
+            # 구독한 방이 끝남
+            if match is not None:
+                print(f"Room {match.room_id} is over", flush=True)
+                self.match = None
+                self.fan_out(HEADER.pack(PacketType.DISCONNECT, 0))
+            if self.room_id and not self.finished.done():
+                self.finished.set_result(None)
+            return
+
+        if match is None or (player_id not in match.sims and packet_type != PacketType.PLAYER_SCORES):
+            return
+        if packet_type == PacketType.INPUT_COMMANDS:
+            sim = match.sims[player_id]
+            for command in match.receiver.accept(player_id, payload):
+                sim.apply(command)
+            if sim.desynced:
+                self.request_resync()
+        elif packet_type == PacketType.BOARD_UPDATE:
+            match.load_board(player_id, payload)
+        elif packet_type == PacketType.BOARD_HASH:
+            if len(payload) >= BOARD_HASH.size:
+                if match.sims[player_id].check_hash(*BOARD_HASH.unpack_from(payload)) is False:
+                    self.request_resync()
+        elif packet_type == PacketType.PLAYER_SCORES:
+            match.set_scores(payload)
+
+    # --- 관전자 쪽 ---
+
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER_SIZE:
+            return
+        packet_type, _ = HEADER.unpack_from(data)
+        if packet_type == PacketType.SUBSCRIBE:
+            flags = SUBSCRIBE.unpack_from(data, HEADER_SIZE)[1] if len(data) >= HEADER_SIZE + SUBSCRIBE.size else 0
+            joined = addr not in self.spectators
+            if joined and len(self.spectators) >= self.max_spectators:
+                return
+            self.spectators[addr] = time.monotonic() + SPECTATOR_TIMEOUT
+            if self.match is not None and (joined or flags & SUBSCRIBE_FLAG_KEYFRAMES):
+                self.counts['snapshots'] += 1
+                for packet in self.match.snapshot():
+                    self.transport.sendto(packet, addr)
+        elif packet_type == PacketType.DISCONNECT:
+            self.spectators.pop(addr, None)
+
+    def fan_out(self, packet):
+        sendto = self.transport.sendto
+        for addr in self.spectators:
+            sendto(packet, addr)
+        self.counts['fanout'] += len(self.spectators)
+        self.counts['fanout_bytes'] += len(self.spectators) * len(packet)
+
+    def expire_spectators(self):
+        now = time.monotonic()
+        for addr in [a for a, expires in self.spectators.items() if expires < now]:
+            del self.spectators[addr]
+
+    async def run(self, report):
+        """Tick loop: fan out the latest state, keep the subscription alive, drop idle spectators."""
+        loop = self.loop
+        next_tick = loop.time()
+        next_report = loop.time() + report if report else None
+        last_counts = dict(self.counts)
+        while not self.finished.done():
+            now = time.monotonic()
+            interval = REFRESH_INTERVAL if self.match else SEARCH_INTERVAL
+            if now - self.last_subscribe >= interval:
+                self.subscribe()
+            self.expire_spectators()
+            if self.match is not None:
+                for packet in self.match.tick():
+                    self.fan_out(packet)
+
+            if next_report is not None and loop.time() >= next_report:
+                rates = {k: (v - last_counts[k]) / report for k, v in self.counts.items()}
+                last_counts = dict(self.counts)
+                next_report += report
+                room = self.match.room_id if self.match else '-'
+                print(f"room {room}  spectators {len(self.spectators)}  "
+                      f"upstream {rates['upstream']:.0f} pkt/s  "
+                      f"fan-out {rates['fanout']:.0f} pkt/s ({rates['fanout_bytes'] / 1024:.1f} KiB/s)  "
+                      f"snapshots {rates['snapshots']:.1f}/s", flush=True)
+
+            # 틱 시각을 누적해 밀리지 않게 하고, 오래 멈췄으면 현재 시각에서 다시 시작
+            next_tick += self.tick_interval
+            delay = next_tick - loop.time()
+            if delay < -self.tick_interval:
+                next_tick, delay = loop.time(), 0
+            try:
+                await asyncio.wait_for(asyncio.shield(self.finished), max(0.0, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    def close(self):
+        self.fan_out(HEADER.pack(PacketType.DISCONNECT, 0))
+        if self.upstream is not None:
+            self.upstream.sendto(HEADER.pack(PacketType.DISCONNECT, 0))
+            self.upstream.close()
+        self.transport.close()
+
+
+async def start_relay(listen_addr, server_addr, room_id=0, tick_rate=20, max_spectators=1000):
+    """Bind the spectator socket and the server subscription; returns the SpectatorRelay."""
+    loop = asyncio.get_running_loop()
+    _, relay = await loop.create_datagram_endpoint(
+        lambda: SpectatorRelay(room_id, tick_rate, max_spectators), local_addr=listen_addr)
+    relay.upstream, _ = await loop.create_datagram_endpoint(
+        lambda: _Upstream(relay), remote_addr=server_addr)
+    return relay
+
+
+async def run(args):
+    relay = await start_relay((args.listen_host, args.listen_port),
+                              (args.server_host, args.server_port),
+                              args.room, args.tick, args.max_spectators)
+    room = f"room {args.room}" if args.room else "the running room"
+    print(f"Relaying {room} of {args.server_host}:{args.server_port} to spectators on "
+          f"{args.listen_host}:{args.listen_port} at {args.tick:g} Hz", flush=True)
+    try:
+        await relay.run(args.report)
+    finally:
+        relay.close()
+
+
+def main():
+    # config.json의 서버 주소를 기본값으로 사용
+    defaults = NetworkManager._load_config(None)['client1']
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server-host', default=defaults['host'])
+    parser.add_argument('--server-port', type=int, default=defaults['port'])
+    parser.add_argument('--room', type=int, default=0,
+                        help='room to relay (0 = follow the lowest running room)')
+    parser.add_argument('--listen-host', default='0.0.0.0')
+    parser.add_argument('--listen-port', type=int, default=RELAY_PORT)
+    parser.add_argument('--tick', type=float, default=20.0, help='spectator updates per second')
+    parser.add_argument('--max-spectators', type=int, default=1000)
+    parser.add_argument('--report', type=float, default=5.0,
+                        help='print counters every N seconds (0 = never)')
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
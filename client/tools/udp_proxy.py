@@ -0,0 +1,201 @@
+"""Asyncio UDP proxy that injects latency, jitter, loss, duplication and reordering.
+
+Run from the client directory next to the server:
+    python -m tools.udp_proxy [--listen-port 12346] [--latency 40] [--jitter 10]
+                              [--loss 2] [--duplicate 1] [--reorder 5] [--seed 1]
+
+Point the clients at the proxy by setting "port" (and "host", if the proxy
+runs elsewhere) in config.json to the listen address; the proxy forwards
+to the real GameServer at --server-host/--server-port. Every client
+address gets its own upstream socket, so the server still sees one
+address per player.
+
+Impairments apply per direction (client->server and server->client), so
+--latency 40 adds 80 ms to a round trip. Each datagram is dropped with
+probability --loss percent, otherwise delayed by latency plus a uniform
+jitter in [-jitter, +jitter] (which can reorder on its own), held back an
+extra --reorder-delay ms with probability --reorder percent so later
+packets overtake it, and sent twice with probability --duplicate percent
+(the copy 1 ms later). --seed makes the impairment sequence repeatable.
+"""
+import argparse
+import asyncio
+import random
+
+DEFAULT_LISTEN_PORT = 12346
+DEFAULT_SERVER_PORT = 12345  # server/src/main.cpp
+
+
+class Impairment:
+    """Random impairment of one direction of traffic."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, loss=0.0, duplicate=0.0,
+                 reorder=0.0, reorder_delay_ms=20.0, rng=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss / 100
+        self.duplicate = duplicate / 100
+        self.reorder = reorder / 100
+        self.reorder_delay = reorder_delay_ms / 1000
+        self.rng = rng or random.Random()
+        self.counts = {'forwarded': 0, 'dropped': 0, 'duplicated': 0, 'reordered': 0}
+
+    @classmethod
+    def from_args(cls, args, rng):
+        return cls(args.latency, args.jitter, args.loss, args.duplicate,
+                   args.reorder, args.reorder_delay, rng)
+
+    def delays(self):
+        """Send delays (seconds) for one datagram: [] if dropped, two entries if duplicated."""
+        rng = self.rng
+        if rng.random() < self.loss:
+            self.counts['dropped'] += 1
+            return []
+        delay = self.latency
+        if self.jitter:
+            delay += rng.uniform(-self.jitter, self.jitter)
+        if rng.random() < self.reorder:
+            delay += self.reorder_delay
+            self.counts['reordered'] += 1
+        delay = max(0.0, delay)
+        self.counts['forwarded'] += 1
+        if rng.random() < self.duplicate:
+            self.counts['duplicated'] += 1
+            return [delay, delay + 0.001]
+        return [delay]
+
+
+def _schedule(loop, impairment, send, data, *args):
+    # 지연 0은 call_later를 거치지 않고 바로 전송 (프록시 자체 지연 최소화)
+    for delay in impairment.delays():
+        if delay <= 0:
+            send(data, *args)
+        else:
+            loop.call_later(delay, send, data, *args)
+
+
+class _Upstream(asyncio.DatagramProtocol):
+    """Server-facing socket of one client; replies go back through the listen socket."""
+
+    def __init__(self, proxy, client_addr):
+        self.proxy = proxy
+        self.client_addr = client_addr
+        self.transport = None
+        self.backlog = []  # 소켓이 열리기 전에 도착한 datagram
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        proxy = self.proxy
+        _schedule(proxy.loop, proxy.downstream, proxy.reply, data, self.client_addr)
+
+    def error_received(self, exc):
+        pass  # 서버가 아직 없을 때의 ICMP 오류는 무시 (UDP이므로 재전송은 클라이언트 몫)
+
+
+class ImpairmentProxy(asyncio.DatagramProtocol):
+    """Client-facing listen socket; one _Upstream per client address."""
+
+    def __init__(self, server_addr, upstream, downstream):
+        self.server_addr = server_addr
+        self.upstream = upstream      # client -> server Impairment
+        self.downstream = downstream  # server -> client Impairment
+        self.clients = {}
+        self.transport = None
+        self.loop = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_running_loop()
+
+    def datagram_received(self, data, addr):
+        client = self.clients.get(addr)
+        if client is None:
+            client = self.clients[addr] = _Upstream(self, addr)
+            self.loop.create_task(self._open(client))
+        if client.transport is None:
+            client.backlog.append(data)  # 소켓이 준비되면 순서대로 보냄
+            return
+        _schedule(self.loop, self.upstream, client.transport.sendto, data)
+
+    async def _open(self, client):
+        await self.loop.create_datagram_endpoint(lambda: client, remote_addr=self.server_addr)
+        for data in client.backlog:
+            _schedule(self.loop, self.upstream, client.transport.sendto, data)
+        client.backlog = []
+
+    def reply(self, data, client_addr):
+        if self.transport is not None:
+            self.transport.sendto(data, client_addr)
+
+    def error_received(self, exc):
+        pass
+
+    def close(self):
+        for client in self.clients.values():
+            if client.transport is not None:
+                client.transport.close()
+        self.transport.close()
+
+
+async def start_proxy(listen_addr, server_addr, upstream, downstream):
+    """Bind the listen socket and return the running ImpairmentProxy."""
+    loop = asyncio.get_running_loop()
+    _, proxy = await loop.create_datagram_endpoint(
+        lambda: ImpairmentProxy(server_addr, upstream, downstream), local_addr=listen_addr)
+    return proxy
+
+
+def add_impairment_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.0, help='one-way delay (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='+/- uniform delay variation (ms)')
+    parser.add_argument('--loss', type=float, default=0.0, help='drop probability (%%)')
+    parser.add_argument('--duplicate', type=float, default=0.0, help='duplicate probability (%%)')
+    parser.add_argument('--reorder', type=float, default=0.0,
+                        help='probability (%%) of holding a datagram back by --reorder-delay')
+    parser.add_argument('--reorder-delay', type=float, default=20.0, help='hold-back time (ms)')
+    parser.add_argument('--seed', type=int, help='random seed for a repeatable impairment sequence')
+
+
+def describe(args):
+    return (f"latency {args.latency:g}±{args.jitter:g} ms, loss {args.loss:g}%, "
+            f"duplicate {args.duplicate:g}%, reorder {args.reorder:g}% (+{args.reorder_delay:g} ms)")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    proxy = await start_proxy((args.listen_host, args.listen_port),
+                              (args.server_host, args.server_port),
+                              Impairment.from_args(args, rng), Impairment.from_args(args, rng))
+    print(f"Proxy {args.listen_host}:{args.listen_port} -> {args.server_host}:{args.server_port}: "
+          f"{describe(args)} each way")
+    try:
+        while True:
+            await asyncio.sleep(args.report or 3600)
+            if args.report:
+                print(f"clients {len(proxy.clients)}  up {proxy.upstream.counts}  "
+                      f"down {proxy.downstream.counts}", flush=True)
+    finally:
+        proxy.close()
+        print(f"up {proxy.upstream.counts}\ndown {proxy.downstream.counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listen-host', default='127.0.0.1')
+    parser.add_argument('--listen-port', type=int, default=DEFAULT_LISTEN_PORT)
+    parser.add_argument('--server-host', default='127.0.0.1')
+    parser.add_argument('--server-port', type=int, default=DEFAULT_SERVER_PORT)
+    parser.add_argument('--report', type=float, default=0.0,
+                        help='print counters every N seconds (0 = only on exit)')
+    add_impairment_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2,87 +2,741 @@
 #include <iostream>
 #include <cstring>
 #include <unistd.h>
+#include <fcntl.h>
+#include <sys/epoll.h>
+#include <sys/eventfd.h>
 #include <string>
+#include <algorithm>
+#include <cstdlib>
+#include <random>
+#include <thread>
 
-// GameState 구현
-GameState::GameState() : board(BOARD_HEIGHT, std::vector<int>(BOARD_WIDTH, 0)) {}
-
-bool GameState::isValidMove(const TetrisPiece& piece, int x, int y) const {
-    for (size_t i = 0; i < piece.shape.size(); ++i) {
-        for (size_t j = 0; j < piece.shape[i].size(); ++j) {
-            if (piece.shape[i][j]) {
-                int new_x = x + j;
-                int new_y = y + i;
-                if (new_x < 0 || new_x >= BOARD_WIDTH || 
-                    new_y < 0 || new_y >= BOARD_HEIGHT ||
-                    board[new_y][new_x]) {
-                    return false;
+// PieceTable 구현
+namespace {
+
+struct ShapeDef {
+    int height;
+    int width;
+    int cells[2][4];
+};
+
+// 클라이언트 game/core.py의 SHAPES와 같은 순서
+const ShapeDef SHAPES[PIECE_KINDS] = {
+    {1, 4, {{1, 1, 1, 1}}},              // I
+    {2, 3, {{2, 0, 0}, {2, 2, 2}}},      // J
+    {2, 3, {{0, 0, 3}, {3, 3, 3}}},      // L
+    {2, 2, {{4, 4}, {4, 4}}},            // O
+    {2, 3, {{0, 5, 5}, {5, 5, 0}}},      // S
+    {2, 3, {{0, 6, 0}, {6, 6, 6}}},      // T
+    {2, 3, {{7, 7, 0}, {0, 7, 7}}},      // Z
+};
+
+}  // namespace
+
+PieceTable::PieceTable() {
+    for (int kind = 0; kind < PIECE_KINDS; ++kind) {
+        int grid[4][4] = {};
+        int height = SHAPES[kind].height;
+        int width = SHAPES[kind].width;
+        for (int i = 0; i < height; ++i) {
+            for (int j = 0; j < width; ++j) {
+                grid[i][j] = SHAPES[kind].cells[i][j];
+            }
+        }
+
+        for (int r = 0; r < PIECE_ROTATIONS; ++r) {
+            PieceRotation& rotation = rotations[kind][r];
+            rotation.color = static_cast<uint8_t>(kind + 1);
+            rotation.width = width;
+            rotation.height = height;
+            rotation.cell_count = 0;
+            int first_row = -1, last_row = -1, min_col = width, max_col = -1;
+            for (int i = 0; i < height; ++i) {
+                for (int j = 0; j < width; ++j) {
+                    if (grid[i][j]) {
+                        rotation.cells[rotation.cell_count][0] = static_cast<int8_t>(i);
+                        rotation.cells[rotation.cell_count][1] = static_cast<int8_t>(j);
+                        ++rotation.cell_count;
+                        if (first_row < 0) first_row = i;
+                        last_row = i;
+                        min_col = std::min(min_col, j);
+                        max_col = std::max(max_col, j);
+                    }
+                }
+            }
+            rotation.top = first_row;
+            rotation.row_count = last_row - first_row + 1;
+            for (int i = 0; i < 4; ++i) {
+                rotation.masks[i] = 0;
+            }
+            for (int c = 0; c < rotation.cell_count; ++c) {
+                rotation.masks[rotation.cells[c][0] - first_row] |= 1u << rotation.cells[c][1];
+            }
+            rotation.min_x = -min_col;
+            rotation.max_x = BOARD_COLS - 1 - max_col;
+
+            // 시계 방향 회전 (클라이언트 rotate_shape와 동일: new[j][i] = old[h-1-i][j])
+            int rotated[4][4] = {};
+            for (int i = 0; i < height; ++i) {
+                for (int j = 0; j < width; ++j) {
+                    rotated[j][height - 1 - i] = grid[i][j];
                 }
             }
+            memcpy(grid, rotated, sizeof(grid));
+            std::swap(width, height);
+        }
+    }
+}
+
+const PieceTable& PieceTable::instance() {
+    static const PieceTable table;
+    return table;
+}
+
+const PieceRotation* PieceTable::get(int kind, int rotation) const {
+    if (kind < 0 || kind >= PIECE_KINDS || rotation < 0 || rotation >= PIECE_ROTATIONS) {
+        return nullptr;
+    }
+    return &rotations[kind][rotation];
+}
+
+// SevenBag 구현
+SevenBag::SevenBag(uint32_t seed) : state(seed ? seed : 0x9E3779B9u), bag{}, taken(PIECE_KINDS) {}
+
+uint32_t SevenBag::nextRandom() {
+    state ^= state << 13;
+    state ^= state >> 17;
+    state ^= state << 5;
+    return state;
+}
+
+int SevenBag::next() {
+    if (taken == PIECE_KINDS) {
+        for (int i = 0; i < PIECE_KINDS; ++i) {
+            bag[i] = i;
+        }
+        for (int i = PIECE_KINDS - 1; i > 0; --i) {
+            int j = static_cast<int>(nextRandom() % static_cast<uint32_t>(i + 1));
+            std::swap(bag[i], bag[j]);
+        }
+        taken = 0;
+    }
+    return bag[taken++];
+}
+
+// GameState 구현
+GameState::GameState()
+    : occupancy{}, colors{}, active{false, 0, 0, 0, 0}, dirty(false),
+      board_seq(0), score(0), lines_cleared(0), level(1) {}
+
+void GameState::start(uint32_t seed) {
+    bag = SevenBag(seed);
+    spawn();
+}
+
+void GameState::spawn() {
+    int kind = bag.next();
+    const PieceRotation* piece = PieceTable::instance().get(kind, 0);
+    // 클라이언트 GameCore.spawn과 같은 위치
+    int x = BOARD_WIDTH / 2 - piece->width / 2;
+    active = ActivePiece{fits(kind, 0, x, 0), kind, 0, x, 0};
+}
+
+bool GameState::canFallTo(int to_y) const {
+    for (int y = active.y + 1; y <= to_y; ++y) {
+        if (!fits(active.kind, active.rotation, active.x, y)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+bool GameState::fits(int kind, int rotation, int x, int y) const {
+    const PieceRotation* piece = PieceTable::instance().get(kind, rotation);
+    if (piece == nullptr || x < piece->min_x || x > piece->max_x) {
+        return false;
+    }
+    int row = y + piece->top;
+    if (row < 0 || row + piece->row_count > BOARD_HEIGHT) {
+        return false;
+    }
+    for (int r = 0; r < piece->row_count; ++r) {
+        uint16_t mask = x >= 0 ? piece->masks[r] << x : piece->masks[r] >> -x;
+        if (occupancy[row + r] & mask) {
+            return false;
+        }
+    }
+    return true;
+}
+
+bool GameState::applyCommand(PacketType type, int kind, int x, int y, int rotation) {
+    const PieceRotation* piece = PieceTable::instance().get(kind, rotation);
+    // 블록은 seed 순서대로 생성 위치에서만 시작하므로 종류가 다르거나 위로 올라갈 수 없음
+    if (piece == nullptr || !active.valid || kind != active.kind || y < active.y ||
+        !fits(kind, rotation, x, y)) {
+        return false;
+    }
+
+    // 이전 명령 이후 중력으로 같은 x/회전 그대로 y까지 떨어진 뒤 한 번 조작한 위치여야 함
+    // (MOVE의 아래 이동(y + 1)도 같은 경로 검사에 포함됨)
+    switch (type) {
+        case PacketType::MOVE_PIECE:
+            if (rotation != active.rotation || std::abs(x - active.x) > 1) {
+                return false;
+            }
+            break;
+        case PacketType::ROTATE_PIECE:
+            if (rotation != (active.rotation + 1) % PIECE_ROTATIONS || x != active.x) {
+                return false;
+            }
+            break;
+        case PacketType::DROP_PIECE:
+            if (rotation != active.rotation || x != active.x) {
+                return false;
+            }
+            break;
+        default:
+            return false;
+    }
+    if (!canFallTo(y)) {
+        return false;  // 막힌 칸을 통과해야 갈 수 있는 위치 (닫힌 구멍 등)
+    }
+
+    if (type == PacketType::DROP_PIECE) {
+        if (fits(kind, rotation, x, y + 1)) {
+            return false;  // 아직 바닥에 닿지 않은 위치에서는 고정할 수 없음
         }
+        lockPiece(*piece, x, y);
+        spawn();
+        return true;
     }
+    active = ActivePiece{true, kind, rotation, x, y};
     return true;
 }
 
-bool GameState::isValidRotation(const TetrisPiece& piece, int rotation) const {
-    // 회전된 피스의 모양 계산
-    std::vector<std::vector<int>> rotated = piece.shape;
-    for (int r = 0; r < rotation % 4; ++r) {
-        std::vector<std::vector<int>> temp(rotated[0].size(), 
-                                         std::vector<int>(rotated.size()));
-        for (size_t i = 0; i < rotated.size(); ++i) {
-            for (size_t j = 0; j < rotated[i].size(); ++j) {
-                temp[j][rotated.size() - 1 - i] = rotated[i][j];
+int GameState::lockPiece(const PieceRotation& piece, int x, int y) {
+    for (int c = 0; c < piece.cell_count; ++c) {
+        int row = y + piece.cells[c][0];
+        int col = x + piece.cells[c][1];
+        occupancy[row] |= 1u << col;
+        colors[row] |= static_cast<uint32_t>(piece.color) << (col * 3);
+    }
+    dirty = true;
+
+    int lines = clearLines();
+    if (lines > 0) {
+        // 점수 규칙은 클라이언트 GameCore.clear_lines와 동일
+        lines_cleared += lines;
+        score += lines * 100 * level;
+        level = lines_cleared / 10 + 1;
+    }
+    return lines;
+}
+
+int GameState::clearLines() {
+    const uint16_t full = (1u << BOARD_WIDTH) - 1;
+    int write = BOARD_HEIGHT - 1;
+    for (int read = BOARD_HEIGHT - 1; read >= 0; --read) {
+        if (occupancy[read] != full) {
+            occupancy[write] = occupancy[read];
+            colors[write] = colors[read];
+            --write;
+        }
+    }
+    int cleared = write + 1;
+    for (int i = 0; i < cleared; ++i) {
+        occupancy[i] = 0;
+        colors[i] = 0;
+    }
+    return cleared;
+}
+
+size_t GameState::fillBoardUpdate(BoardUpdate& update, uint32_t input_seq) {
+    if (!dirty) {
+        return 0;
+    }
+    dirty = false;
+    ++board_seq;
+    update.version = BOARD_FORMAT_VERSION;
+    update.flags = BOARD_FLAG_KEYFRAME;
+    update.seq = board_seq;
+    update.base_seq = board_seq;
+    update.input_seq = static_cast<uint16_t>(input_seq);
+    update.row_mask = 0;
+    int n = 0;
+    for (int i = 0; i < BOARD_HEIGHT; ++i) {
+        if (colors[i]) {
+            update.row_mask |= 1u << i;
+            update.rows[n++] = colors[i];
+        }
+    }
+    return BOARD_UPDATE_HEADER_SIZE + n * sizeof(uint32_t);
+}
+
+size_t GameState::fillKeyframe(BoardUpdate& update, uint32_t input_seq) const {
+    update.version = BOARD_FORMAT_VERSION;
+    update.flags = BOARD_FLAG_KEYFRAME;
+    update.seq = board_seq;
+    update.base_seq = board_seq;
+    update.input_seq = static_cast<uint16_t>(input_seq);
+    update.row_mask = 0;
+    int n = 0;
+    for (int i = 0; i < BOARD_HEIGHT; ++i) {
+        if (colors[i]) {
+            update.row_mask |= 1u << i;
+            update.rows[n++] = colors[i];
+        }
+    }
+    return BOARD_UPDATE_HEADER_SIZE + n * sizeof(uint32_t);
+}
+
+// SendBatch 구현
+SendBatch::SendBatch(int sock)
+    : sock(sock), storage(MAX_MESSAGES), stored(0),
+      messages(MAX_MESSAGES), iovecs(MAX_MESSAGES), addresses(MAX_MESSAGES), count(0) {}
+
+const uint8_t* SendBatch::store(const void* data, size_t length) {
+    // 한 방 전체(플레이어 + 구독자)에 보낼 자리까지 남겨두고 가득 차면 먼저 전송
+    if (stored == storage.size() || count + ROOM_CAPACITY + ROOM_MAX_SUBSCRIBERS > messages.size()) {
+        flush();
+    }
+    uint8_t* slot = storage[stored++].data();
+    memcpy(slot, data, std::min(length, sizeof(Packet)));
+    return slot;
+}
+
+void SendBatch::add(const uint8_t* data, size_t length, const sockaddr_in& addr) {
+    if (count == messages.size()) {
+        flush();
+    }
+    uint32_t type;
+    memcpy(&type, data, sizeof(type));
+    ServerStats::local().countSent(type);
+    addresses[count] = addr;
+    iovecs[count].iov_base = const_cast<uint8_t*>(data);
+    iovecs[count].iov_len = length;
+    mmsghdr& message = messages[count];
+    memset(&message, 0, sizeof(message));
+    message.msg_hdr.msg_name = &addresses[count];
+    message.msg_hdr.msg_namelen = sizeof(sockaddr_in);
+    message.msg_hdr.msg_iov = &iovecs[count];
+    message.msg_hdr.msg_iovlen = 1;
+    ++count;
+}
+
+void SendBatch::send(const void* data, size_t length, const sockaddr_in& addr) {
+    add(store(data, length), length, addr);
+}
+
+void SendBatch::flush() {
+    size_t sent = 0;
+    while (sent < count) {
+        int n = sendmmsg(sock, messages.data() + sent, count - sent, 0);
+        if (n < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            if (errno != EAGAIN && errno != EWOULDBLOCK) {
+                std::cerr << "패킷 전송 실패: " << strerror(errno) << std::endl;
             }
+            break;  // 송신 버퍼가 가득 참: UDP이므로 나머지는 버림
         }
-        rotated = temp;
+        sent += n;
+    }
+    stored = 0;
+    count = 0;
+}
+
+// ControlSender 구현
+ControlSender::ControlSender() : wake_fd(eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC)), pending(0) {
+    if (wake_fd < 0) {
+        throw std::runtime_error("eventfd 생성 실패");
     }
-    
-    TetrisPiece rotated_piece = piece;
-    rotated_piece.shape = rotated;
-    return isValidMove(rotated_piece, piece.x, piece.y);
+}
+
+ControlSender::~ControlSender() {
+    close(wake_fd);
+}
+
+int ControlSender::initialRto(int player_id) const {
+    auto it = rtt.find(player_id);
+    if (it == rtt.end()) {
+        return INITIAL_RTO_MS;
+    }
+    // RFC 6298: SRTT + 4 * RTTVAR
+    int rto = static_cast<int>(it->second.srtt_ms + 4 * it->second.rttvar_ms);
+    return std::clamp(rto, MIN_RTO_MS, MAX_RTO_MS);
+}
+
+void ControlSender::send(int player_id, uint32_t seq, const Packet& packet, size_t length,
+                         const sockaddr_in& addr, SendBatch& out) {
+    out.send(packet.buffer, length, addr);
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        auto now = Clock::now();
+        auto it = std::find_if(entries.begin(), entries.end(), [&](const Entry& e) {
+            return e.player_id == player_id && e.seq == seq;
+        });
+        if (it == entries.end()) {
+            entries.emplace_back();
+            it = entries.end() - 1;
+            it->attempts = 0;
+            it->rto_ms = initialRto(player_id);
+        }
+        it->player_id = player_id;
+        it->seq = seq;
+        it->address = addr;
+        memcpy(it->data.data(), packet.buffer, length);
+        it->length = length;
+        it->sent_at = now;
+        it->next_send = now + std::chrono::milliseconds(it->rto_ms);
+        ++it->attempts;  // 같은 패킷을 다시 보낸 경우 2 이상: RTT 표본에서 제외
+        pending.store(entries.size(), std::memory_order_relaxed);
+    }
+    uint64_t one = 1;
+    if (write(wake_fd, &one, sizeof(one)) < 0 && errno != EAGAIN) {
+        std::cerr << "eventfd 쓰기 실패: " << strerror(errno) << std::endl;
+    }
+}
+
+void ControlSender::ack(int player_id, uint32_t seq, const sockaddr_in& sender) {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = std::find_if(entries.begin(), entries.end(), [&](const Entry& e) {
+        return e.player_id == player_id && e.seq == seq &&
+               e.address.sin_addr.s_addr == sender.sin_addr.s_addr &&
+               e.address.sin_port == sender.sin_port;
+    });
+    if (it == entries.end()) {
+        return;  // 이미 확인된 중복 ACK
+    }
+    if (it->attempts == 1) {
+        double sample = std::chrono::duration<double, std::milli>(Clock::now() - it->sent_at).count();
+        auto estimate = rtt.find(player_id);
+        if (estimate == rtt.end()) {
+            rtt[player_id] = RttEstimate{sample, sample / 2};
+        } else {
+            estimate->second.rttvar_ms = 0.75 * estimate->second.rttvar_ms +
+                                         0.25 * std::abs(estimate->second.srtt_ms - sample);
+            estimate->second.srtt_ms = 0.875 * estimate->second.srtt_ms + 0.125 * sample;
+        }
+    }
+    *it = entries.back();
+    entries.pop_back();
+    pending.store(entries.size(), std::memory_order_relaxed);
+}
+
+void ControlSender::rebind(int player_id, const sockaddr_in& addr) {
+    std::lock_guard<std::mutex> lock(mutex);
+    for (auto& entry : entries) {
+        if (entry.player_id == player_id) {
+            entry.address = addr;
+        }
+    }
+}
+
+void ControlSender::forget(int player_id) {
+    std::lock_guard<std::mutex> lock(mutex);
+    entries.erase(std::remove_if(entries.begin(), entries.end(),
+                                 [&](const Entry& e) { return e.player_id == player_id; }),
+                  entries.end());
+    rtt.erase(player_id);
+    pending.store(entries.size(), std::memory_order_relaxed);
+}
+
+int ControlSender::retransmit(SendBatch& out) {
+    if (empty()) {
+        return -1;
+    }
+    std::lock_guard<std::mutex> lock(mutex);
+    auto now = Clock::now();
+    int next_due = -1;
+    for (size_t i = 0; i < entries.size();) {
+        Entry& entry = entries[i];
+        if (entry.next_send <= now) {
+            if (entry.attempts >= MAX_ATTEMPTS) {
+                std::cout << "Player " << entry.player_id << ": control packet " << entry.seq
+                          << " not acknowledged after " << entry.attempts << " attempts" << std::endl;
+                entries[i] = entries.back();
+                entries.pop_back();
+                continue;
+            }
+            out.send(entry.data.data(), entry.length, entry.address);
+            ++entry.attempts;
+            entry.rto_ms = std::min(entry.rto_ms * 2, MAX_RTO_MS);
+            entry.next_send = now + std::chrono::milliseconds(entry.rto_ms);
+        }
+        int due = static_cast<int>(std::chrono::duration_cast<std::chrono::milliseconds>(
+            entry.next_send - now).count());
+        next_due = next_due < 0 ? due : std::min(next_due, due);
+        ++i;
+    }
+    pending.store(entries.size(), std::memory_order_relaxed);
+    return next_due;
+}
+
+// BoardSnapshots 구현
+BoardSnapshots::BoardSnapshots() : latest_slot(-1) {
+    for (auto& snapshot : history) {
+        snapshot.valid = false;
+    }
+}
+
+bool BoardSnapshots::apply(const BoardUpdate& update, size_t payload_len) {
+    if (payload_len < BOARD_UPDATE_HEADER_SIZE || update.version != BOARD_FORMAT_VERSION) {
+        return false;
+    }
+    uint32_t row_mask = update.row_mask;
+    if (row_mask >> BOARD_ROWS) {
+        return false;
+    }
+    int count = __builtin_popcount(row_mask);
+    if (payload_len != BOARD_UPDATE_HEADER_SIZE + count * sizeof(uint32_t)) {
+        return false;
+    }
+
+    uint32_t rows[BOARD_ROWS] = {0};
+    if (!(update.flags & BOARD_FLAG_KEYFRAME)) {
+        const Snapshot& base = history[update.base_seq % HISTORY];
+        if (!base.valid || base.seq != update.base_seq) {
+            return false;  // 기준 스냅샷 없음: 다음 키프레임까지 대기
+        }
+        memcpy(rows, base.rows, sizeof(rows));
+    }
+
+    int n = 0;
+    for (int i = 0; i < BOARD_ROWS; ++i) {
+        if (row_mask & (1u << i)) {
+            uint32_t value = update.rows[n++];
+            if (value & ~BOARD_ROW_BITS) {
+                return false;
+            }
+            rows[i] ^= value;  // 키프레임은 0에 XOR하므로 그대로 대입과 같음
+        }
+    }
+
+    int slot = update.seq % HISTORY;
+    history[slot].valid = true;
+    history[slot].seq = update.seq;
+    memcpy(history[slot].rows, rows, sizeof(rows));
+    // 16비트 시퀀스 wrap-around 고려
+    if (latest_slot < 0 ||
+        static_cast<int16_t>(update.seq - history[latest_slot].seq) > 0) {
+        latest_slot = slot;
+    }
+    return true;
+}
+
+const uint32_t* BoardSnapshots::latest() const {
+    return latest_slot < 0 ? nullptr : history[latest_slot].rows;
+}
+
+// InputHistory 구현
+InputHistory::InputHistory() : last_seq(0), recent{}, recent_count(0), recent_head(0) {}
+
+bool InputHistory::advance(uint32_t seq) {
+    if (seq <= last_seq) {
+        return false;  // 이미 처리한 명령 (중복 전송분)
+    }
+    last_seq = seq;
+    return true;
+}
+
+void InputHistory::record(const InputCommand& command) {
+    recent[recent_head] = command;
+    recent_head = (recent_head + 1) % MAX_INPUT_COMMANDS;
+    if (recent_count < MAX_INPUT_COMMANDS) {
+        ++recent_count;
+    }
+}
+
+size_t InputHistory::fillBatch(InputBatch& batch) const {
+    memset(&batch, 0, INPUT_BATCH_HEADER_SIZE);
+    batch.count = static_cast<uint8_t>(recent_count);
+    size_t start = (recent_head + MAX_INPUT_COMMANDS - recent_count) % MAX_INPUT_COMMANDS;
+    for (size_t i = 0; i < recent_count; ++i) {
+        batch.commands[i] = recent[(start + i) % MAX_INPUT_COMMANDS];
+    }
+    return INPUT_BATCH_HEADER_SIZE + recent_count * sizeof(InputCommand);
 }
 
 // Player 구현
-Player::Player(int id, const sockaddr_in& addr) : id(id), address(addr) {}
+Player::Player(int id, const sockaddr_in& addr) : id(id), address(addr), control_seq(0) {}
 
 // GameRoom 구현
-GameRoom::GameRoom() {}
+GameRoom::GameRoom(int id) : id(id), started(false) {
+    std::random_device device;
+    seed = device();
+}
+
+std::unique_lock<std::mutex> GameRoom::lockRoom() const {
+    return timedLock<std::unique_lock<std::mutex>>(mutex, ServerStats::local().room_lock_wait_ns);
+}
 
 bool GameRoom::addPlayer(std::shared_ptr<Player> player) {
-    std::lock_guard<std::mutex> lock(mutex);
+    auto lock = lockRoom();
     if (players.size() >= MAX_PLAYERS) {
         return false;
     }
     players[player->getId()] = player;
+    player->getGameState().start(seed);
     return true;
 }
 
 bool GameRoom::removePlayer(int player_id) {
-    std::lock_guard<std::mutex> lock(mutex);
+    auto lock = lockRoom();
     return players.erase(player_id) > 0;
 }
 
 bool GameRoom::isFull() const {
+    auto lock = lockRoom();
     return players.size() >= MAX_PLAYERS;
 }
 
 bool GameRoom::isEmpty() const {
+    auto lock = lockRoom();
     return players.empty();
 }
 
-void GameRoom::broadcastPacket(const Packet& packet, const sockaddr_in& sender, int sock) {
-    std::lock_guard<std::mutex> lock(mutex);
+size_t GameRoom::playerCount() const {
+    auto lock = lockRoom();
+    return players.size();
+}
+
+bool GameRoom::tryStart() {
+    auto lock = lockRoom();
+    if (started || players.size() < MAX_PLAYERS) {
+        return false;
+    }
+    started = true;
+    return true;
+}
+
+bool GameRoom::isStarted() const {
+    auto lock = lockRoom();
+    return started;
+}
+
+void GameRoom::fillGameStart(GameStart& start) const {
+    auto lock = lockRoom();
+    fillGameStartLocked(start);
+}
+
+void GameRoom::fillGameStartLocked(GameStart& start) const {
+    memset(&start, 0, sizeof(start));
+    start.room_id = id;
+    start.seed = seed;
+    for (const auto& [player_id, player] : players) {
+        start.player_ids[start.player_count++] = player_id;
+    }
+}
+
+void GameRoom::broadcastPacket(const Packet& packet, size_t length, const sockaddr_in& sender, SendBatch& out) {
+    auto lock = lockRoom();
+    // 패킷은 한 번만 복사하고 받는 사람마다 주소만 추가
+    const uint8_t* data = nullptr;
     for (const auto& [id, player] : players) {
         if (memcmp(&player->getAddress(), &sender, sizeof(sockaddr_in)) != 0) {
-            sendto(sock, packet.buffer, sizeof(Packet), 0,
-                   (struct sockaddr*)&player->getAddress(), sizeof(sockaddr_in));
+            if (data == nullptr) {
+                data = out.store(packet.buffer, length);
+            }
+            out.add(data, length, player->getAddress());
         }
     }
+    if (subscribers.empty()) {
+        return;
+    }
+    // 갱신이 끊긴 구독자는 여기서 정리 (구독 중인 방만 시계를 읽음)
+    auto now = std::chrono::steady_clock::now();
+    subscribers.erase(std::remove_if(subscribers.begin(), subscribers.end(),
+                                     [&](const Subscriber& s) { return s.expires < now; }),
+                      subscribers.end());
+    for (const auto& subscriber : subscribers) {
+        if (data == nullptr) {
+            data = out.store(packet.buffer, length);
+        }
+        out.add(data, length, subscriber.address);
+    }
+}
+
+int GameRoom::subscribe(const sockaddr_in& addr) {
+    auto lock = lockRoom();
+    auto expires = std::chrono::steady_clock::now() + std::chrono::milliseconds(SUBSCRIPTION_TIMEOUT_MS);
+    for (auto& subscriber : subscribers) {
+        if (subscriber.address.sin_addr.s_addr == addr.sin_addr.s_addr &&
+            subscriber.address.sin_port == addr.sin_port) {
+            subscriber.expires = expires;
+            return 0;
+        }
+    }
+    if (subscribers.size() >= ROOM_MAX_SUBSCRIBERS) {
+        return -1;
+    }
+    subscribers.push_back(Subscriber{addr, expires});
+    return 1;
+}
+
+bool GameRoom::unsubscribe(const sockaddr_in& addr) {
+    auto lock = lockRoom();
+    auto it = std::remove_if(subscribers.begin(), subscribers.end(), [&](const Subscriber& s) {
+        return s.address.sin_addr.s_addr == addr.sin_addr.s_addr && s.address.sin_port == addr.sin_port;
+    });
+    bool removed = it != subscribers.end();
+    subscribers.erase(it, subscribers.end());
+    return removed;
+}
+
+void GameRoom::sendSnapshot(const sockaddr_in& addr, SendBatch& out) const {
+    auto lock = lockRoom();
+    Packet packet;
+    memset(packet.buffer, 0, PACKET_HEADER_SIZE + sizeof(GameStart));
+    packet.header.type = PacketType::GAME_START;
+    packet.header.player_id = 0;
+    fillGameStartLocked(packet.header.data.game_start);
+    out.send(packet.buffer, PACKET_HEADER_SIZE + sizeof(GameStart), addr);
+
+    // 점수를 키프레임보다 먼저 보냄: 받는 쪽은 키프레임 이후 명령의 점수를 그 위에 더함
+    memset(packet.buffer, 0, PACKET_HEADER_SIZE + sizeof(PlayerScores));
+    packet.header.type = PacketType::PLAYER_SCORES;
+    PlayerScores& scores = packet.header.data.player_scores;
+    for (const auto& [player_id, player] : players) {
+        PlayerScore& entry = scores.players[scores.count++];
+        entry.player_id = player_id;
+        entry.score = player->getGameState().getScore();
+        entry.lines = player->getGameState().getLinesCleared();
+    }
+    out.send(packet.buffer, PACKET_HEADER_SIZE + sizeof(uint32_t) + scores.count * sizeof(PlayerScore), addr);
+
+    for (const auto& [player_id, player] : players) {
+        packet.header.type = PacketType::BOARD_UPDATE;
+        packet.header.player_id = player_id;
+        size_t payload_len = player->getGameState().fillKeyframe(
+            packet.header.data.board_update, player->getInputHistory().lastSeq());
+        out.send(packet.buffer, PACKET_HEADER_SIZE + payload_len, addr);
+    }
+}
+
+bool GameRoom::sendToPlayer(int player_id, const Packet& packet, size_t length, SendBatch& out) {
+    auto lock = lockRoom();
+    auto it = players.find(player_id);
+    if (it == players.end()) {
+        return false;
+    }
+    out.send(packet.buffer, length, it->second->getAddress());
+    return true;
+}
+
+bool GameRoom::rebindPlayer(int player_id, const sockaddr_in& addr) {
+    auto lock = lockRoom();
+    auto it = players.find(player_id);
+    if (it == players.end()) {
+        return false;
+    }
+    it->second->setAddress(addr);
+    return true;
 }
 
 std::vector<std::shared_ptr<Player>> GameRoom::getPlayers() const {
-    std::lock_guard<std::mutex> lock(mutex);
+    auto lock = lockRoom();
     std::vector<std::shared_ptr<Player>> result;
     for (const auto& [id, player] : players) {
         result.push_back(player);
@@ -90,52 +744,94 @@ std::vector<std::shared_ptr<Player>> GameRoom::getPlayers() const {
     return result;
 }
 
-bool GameRoom::validateMove(int player_id, const Packet& packet) const {
-    std::lock_guard<std::mutex> lock(mutex);
+bool GameRoom::validateMove(int player_id, const Packet& packet) {
+    auto lock = lockRoom();
+    auto it = players.find(player_id);
+    if (it == players.end()) {
+        return false;
+    }
+
+    const auto& move = packet.header.data.move_data;
+    return it->second->getGameState().applyCommand(packet.header.type, move.piece_type,
+                                                   move.x, move.y, move.rotation);
+}
+
+bool GameRoom::fillBoardUpdate(int player_id, Packet& packet, size_t& length) {
+    auto lock = lockRoom();
     auto it = players.find(player_id);
     if (it == players.end()) {
         return false;
     }
+    size_t payload_len = it->second->getGameState().fillBoardUpdate(
+        packet.header.data.board_update, it->second->getInputHistory().lastSeq());
+    if (payload_len == 0) {
+        return false;
+    }
+    packet.header.type = PacketType::BOARD_UPDATE;
+    packet.header.player_id = player_id;
+    length = PACKET_HEADER_SIZE + payload_len;
+    return true;
+}
 
+int GameRoom::applyInputs(int player_id, const Packet& packet, size_t length,
+                          uint32_t& acked, Packet& forward, size_t& forward_length) {
+    auto lock = lockRoom();
+    auto it = players.find(player_id);
+    if (it == players.end() || length < PACKET_HEADER_SIZE + INPUT_BATCH_HEADER_SIZE) {
+        return -1;
+    }
+    const InputBatch& batch = packet.header.data.input_batch;
+    if (batch.count > MAX_INPUT_COMMANDS ||
+        length != PACKET_HEADER_SIZE + INPUT_BATCH_HEADER_SIZE + batch.count * sizeof(InputCommand)) {
+        return -1;
+    }
+
+    InputHistory& history = it->second->getInputHistory();
     GameState& state = it->second->getGameState();
-    TetrisPiece piece;
-    piece.type = packet.header.data.move_data.piece_type;
-    piece.x = packet.header.data.move_data.x;
-    piece.y = packet.header.data.move_data.y;
-    
-    switch (static_cast<PacketType>(packet.header.type)) {
-        case PacketType::MOVE_PIECE:
-            return state.isValidMove(piece, piece.x, piece.y);
-        case PacketType::ROTATE_PIECE:
-            return state.isValidRotation(piece, packet.header.data.move_data.rotation);
-        case PacketType::DROP_PIECE:
-            return state.isValidMove(piece, piece.x, piece.y);
-        default:
-            return false;
+    int accepted = 0;
+    for (int i = 0; i < batch.count; ++i) {
+        const InputCommand& command = batch.commands[i];
+        if (!history.advance(command.seq)) {
+            continue;
+        }
+        if (state.applyCommand(static_cast<PacketType>(command.type),
+                               command.piece_type, command.x, command.y, command.rotation)) {
+            history.record(command);
+            ++accepted;
+        } else {
+            ServerStats::local().countInvalidMoves();
+        }
+    }
+
+    acked = history.lastSeq();
+    if (accepted > 0) {
+        forward.header.type = PacketType::INPUT_COMMANDS;
+        forward.header.player_id = player_id;
+        forward_length = PACKET_HEADER_SIZE + history.fillBatch(forward.header.data.input_batch);
     }
+    return accepted;
+}
+
+bool GameRoom::applyBoardUpdate(int player_id, const Packet& packet, size_t length) {
+    auto lock = lockRoom();
+    auto it = players.find(player_id);
+    if (it == players.end() || length < PACKET_HEADER_SIZE) {
+        return false;
+    }
+    return it->second->getBoardSnapshots().apply(packet.header.data.board_update,
+                                                 length - PACKET_HEADER_SIZE);
 }
 
 // GameServer 구현
-GameServer::GameServer(int port) 
-    : thread_pool(4)  // 4개의 작업자 스레드
+GameServer::GameServer(int port, bool authoritative_boards) 
+    : authoritative_boards(authoritative_boards)
+    , thread_pool(IO_WORKERS - 1)  // 워커 0은 run()을 호출한 스레드에서 실행
     , next_player_id(1)
+    , next_room_id(1)
+    , token_rng(std::random_device{}())
     , running(true)
+    , shutting_down(false)
 {
-    // UDP 소켓 생성
-    sock = socket(AF_INET, SOCK_DGRAM, 0);
-    if (sock < 0) {
-        throw std::runtime_error("소켓 생성 실패");
-    }
-
-    // 소켓 timeout 설정 (1초)
-    struct timeval tv;
-    tv.tv_sec = 1;  // 1초
-    tv.tv_usec = 0;
-    if (setsockopt(sock, SOL_SOCKET, SO_RCVTIMEO, &tv, sizeof(tv)) < 0) {
-        close(sock);
-        throw std::runtime_error("소켓 timeout 설정 실패");
-    }
-
     // 서버 주소 설정
     sockaddr_in server_addr;
     memset(&server_addr, 0, sizeof(server_addr));
@@ -143,14 +839,47 @@ GameServer::GameServer(int port)
     server_addr.sin_addr.s_addr = htonl(INADDR_ANY);
     server_addr.sin_port = htons(port);
 
-    // 소켓 바인딩
-    if (bind(sock, (struct sockaddr*)&server_addr, sizeof(server_addr)) < 0) {
-        close(sock);
-        throw std::runtime_error("소켓 바인딩 실패");
+    // SO_REUSEPORT 없이 먼저 한 번 바인딩해 봄: 다른(또는 남아 있는) 서버가 포트를 쓰고 있으면
+    // 워커 소켓이 조용히 포트를 나눠 갖는 대신 여기서 실패함
+    int probe_sock = socket(AF_INET, SOCK_DGRAM, 0);
+    if (probe_sock < 0) {
+        throw std::runtime_error("소켓 생성 실패");
+    }
+    if (bind(probe_sock, (struct sockaddr*)&server_addr, sizeof(server_addr)) < 0) {
+        std::string reason = strerror(errno);
+        close(probe_sock);
+        throw std::runtime_error("포트 " + std::to_string(port) + " 바인딩 실패: " + reason);
+    }
+    close(probe_sock);
+
+    // 워커마다 같은 포트에 SO_REUSEPORT 소켓을 열어 커널이 주소 해시로 분배하게 함
+    // (같은 클라이언트는 항상 같은 워커로 들어옴)
+    for (int i = 0; i < IO_WORKERS; ++i) {
+        int worker_sock = socket(AF_INET, SOCK_DGRAM | SOCK_NONBLOCK, 0);
+        if (worker_sock < 0) {
+            for (int s : sockets) close(s);
+            throw std::runtime_error("소켓 생성 실패");
+        }
+
+        int enable = 1;
+        if (setsockopt(worker_sock, SOL_SOCKET, SO_REUSEPORT, &enable, sizeof(enable)) < 0) {
+            close(worker_sock);
+            for (int s : sockets) close(s);
+            throw std::runtime_error("SO_REUSEPORT 설정 실패");
+        }
+
+        // 소켓 바인딩
+        if (bind(worker_sock, (struct sockaddr*)&server_addr, sizeof(server_addr)) < 0) {
+            close(worker_sock);
+            for (int s : sockets) close(s);
+            throw std::runtime_error("소켓 바인딩 실패");
+        }
+        sockets.push_back(worker_sock);
     }
+    sock = sockets[0];
 
-    game_room = std::make_unique<GameRoom>();
-    std::cout << "게임 서버가 포트 " << port << "에서 시작되었습니다." << std::endl;
+    std::cout << "게임 서버가 포트 " << port << "에서 시작되었습니다. (I/O 워커 "
+              << IO_WORKERS << "개)" << std::endl;
     std::cout << "서버를 종료하려면 'exit'를 입력하세요." << std::endl;
 
     // 입력 처리 스레드 시작
@@ -159,35 +888,52 @@ GameServer::GameServer(int port)
 
 GameServer::~GameServer() {
     shutdown();
+    // getline에서 막혀 있을 수 있는 입력 스레드는 기다리지 않음
+    if (input_thread && input_thread->joinable()) {
+        input_thread->detach();
+    }
 }
 
 void GameServer::shutdown() {
-    if (!running.exchange(false)) {
+    if (shutting_down.exchange(true) || !running) {
         return;  // Already shutting down
     }
     
     std::cout << "\nServer shutting down..." << std::endl;
     
-    // Send disconnect packet to all players
-    Packet disconnect_packet;
-    disconnect_packet.header.type = PacketType::DISCONNECT;
-    
+    // Send disconnect packet to all players (확인될 때까지 워커 0이 재전송)
     {
-        std::lock_guard<std::mutex> lock(mutex);
-        auto players = game_room->getPlayers();
-        std::cout << "Notifying " << players.size() << " connected players..." << std::endl;
+        SendBatch out(sock);
+        std::unique_lock<std::shared_mutex> lock(mutex);
+        std::cout << "Notifying " << sessions.size() << " connected players in "
+                  << rooms.size() << " rooms..." << std::endl;
         
-        for (const auto& player : players) {
-            sendto(sock, disconnect_packet.buffer, sizeof(Packet), 0,
-                   (struct sockaddr*)&player->getAddress(), sizeof(sockaddr_in));
-            std::cout << "Sent disconnect notification to Player " << player->getId() << std::endl;
+        for (const auto& [key, session] : sessions) {
+            Player& player = *session.player;
+            uint32_t seq = player.nextControlSeq();
+            Packet disconnect_packet;
+            disconnect_packet.header.type = PacketType::DISCONNECT;
+            disconnect_packet.header.player_id = player.getId();
+            disconnect_packet.header.data.control.seq = seq;
+            control.send(player.getId(), seq, disconnect_packet, PACKET_HEADER_SIZE + sizeof(ControlSeq),
+                         player.getAddress(), out);
+            std::cout << "Sent disconnect notification to Player " << player.getId() << std::endl;
         }
+        out.flush();
     }
+
+    auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(SHUTDOWN_ACK_WAIT_MS);
+    while (!control.empty() && std::chrono::steady_clock::now() < deadline) {
+        std::this_thread::sleep_for(std::chrono::milliseconds(10));
+    }
+    running = false;
     
-    if (sock >= 0) {
-        close(sock);
-        sock = -1;
+    // 닫힌 소켓은 epoll 집합에서 빠지므로 워커는 다음 timeout에 running을 보고 종료
+    for (int& worker_sock : sockets) {
+        close(worker_sock);
+        worker_sock = -1;
     }
+    sock = -1;
     
     std::cout << "Server shutdown complete." << std::endl;
 }
@@ -205,119 +951,535 @@ void GameServer::handleUserInput() {
 }
 
 void GameServer::run() {
-    Packet packet;
-    sockaddr_in client_addr;
-    socklen_t client_len = sizeof(client_addr);
+    for (size_t i = 1; i < sockets.size(); ++i) {
+        int worker = static_cast<int>(i);
+        thread_pool.enqueue([this, worker]() { workerLoop(worker); });
+    }
+    workerLoop(0);
+}
+
+void GameServer::workerLoop(int worker) {
+    int worker_sock = sockets[worker];
+    ServerStats::instance().bindWorker(worker);
+    StatsShard& stats = ServerStats::local();
+    int epoll_fd = epoll_create1(0);
+    if (epoll_fd < 0) {
+        std::cerr << "epoll 생성 실패: " << strerror(errno) << std::endl;
+        return;
+    }
+    epoll_event event{};
+    event.events = EPOLLIN;
+    event.data.fd = worker_sock;
+    epoll_ctl(epoll_fd, EPOLL_CTL_ADD, worker_sock, &event);
+    if (worker == 0) {
+        // 제어 패킷 재전송 담당: 새 항목이 생기면 eventfd로 깨어남
+        epoll_event wake{};
+        wake.events = EPOLLIN;
+        wake.data.fd = control.wakeFd();
+        epoll_ctl(epoll_fd, EPOLL_CTL_ADD, control.wakeFd(), &wake);
+    }
+
+    std::vector<Packet> packets(RECV_BATCH);
+    std::vector<sockaddr_in> addresses(RECV_BATCH);
+    std::vector<iovec> iovecs(RECV_BATCH);
+    std::vector<mmsghdr> messages(RECV_BATCH);
+    for (int i = 0; i < RECV_BATCH; ++i) {
+        iovecs[i].iov_base = packets[i].buffer;
+        iovecs[i].iov_len = sizeof(Packet);
+    }
+    SendBatch out(worker_sock);
 
     while (running) {
-        ssize_t recv_len = recvfrom(sock, packet.buffer, sizeof(Packet), 0,
-                                  (struct sockaddr*)&client_addr, &client_len);
-        
-        if (recv_len < 0) {
-            if (errno == EAGAIN || errno == EWOULDBLOCK) {
-                // timeout 발생, running 플래그 확인하고 계속 진행
-                continue;
+        // 1초 timeout: running 플래그 확인 (워커 0은 다음 재전송 기한까지만 대기)
+        int timeout_ms = 1000;
+        if (worker == 0) {
+            int due = control.retransmit(out);
+            out.flush();
+            if (due >= 0) {
+                timeout_ms = std::clamp(due, 1, 1000);
+            }
+        }
+        epoll_event ready[2];
+        int n = epoll_wait(epoll_fd, ready, 2, timeout_ms);
+        if (n <= 0) {
+            if (n < 0 && errno != EINTR) {
+                std::cerr << "epoll 대기 실패: " << strerror(errno) << std::endl;
             }
-            std::cerr << "패킷 수신 실패: " << strerror(errno) << std::endl;
+            continue;
+        }
+        bool readable = false;
+        for (int i = 0; i < n; ++i) {
+            if (ready[i].data.fd == control.wakeFd()) {
+                uint64_t value;
+                if (read(control.wakeFd(), &value, sizeof(value)) < 0 && errno != EAGAIN) {
+                    std::cerr << "eventfd 읽기 실패: " << strerror(errno) << std::endl;
+                }
+            } else {
+                readable = true;
+            }
+        }
+        if (!readable) {
             continue;
         }
 
-        // 패킷 처리를 스레드 풀에서 실행
-        thread_pool.enqueue([this, packet, client_addr]() {
-            handlePacket(packet, client_addr);
-        });
+        // 소켓이 빌 때까지 배치 단위로 받아 처리하고, 배치마다 응답을 한 번에 전송
+        while (running) {
+            for (int i = 0; i < RECV_BATCH; ++i) {
+                memset(&messages[i].msg_hdr, 0, sizeof(msghdr));
+                messages[i].msg_hdr.msg_name = &addresses[i];
+                messages[i].msg_hdr.msg_namelen = sizeof(sockaddr_in);
+                messages[i].msg_hdr.msg_iov = &iovecs[i];
+                messages[i].msg_hdr.msg_iovlen = 1;
+            }
+            int received = recvmmsg(worker_sock, messages.data(), RECV_BATCH, MSG_DONTWAIT, nullptr);
+            if (received < 0) {
+                if (errno != EAGAIN && errno != EWOULDBLOCK && errno != EINTR && running) {
+                    std::cerr << "패킷 수신 실패: " << strerror(errno) << std::endl;
+                }
+                break;
+            }
+            if (received > 0) {
+                stats.batch_size.record(received);
+            }
+            for (int i = 0; i < received; ++i) {
+                size_t length = messages[i].msg_len;
+                if (length < PACKET_HEADER_SIZE) {
+                    stats.countDropped();
+                    continue;
+                }
+                stats.countReceived(static_cast<uint32_t>(packets[i].header.type));
+                auto start = std::chrono::steady_clock::now();
+                handlePacket(packets[i], length, addresses[i], out);
+                stats.handle_ns.record(elapsedNs(start));
+            }
+            out.flush();
+            if (received < RECV_BATCH) {
+                break;
+            }
+        }
     }
+    close(epoll_fd);
+}
+
+uint64_t GameServer::addressKey(const sockaddr_in& addr) {
+    // IPv4 주소(32비트)와 포트(16비트)를 하나의 키로 묶음
+    return (static_cast<uint64_t>(addr.sin_addr.s_addr) << 16) | addr.sin_port;
 }
 
-void GameServer::handlePacket(const Packet& packet, const sockaddr_in& client_addr) {
+bool GameServer::findSession(const Packet& packet, const sockaddr_in& sender, Session& session) {
+    auto lock = timedLock<std::shared_lock<std::shared_mutex>>(
+        mutex, ServerStats::local().directory_lock_wait_ns);
+    auto it = sessions.find(addressKey(sender));
+    if (it == sessions.end() ||
+        it->second.player->getId() != static_cast<int>(packet.header.player_id)) {
+        ServerStats::local().countDropped();
+        return false;
+    }
+    session = it->second;
+    return true;
+}
+
+void GameServer::handlePacket(const Packet& packet, size_t length, const sockaddr_in& client_addr,
+                              SendBatch& out) {
     switch (packet.header.type) {
-        case PacketType::CONNECT_REQUEST: {
-            std::lock_guard<std::mutex> lock(mutex);
-            
-            if (game_room->isFull()) {
-                std::cout << "Connection rejected: Server is full (3/3 players)" << std::endl;
-                return;
-            }
-            
-            int player_id = assignPlayerId();
-            auto player = std::make_shared<Player>(player_id, client_addr);
-            
-            if (game_room->addPlayer(player)) {
-                // Send response packet
-                Packet response;
-                response.header.type = PacketType::CONNECT_RESPONSE;
-                response.header.player_id = player_id;
-                
-                std::cout << "Player " << player_id << " connected from " 
-                          << inet_ntoa(client_addr.sin_addr) << ":" << ntohs(client_addr.sin_port) 
-                          << " (" << game_room->getPlayers().size() << "/3 players)" << std::endl;
-                
-                sendto(sock, response.buffer, sizeof(Packet), 0,
-                       (struct sockaddr*)&client_addr, sizeof(client_addr));
-                
-                // If room is full after adding the player, start the game
-                if (game_room->isFull()) {
-                    std::cout << "All players connected. Starting the game..." << std::endl;
-                    startGame();
-                }
-            }
+        case PacketType::CONNECT_REQUEST:
+            handleConnect(packet, length, client_addr, out);
             break;
-        }
         
-        case PacketType::DISCONNECT: {
-            std::lock_guard<std::mutex> lock(mutex);
-            
-            // Find the player ID from the address
-            auto players = game_room->getPlayers();
-            for (const auto& player : players) {
-                if (memcmp(&player->getAddress(), &client_addr, sizeof(sockaddr_in)) == 0) {
-                    int player_id = player->getId();
-                    if (game_room->removePlayer(player_id)) {
-                        std::cout << "Player " << player_id << " disconnected from "
-                                  << inet_ntoa(client_addr.sin_addr) << ":" << ntohs(client_addr.sin_port)
-                                  << " (" << game_room->getPlayers().size() << "/3 players remaining)" << std::endl;
-                    }
-                    break;
-                }
+        case PacketType::DISCONNECT:
+            if (packet.header.player_id == 0) {
+                unsubscribeAll(client_addr);  // 관전 중계기 (플레이어 ID는 1부터)
+                break;
+            }
+            handleDisconnect(client_addr);
+            // 이미 처리한 중복 DISCONNECT도 다시 확인 응답
+            if (length >= PACKET_HEADER_SIZE + sizeof(ControlSeq)) {
+                sendControlAck(packet.header.player_id, packet.header.data.control.seq, client_addr, out);
+            }
+            break;
+
+        case PacketType::CONTROL_ACK:
+            if (length >= PACKET_HEADER_SIZE + sizeof(ControlSeq)) {
+                control.ack(packet.header.player_id, packet.header.data.control.seq, client_addr);
             }
             break;
-        }
         
         case PacketType::MOVE_PIECE:
         case PacketType::ROTATE_PIECE:
         case PacketType::DROP_PIECE: {
-            if (validateAndProcessMove(packet.header.player_id, packet)) {
-                broadcastToRoom(packet, client_addr);
+            Session session;
+            if (!findSession(packet, client_addr, session)) {
+                break;
+            }
+            if (validateAndProcessMove(*session.room, packet.header.player_id, packet)) {
+                broadcastToRoom(*session.room, packet, length, client_addr, out);
+                broadcastSimulatedBoard(*session.room, packet.header.player_id, client_addr, out);
+            } else {
+                ServerStats::local().countInvalidMoves();
             }
             break;
         }
         
+        case PacketType::INPUT_COMMANDS: {
+            // 시퀀스로 중복 제거 후 처리한 최대 시퀀스를 ACK,
+            // 상대에게는 최근 승인된 명령들을 다시 묶어 전달 (중계 구간도 손실 허용)
+            Session session;
+            if (!findSession(packet, client_addr, session)) {
+                break;
+            }
+            uint32_t acked = 0;
+            Packet forward;
+            size_t forward_length = 0;
+            int accepted = session.room->applyInputs(packet.header.player_id, packet, length,
+                                                     acked, forward, forward_length);
+            if (accepted < 0) {
+                ServerStats::local().countDropped();
+                break;
+            }
+            sendInputAck(packet.header.player_id, acked, client_addr, out);
+            if (accepted > 0) {
+                broadcastToRoom(*session.room, forward, forward_length, client_addr, out);
+                broadcastSimulatedBoard(*session.room, packet.header.player_id, client_addr, out);
+            }
+            break;
+        }
+
         case PacketType::BOARD_UPDATE: {
-            broadcastToRoom(packet, client_addr);
+            // 가변 길이 델타/키프레임: 적용 가능한 것만 확인 응답 후 받은 길이 그대로 중계
+            // (authoritative_boards면 확인 응답만 하고 상대에게는 서버 시뮬레이션 보드를 보냄)
+            Session session;
+            if (!findSession(packet, client_addr, session)) {
+                break;
+            }
+            if (session.room->applyBoardUpdate(packet.header.player_id, packet, length)) {
+                sendBoardAck(packet, client_addr, out);
+                if (!authoritative_boards) {
+                    broadcastToRoom(*session.room, packet, length, client_addr, out);
+                }
+            }
+            break;
+        }
+
+        case PacketType::BOARD_HASH: {
+            // 상대들이 입력 재생으로 복원한 보드를 검사하도록 그대로 중계
+            Session session;
+            if (length != PACKET_HEADER_SIZE + sizeof(BoardHash) ||
+                !findSession(packet, client_addr, session)) {
+                break;
+            }
+            broadcastToRoom(*session.room, packet, length, client_addr, out);
+            break;
+        }
+
+        case PacketType::RESYNC_REQUEST: {
+            // 같은 방의 대상 플레이어에게만 전달
+            Session session;
+            if (length != PACKET_HEADER_SIZE + sizeof(ResyncRequest) ||
+                !findSession(packet, client_addr, session)) {
+                break;
+            }
+            session.room->sendToPlayer(packet.header.data.resync_request.target_id, packet, length, out);
             break;
         }
+
+        case PacketType::STATS:
+            handleStatsRequest(client_addr, out);
+            break;
+
+        case PacketType::SUBSCRIBE:
+            handleSubscribe(packet, length, client_addr, out);
+            break;
+
+        default:
+            ServerStats::local().countDropped();
+            break;
     }
 }
 
-bool GameServer::validateAndProcessMove(int player_id, const Packet& packet) {
-    return game_room->validateMove(player_id, packet);
+void GameServer::handleConnect(const Packet& packet, size_t length, const sockaddr_in& client_addr,
+                               SendBatch& out) {
+    // 페이로드 없는 구형 요청은 seq 0, 토큰 없음으로 처리
+    ConnectRequest request{};
+    if (length >= PACKET_HEADER_SIZE + sizeof(ConnectRequest)) {
+        request = packet.header.data.connect_request;
+    }
+
+    std::shared_ptr<GameRoom> room;
+    Session session;
+    bool reconnected = false;
+    {
+        auto lock = timedLock<std::unique_lock<std::shared_mutex>>(
+            mutex, ServerStats::local().directory_lock_wait_ns);
+        uint64_t key = addressKey(client_addr);
+        auto existing = sessions.find(key);
+        if (existing != sessions.end()) {
+            // 응답이 유실되어 다시 보낸 요청: 같은 ID/토큰/시퀀스로 다시 응답
+            sendConnectResponse(existing->second, request.seq, 0, client_addr, out);
+            return;
+        }
+
+        auto token = request.token ? session_tokens.find(request.token) : session_tokens.end();
+        if (token != session_tokens.end()) {
+            // 다른 주소에서 온 재접속: 세션을 새 주소로 옮기고 방의 자리를 그대로 유지
+            auto old = sessions.find(token->second);
+            session = old->second;
+            sessions.erase(old);
+            token->second = key;
+            session.room->rebindPlayer(session.player->getId(), client_addr);
+            control.rebind(session.player->getId(), client_addr);
+            reconnected = true;
+        } else {
+            // 자리가 남은 방에 배정하고, 없으면 새 방을 만듦
+            if (open_rooms.empty()) {
+                int room_id = next_room_id++;
+                rooms[room_id] = std::make_shared<GameRoom>(room_id);
+                open_rooms.insert(room_id);
+                std::cout << "Room " << room_id << " created (" << rooms.size() << " rooms)" << std::endl;
+            }
+            auto new_room = rooms[*open_rooms.begin()];
+
+            auto player = std::make_shared<Player>(assignPlayerId(), client_addr);
+            new_room->addPlayer(player);
+            uint64_t new_token = 0;
+            while (new_token == 0 || session_tokens.count(new_token)) {
+                new_token = token_rng();
+            }
+            session = Session{player, new_room, new_token, 0};
+            session_tokens[new_token] = key;
+            if (new_room->isFull()) {
+                open_rooms.erase(new_room->getId());
+            }
+        }
+        session.response_seq = session.player->nextControlSeq();
+        sessions[key] = session;
+    }
+    room = session.room;
+    int player_id = session.player->getId();
+
+    if (reconnected) {
+        std::cout << "Player " << player_id << " reconnected from "
+                  << inet_ntoa(client_addr.sin_addr) << ":" << ntohs(client_addr.sin_port)
+                  << " to room " << room->getId() << std::endl;
+        sendConnectResponse(session, request.seq, CONNECT_FLAG_RECONNECTED, client_addr, out);
+        if (room->isStarted()) {
+            sendGameStart(*room, *session.player, out);  // 방/seed 정보를 다시 알려줌
+        }
+        return;
+    }
+
+    std::cout << "Player " << player_id << " connected from "
+              << inet_ntoa(client_addr.sin_addr) << ":" << ntohs(client_addr.sin_port)
+              << " to room " << room->getId()
+              << " (" << room->playerCount() << "/" << ROOM_CAPACITY << " players)" << std::endl;
+    sendConnectResponse(session, request.seq, 0, client_addr, out);
+
+    // If room is full after adding the player, start the game
+    if (room->tryStart()) {
+        std::cout << "Room " << room->getId() << ": all players connected. Starting the game..." << std::endl;
+        startGame(*room, out);
+    }
 }
 
-void GameServer::broadcastToRoom(const Packet& packet, const sockaddr_in& sender) {
-    game_room->broadcastPacket(packet, sender, sock);
+void GameServer::handleDisconnect(const sockaddr_in& client_addr) {
+    auto lock = timedLock<std::unique_lock<std::shared_mutex>>(
+        mutex, ServerStats::local().directory_lock_wait_ns);
+    auto it = sessions.find(addressKey(client_addr));
+    if (it == sessions.end()) {
+        return;
+    }
+    Session session = it->second;
+    sessions.erase(it);
+    session_tokens.erase(session.token);
+    control.forget(session.player->getId());
+
+    GameRoom& room = *session.room;
+    int player_id = session.player->getId();
+    if (!room.removePlayer(player_id)) {
+        return;
+    }
+    size_t remaining = room.playerCount();
+    std::cout << "Player " << player_id << " disconnected from "
+              << inet_ntoa(client_addr.sin_addr) << ":" << ntohs(client_addr.sin_port)
+              << " (room " << room.getId() << ": " << remaining << "/" << ROOM_CAPACITY
+              << " players remaining)" << std::endl;
+
+    if (remaining == 0) {
+        open_rooms.erase(room.getId());
+        rooms.erase(room.getId());
+        std::cout << "Room " << room.getId() << " closed (" << rooms.size() << " rooms)" << std::endl;
+    } else if (!room.isStarted()) {
+        open_rooms.insert(room.getId());  // 시작 전 방은 빈자리를 다시 채움
+    }
+}
+
+bool GameServer::validateAndProcessMove(GameRoom& room, int player_id, const Packet& packet) {
+    return room.validateMove(player_id, packet);
+}
+
+void GameServer::broadcastSimulatedBoard(GameRoom& room, int player_id, const sockaddr_in& sender,
+                                         SendBatch& out) {
+    if (!authoritative_boards) {
+        return;
+    }
+    Packet update;
+    size_t length = 0;
+    if (room.fillBoardUpdate(player_id, update, length)) {
+        broadcastToRoom(room, update, length, sender, out);
+    }
+}
+
+void GameServer::broadcastToRoom(GameRoom& room, const Packet& packet, size_t length,
+                                 const sockaddr_in& sender, SendBatch& out) {
+    room.broadcastPacket(packet, length, sender, out);
+}
+
+void GameServer::sendConnectResponse(const Session& session, uint32_t request_seq, uint32_t flags,
+                                     const sockaddr_in& sender, SendBatch& out) {
+    Packet response;
+    memset(response.buffer, 0, PACKET_HEADER_SIZE + sizeof(ConnectResponse));
+    response.header.type = PacketType::CONNECT_RESPONSE;
+    response.header.player_id = session.player->getId();
+    ConnectResponse& body = response.header.data.connect_response;
+    body.request_seq = request_seq;
+    body.seq = session.response_seq;
+    body.token = session.token;
+    body.flags = flags;
+    control.send(session.player->getId(), session.response_seq, response,
+                 PACKET_HEADER_SIZE + sizeof(ConnectResponse), sender, out);
+}
+
+void GameServer::sendGameStart(GameRoom& room, Player& player, SendBatch& out) {
+    Packet start_packet;
+    memset(start_packet.buffer, 0, PACKET_HEADER_SIZE + sizeof(GameStart));
+    start_packet.header.type = PacketType::GAME_START;
+    start_packet.header.player_id = player.getId();
+    room.fillGameStart(start_packet.header.data.game_start);
+    uint32_t seq = player.nextControlSeq();
+    start_packet.header.data.game_start.control_seq = seq;
+    control.send(player.getId(), seq, start_packet, PACKET_HEADER_SIZE + sizeof(GameStart),
+                 player.getAddress(), out);
+}
+
+void GameServer::sendControlAck(int player_id, uint32_t seq, const sockaddr_in& sender, SendBatch& out) {
+    Packet ack;
+    ack.header.type = PacketType::CONTROL_ACK;
+    ack.header.player_id = player_id;
+    ack.header.data.control.seq = seq;
+    out.send(ack.buffer, PACKET_HEADER_SIZE + sizeof(ControlSeq), sender);
+}
+
+void GameServer::handleSubscribe(const Packet& packet, size_t length, const sockaddr_in& sender,
+                                 SendBatch& out) {
+    if (length < PACKET_HEADER_SIZE + sizeof(RoomSubscribe)) {
+        ServerStats::local().countDropped();
+        return;
+    }
+    const RoomSubscribe& request = packet.header.data.subscribe;
+    std::shared_ptr<GameRoom> room;
+    {
+        auto lock = timedLock<std::shared_lock<std::shared_mutex>>(
+            mutex, ServerStats::local().directory_lock_wait_ns);
+        if (request.room_id != 0) {
+            auto it = rooms.find(static_cast<int>(request.room_id));
+            if (it != rooms.end()) {
+                room = it->second;
+            }
+        } else {
+            for (const auto& [room_id, candidate] : rooms) {
+                if (candidate->isStarted()) {
+                    room = candidate;
+                    break;
+                }
+            }
+        }
+    }
+    if (!room) {
+        if (request.room_id != 0) {
+            // 끝난 방: 중계기가 관전자에게 알리고 다른 방을 찾도록 DISCONNECT로 응답
+            Packet gone;
+            gone.header.type = PacketType::DISCONNECT;
+            gone.header.player_id = 0;
+            gone.header.data.subscribe = request;
+            out.send(gone.buffer, PACKET_HEADER_SIZE + sizeof(RoomSubscribe), sender);
+        }
+        return;
+    }
+
+    int result = room->subscribe(sender);
+    if (result < 0) {
+        ServerStats::local().countDropped();
+        return;
+    }
+    if (result > 0) {
+        std::cout << "Spectator relay " << inet_ntoa(sender.sin_addr) << ":" << ntohs(sender.sin_port)
+                  << " subscribed to room " << room->getId() << std::endl;
+    }
+    if (result > 0 || (request.flags & SUBSCRIBE_FLAG_KEYFRAMES)) {
+        room->sendSnapshot(sender, out);
+    }
+}
+
+void GameServer::unsubscribeAll(const sockaddr_in& sender) {
+    std::shared_lock<std::shared_mutex> lock(mutex);
+    for (const auto& [room_id, room] : rooms) {
+        if (room->unsubscribe(sender)) {
+            std::cout << "Spectator relay " << inet_ntoa(sender.sin_addr) << ":" << ntohs(sender.sin_port)
+                      << " left room " << room_id << std::endl;
+        }
+    }
+}
+
+void GameServer::handleStatsRequest(const sockaddr_in& sender, SendBatch& out) {
+    if ((ntohl(sender.sin_addr.s_addr) >> 24) != 127) {
+        ServerStats::local().countDropped();
+        return;
+    }
+    Packet response;
+    response.header.type = PacketType::STATS;
+    response.header.player_id = 0;
+    ServerStatsSnapshot& stats = response.header.data.stats;
+    ServerStats::instance().snapshot(stats);
+    stats.workers = static_cast<uint32_t>(sockets.size());
+    {
+        std::shared_lock<std::shared_mutex> lock(mutex);
+        stats.sessions = sessions.size();
+        stats.rooms = rooms.size();
+    }
+    out.send(response.buffer, PACKET_HEADER_SIZE + sizeof(ServerStatsSnapshot), sender);
+}
+
+void GameServer::sendBoardAck(const Packet& update, const sockaddr_in& sender, SendBatch& out) {
+    Packet ack;
+    memset(ack.buffer, 0, PACKET_HEADER_SIZE + BOARD_UPDATE_HEADER_SIZE);
+    ack.header.type = PacketType::BOARD_ACK;
+    ack.header.player_id = update.header.player_id;
+    ack.header.data.board_update.version = BOARD_FORMAT_VERSION;
+    ack.header.data.board_update.seq = update.header.data.board_update.seq;
+    out.send(ack.buffer, PACKET_HEADER_SIZE + BOARD_UPDATE_HEADER_SIZE, sender);
+}
+
+void GameServer::sendInputAck(int player_id, uint32_t seq, const sockaddr_in& sender, SendBatch& out) {
+    Packet ack;
+    ack.header.type = PacketType::INPUT_ACK;
+    ack.header.player_id = player_id;
+    ack.header.data.input_ack.seq = seq;
+    out.send(ack.buffer, PACKET_HEADER_SIZE + sizeof(InputAck), sender);
 }
 
 int GameServer::assignPlayerId() {
     return next_player_id++; 
 }
 
-void GameServer::startGame() {
+void GameServer::startGame(GameRoom& room, SendBatch& out) {
     Packet start_packet;
+    memset(start_packet.buffer, 0, sizeof(Packet));
     start_packet.header.type = PacketType::GAME_START;
+    room.fillGameStart(start_packet.header.data.game_start);
     
-    std::cout << "Broadcasting game start to all players..." << std::endl;
+    std::cout << "Broadcasting game start to room " << room.getId() << "..." << std::endl;
     
-    // Broadcast to all players using a dummy sender address
-    sockaddr_in dummy_addr{};
-    broadcastToRoom(start_packet, dummy_addr);
+    // 플레이어마다 자기 제어 시퀀스를 붙여 보내고 CONTROL_ACK까지 재전송
+    for (const auto& player : room.getPlayers()) {
+        sendGameStart(room, *player, out);
+    }
 }
\ No newline at end of file
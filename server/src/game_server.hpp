@@ -1,15 +1,25 @@
 #pragma once
 
 #include <sys/socket.h>
+#include <sys/uio.h>
 #include <netinet/in.h>
 #include <arpa/inet.h>
 #include <memory>
 #include <map>
+#include <set>
+#include <unordered_map>
 #include <vector>
 #include <mutex>
+#include <shared_mutex>
 #include <thread>
 #include <atomic>
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <chrono>
+#include <random>
 #include "thread_pool.hpp"
+#include "server_stats.hpp"
 
 // 패킷 타입 정의
 enum class PacketType : uint32_t {
@@ -20,14 +30,169 @@ enum class PacketType : uint32_t {
     DISCONNECT = 5,
     MOVE_PIECE = 6,
     ROTATE_PIECE = 7,
-    DROP_PIECE = 8
+    DROP_PIECE = 8,
+    BOARD_ACK = 9,        // 서버 -> 보낸 클라이언트: BOARD_UPDATE 수신 확인
+    INPUT_COMMANDS = 10,  // 시퀀스 번호가 붙은 최근 입력 명령 묶음 (중복 전송)
+    INPUT_ACK = 11,       // 서버 -> 보낸 클라이언트: 처리한 최대 입력 시퀀스
+    BOARD_HASH = 12,      // (마지막 입력 시퀀스, 보드 crc32): 방 안에 그대로 중계
+    RESYNC_REQUEST = 13,  // 대상 플레이어에게만 전달: 키프레임을 다시 보내달라는 요청
+    STATS = 14,           // 루프백 주소의 요청에만 ServerStatsSnapshot으로 응답
+    CONTROL_ACK = 15,     // 제어 패킷(CONNECT_RESPONSE/GAME_START/DISCONNECT) 수신 확인
+    SUBSCRIBE = 16,       // 관전 중계기 -> 서버: 방 구독/갱신 (player_id 0, DISCONNECT로 해지)
+    PLAYER_SCORES = 17    // 구독자에게 보내는 방 플레이어 점수 목록
 };
 
-// 게임 검증을 위한 테트리스 피스 정의
-struct TetrisPiece {
-    std::vector<std::vector<int>> shape;
-    int x, y;
-    int type;
+// BOARD_UPDATE 가변 길이 포맷 (version 1)
+// 각 행은 칸당 3비트로 압축된 uint32, row_mask에 표시된 행만 전송
+// 키프레임: 행 값 그대로 (없는 행은 빈 행), 델타: base_seq 스냅샷과의 XOR
+const uint8_t BOARD_FORMAT_VERSION = 1;
+const uint8_t BOARD_FLAG_KEYFRAME = 0x01;
+const int BOARD_ROWS = 20;
+const int BOARD_COLS = 10;
+const uint32_t BOARD_ROW_BITS = (1u << (BOARD_COLS * 3)) - 1;
+
+struct BoardUpdate {
+    uint8_t version;
+    uint8_t flags;
+    uint16_t seq;
+    uint16_t base_seq;
+    uint16_t input_seq;   // 이 보드에 반영된 마지막 입력 명령 시퀀스의 하위 16비트
+    uint32_t row_mask;
+    uint32_t rows[BOARD_ROWS];
+};
+
+// INPUT_COMMANDS 포맷: 명령마다 시퀀스 번호를 가지며, 클라이언트는 ACK 받지 못한
+// 최근 명령들을 매 패킷에 다시 실어 보냄 (손실을 재전송 왕복 없이 숨김)
+const int MAX_INPUT_COMMANDS = 16;
+
+struct InputCommand {
+    uint32_t seq;
+    uint8_t type;         // MOVE_PIECE / ROTATE_PIECE / DROP_PIECE
+    uint8_t piece_type;
+    int8_t x;
+    int8_t y;
+    uint8_t rotation;
+    uint8_t reserved[3];
+};
+
+struct InputBatch {
+    uint8_t count;
+    uint8_t reserved[3];
+    InputCommand commands[MAX_INPUT_COMMANDS];
+};
+
+struct InputAck {
+    uint32_t seq;
+};
+
+// GAME_START 페이로드: 방 번호와 같은 방 플레이어 목록 (클라이언트가 상대 순서를 정함)
+const int ROOM_CAPACITY = 3;
+// 방 하나를 구독할 수 있는 관전 중계기 수 (관전자는 중계기가 맡음)
+const int ROOM_MAX_SUBSCRIBERS = 4;
+
+struct GameStart {
+    uint32_t room_id;
+    uint32_t player_count;
+    uint32_t player_ids[ROOM_CAPACITY];
+    uint32_t seed;        // 방 전체가 같은 7-bag 블록 순서를 쓰기 위한 seed
+    uint32_t control_seq; // 받는 플레이어 기준 서버 제어 시퀀스 (CONTROL_ACK 대상)
+};
+
+// 제어 패킷 신뢰성 계층: 보내는 쪽이 제어 패킷마다 시퀀스를 붙이고 받는 쪽은
+// CONTROL_ACK로 확인, 확인이 없으면 RTT 기반 타임아웃부터 지수 백오프로 재전송
+// (CONNECT_REQUEST는 CONNECT_RESPONSE가 확인 역할)
+const uint32_t CONNECT_FLAG_RECONNECTED = 0x01;
+
+struct ConnectRequest {
+    uint32_t seq;         // 클라이언트 제어 시퀀스 (재전송해도 같은 값)
+    uint32_t reserved;
+    uint64_t token;       // 0: 새 연결, 그 외: 이 세션 토큰의 자리로 재접속
+};
+
+struct ConnectResponse {
+    uint32_t request_seq; // 응답한 ConnectRequest의 seq
+    uint32_t seq;         // 서버 제어 시퀀스 (CONTROL_ACK 대상)
+    uint64_t token;       // 재접속에 쓸 세션 토큰
+    uint32_t flags;
+    uint32_t reserved;
+};
+
+struct ControlSeq {
+    uint32_t seq;         // DISCONNECT: 보낸 쪽 제어 시퀀스, CONTROL_ACK: 확인한 시퀀스
+};
+
+struct BoardHash {
+    uint32_t input_seq;
+    uint32_t crc;
+};
+
+struct ResyncRequest {
+    uint32_t target_id;
+};
+
+// 방 구독: 방의 중계 패킷(INPUT_COMMANDS, BOARD_UPDATE, BOARD_HASH)을 구독자에게도 전달
+// 새 구독이나 KEYFRAMES 요청이면 GAME_START(player_id 0), PLAYER_SCORES, 플레이어별
+// 키프레임 BOARD_UPDATE를 보냄. 갱신이 SUBSCRIPTION_TIMEOUT_MS 동안 없으면 해지
+const uint32_t SUBSCRIBE_FLAG_KEYFRAMES = 0x01;
+
+struct RoomSubscribe {
+    uint32_t room_id;     // 0: 시작한 방 중 번호가 가장 작은 방
+    uint32_t flags;
+};
+
+struct PlayerScore {
+    uint32_t player_id;
+    uint32_t score;
+    uint32_t lines;
+    uint32_t flags;       // 서버는 0 (관전 중계기가 게임 오버 등을 표시)
+};
+
+struct PlayerScores {
+    uint32_t count;
+    PlayerScore players[ROOM_CAPACITY];
+};
+
+// 서버 시뮬레이션용 피스 테이블: 클라이언트 game/core.py의 SHAPES와 같은 모양/순서
+// (칸 값 = 색상 = 종류 + 1), 회전은 시계 방향으로 미리 계산
+const int PIECE_KINDS = 7;
+const int PIECE_ROTATIONS = 4;
+
+struct PieceRotation {
+    uint8_t color;        // 칸 값 (종류 + 1)
+    int width;            // 회전된 행렬 크기
+    int height;
+    int top;              // 첫 번째 블록 행 (빈 행은 경계 검사에서 제외)
+    int row_count;        // top부터 마지막 블록 행까지
+    uint16_t masks[4];    // top부터의 행 마스크 (x = 0 기준, 비트 j = 열 j)
+    int min_x;            // 보드 안에 들어가는 x 범위
+    int max_x;
+    int cell_count;
+    int8_t cells[4][2];   // (행, 열)
+};
+
+class PieceTable {
+public:
+    static const PieceTable& instance();
+    // 범위를 벗어난 종류/회전이면 nullptr
+    const PieceRotation* get(int kind, int rotation) const;
+
+private:
+    PieceTable();
+    PieceRotation rotations[PIECE_KINDS][PIECE_ROTATIONS];
+};
+
+// 클라이언트 game/core.py의 SevenBag과 같은 블록 순서 (xorshift32 + Fisher-Yates):
+// 같은 seed면 방의 모든 클라이언트와 서버가 같은 순서로 블록을 꺼냄
+class SevenBag {
+public:
+    explicit SevenBag(uint32_t seed = 0);
+    int next();
+
+private:
+    uint32_t nextRandom();
+    uint32_t state;
+    int bag[PIECE_KINDS];
+    int taken;  // 현재 묶음에서 앞에서부터 꺼낸 수
 };
 
 // 패킷 구조체 정의
@@ -42,26 +207,187 @@ union Packet {
                 int y;
                 int rotation;
             } move_data;
+            BoardUpdate board_update;
+            InputBatch input_batch;
+            InputAck input_ack;
+            GameStart game_start;
+            BoardHash board_hash;
+            ResyncRequest resync_request;
+            ServerStatsSnapshot stats;
+            ConnectRequest connect_request;
+            ConnectResponse connect_response;
+            ControlSeq control;
+            RoomSubscribe subscribe;
+            PlayerScores player_scores;
             uint8_t board_data[1000];
         } data;
     } header;
     uint8_t buffer[1024];
 };
 
-// 게임 상태를 저장하는 클래스
+const size_t PACKET_HEADER_SIZE = offsetof(decltype(Packet::header), data);
+const size_t BOARD_UPDATE_HEADER_SIZE = offsetof(BoardUpdate, rows);
+static_assert(PACKET_HEADER_SIZE == 8, "packet header must match the Python client");
+static_assert(BOARD_UPDATE_HEADER_SIZE == 12, "BOARD_UPDATE header must match the Python client");
+const size_t INPUT_BATCH_HEADER_SIZE = offsetof(InputBatch, commands);
+static_assert(sizeof(InputCommand) == 12, "InputCommand must match the Python client");
+static_assert(sizeof(ServerStatsSnapshot) <= sizeof(Packet) - PACKET_HEADER_SIZE,
+              "STATS response must fit in one packet");
+
+// 워커별 송신 묶음: 수신 배치 하나를 처리하는 동안 보낼 패킷을 모아 sendmmsg 한 번으로 전송
+class SendBatch {
+public:
+    static const int MAX_MESSAGES = 256;
+
+    explicit SendBatch(int sock);
+    // 데이터를 내부 버퍼에 복사하고 복사본 포인터를 반환 (같은 패킷을 여러 주소로 보낼 때 공유)
+    const uint8_t* store(const void* data, size_t length);
+    void add(const uint8_t* data, size_t length, const sockaddr_in& addr);
+    void send(const void* data, size_t length, const sockaddr_in& addr);
+    void flush();
+
+private:
+    int sock;
+    std::vector<std::array<uint8_t, 1024>> storage;
+    size_t stored;
+    std::vector<mmsghdr> messages;
+    std::vector<iovec> iovecs;
+    std::vector<sockaddr_in> addresses;
+    size_t count;
+};
+
+// 서버가 보내는 신뢰성 제어 패킷: CONTROL_ACK를 받을 때까지 지수 백오프로 재전송
+// (재전송은 워커 0이 담당하고, 새 항목이 생기면 eventfd로 깨움)
+class ControlSender {
+public:
+    static constexpr int MIN_RTO_MS = 20;
+    static constexpr int INITIAL_RTO_MS = 200;  // 아직 RTT 표본이 없는 플레이어
+    static constexpr int MAX_RTO_MS = 2000;
+    static constexpr int MAX_ATTEMPTS = 8;
+
+    ControlSender();
+    ~ControlSender();
+    int wakeFd() const { return wake_fd; }
+    // 바로 전송하고 확인될 때까지 재전송 대상으로 등록 (같은 플레이어/seq 항목은 교체)
+    void send(int player_id, uint32_t seq, const Packet& packet, size_t length,
+              const sockaddr_in& addr, SendBatch& out);
+    // 항목을 지우고, 재전송하지 않았던 패킷이면 RTT 표본으로 사용
+    void ack(int player_id, uint32_t seq, const sockaddr_in& sender);
+    void rebind(int player_id, const sockaddr_in& addr);
+    void forget(int player_id);
+    bool empty() const { return pending.load(std::memory_order_relaxed) == 0; }
+    // 기한이 지난 항목을 재전송하고 다음 기한까지 남은 ms를 반환 (-1: 대기 항목 없음)
+    int retransmit(SendBatch& out);
+
+private:
+    using Clock = std::chrono::steady_clock;
+    struct Entry {
+        int player_id;
+        uint32_t seq;
+        sockaddr_in address;
+        std::array<uint8_t, sizeof(Packet)> data;
+        size_t length;
+        Clock::time_point sent_at;
+        Clock::time_point next_send;
+        int rto_ms;
+        int attempts;
+    };
+    struct RttEstimate {
+        double srtt_ms;
+        double rttvar_ms;
+    };
+    int initialRto(int player_id) const;
+
+    int wake_fd;
+    mutable std::mutex mutex;
+    std::vector<Entry> entries;
+    std::unordered_map<int, RttEstimate> rtt;
+    std::atomic<size_t> pending;
+};
+
+// 플레이어별 최근 보드 스냅샷 (델타 복원용 링 버퍼)
+class BoardSnapshots {
+public:
+    BoardSnapshots();
+    // 패킷을 검증/적용하고, 성공하면 true (길이는 헤더 포함 수신 바이트 수)
+    bool apply(const BoardUpdate& update, size_t payload_len);
+    const uint32_t* latest() const;
+
+private:
+    static const int HISTORY = 32;
+    struct Snapshot {
+        bool valid;
+        uint16_t seq;
+        uint32_t rows[BOARD_ROWS];
+    };
+    std::array<Snapshot, HISTORY> history;
+    int latest_slot;
+};
+
+// 플레이어별 입력 명령 중복 제거 + 최근 승인된 명령 (상대에게 중복 전달용)
+class InputHistory {
+public:
+    InputHistory();
+    uint32_t lastSeq() const { return last_seq; }
+    // 새 명령이면 true를 반환하고 시퀀스를 전진시킴
+    bool advance(uint32_t seq);
+    void record(const InputCommand& command);
+    // 최근 승인된 명령들로 INPUT_COMMANDS 페이로드를 채우고 길이 반환
+    size_t fillBatch(InputBatch& batch) const;
+
+private:
+    uint32_t last_seq;
+    std::array<InputCommand, MAX_INPUT_COMMANDS> recent;
+    size_t recent_count;
+    size_t recent_head;
+};
+
+// 플레이어별 권위 있는 보드 시뮬레이션 (행마다 비트마스크 + BOARD_UPDATE 포맷 색상 행)
 class GameState {
 public:
-    static const int BOARD_WIDTH = 10;
-    static const int BOARD_HEIGHT = 20;
+    static const int BOARD_WIDTH = BOARD_COLS;
+    static const int BOARD_HEIGHT = BOARD_ROWS;
     
     GameState();
-    bool isValidMove(const TetrisPiece& piece, int x, int y) const;
-    bool isValidRotation(const TetrisPiece& piece, int rotation) const;
-    void applyMove(const TetrisPiece& piece);
-    void clearLines();
+    bool fits(int kind, int rotation, int x, int y) const;
+    // 방의 seed로 블록 순서를 정하고 첫 블록을 생성 위치에 놓음 (그 전의 명령은 모두 거부)
+    void start(uint32_t seed);
+    // 입력 명령이 현재 블록에서 한 번의 조작으로 갈 수 있는 위치인지 검증하고 승인되면 적용
+    // (중력 낙하는 전송되지 않으므로 그 사이 같은 x/회전으로 떨어진 만큼 y가 늘 수 있음,
+    // DROP_PIECE는 바닥에 닿은 위치여야 하며 고정 + 줄 제거 + 다음 블록 생성까지 수행)
+    bool applyCommand(PacketType type, int kind, int x, int y, int rotation);
+    int lockPiece(const PieceRotation& piece, int x, int y);
+    uint32_t getScore() const { return score; }
+    uint32_t getLinesCleared() const { return lines_cleared; }
+    // 마지막 호출 이후 보드가 바뀌었으면 키프레임으로 채우고 페이로드 길이 반환 (아니면 0)
+    size_t fillBoardUpdate(BoardUpdate& update, uint32_t input_seq);
+    // 바뀌었는지와 상관없이 현재 보드를 키프레임으로 채움 (구독자 스냅샷용, 시퀀스 유지)
+    size_t fillKeyframe(BoardUpdate& update, uint32_t input_seq) const;
     
 private:
-    std::vector<std::vector<int>> board;
+    int clearLines();
+    // 다음 블록을 생성 위치(가운데, y 0, 회전 0)에 놓음; 들어가지 않으면 게임 오버
+    void spawn();
+    // active 블록이 같은 x/회전으로 to_y까지 막힘 없이 떨어질 수 있는지
+    bool canFallTo(int to_y) const;
+
+    struct ActivePiece {
+        bool valid;
+        int kind;
+        int rotation;
+        int x;
+        int y;
+    };
+
+    uint16_t occupancy[BOARD_HEIGHT];
+    uint32_t colors[BOARD_HEIGHT];  // 칸당 3비트, 클라이언트 pack_board_rows와 같은 배치
+    ActivePiece active;  // valid가 false면 시작 전이거나 게임 오버
+    SevenBag bag;
+    bool dirty;
+    uint16_t board_seq;
+    uint32_t score;
+    uint32_t lines_cleared;
+    uint32_t level;
 };
 
 // 플레이어 정보를 저장하는 클래스
@@ -70,53 +396,140 @@ public:
     Player(int id, const sockaddr_in& addr);
     int getId() const { return id; }
     const sockaddr_in& getAddress() const { return address; }
+    // 재접속으로 주소가 바뀜 (방 잠금과 색인 잠금을 잡은 상태에서만 호출)
+    void setAddress(const sockaddr_in& addr) { address = addr; }
+    uint32_t nextControlSeq() { return ++control_seq; }
     GameState& getGameState() { return game_state; }
+    BoardSnapshots& getBoardSnapshots() { return board_snapshots; }
+    InputHistory& getInputHistory() { return input_history; }
 
 private:
     int id;
     sockaddr_in address;
+    std::atomic<uint32_t> control_seq;  // 이 플레이어에게 보내는 제어 패킷 시퀀스
     GameState game_state;
+    BoardSnapshots board_snapshots;
+    InputHistory input_history;
 };
 
-// 게임 방 클래스
+// 게임 방 클래스 (방마다 자체 뮤텍스를 가져 다른 방의 패킷 처리와 경합하지 않음)
 class GameRoom {
 public:
-    GameRoom();
+    explicit GameRoom(int id);
+    int getId() const { return id; }
     bool addPlayer(std::shared_ptr<Player> player);
     bool removePlayer(int player_id);
     bool isFull() const;
     bool isEmpty() const;
-    void broadcastPacket(const Packet& packet, const sockaddr_in& sender, int sock);
+    size_t playerCount() const;
+    // 방이 찼을 때 한 번만 true를 반환하고 시작 상태로 표시
+    bool tryStart();
+    bool isStarted() const;
+    void fillGameStart(GameStart& start) const;
+    void broadcastPacket(const Packet& packet, size_t length, const sockaddr_in& sender, SendBatch& out);
+    // 같은 방의 한 플레이어에게만 전송 (없으면 false)
+    bool sendToPlayer(int player_id, const Packet& packet, size_t length, SendBatch& out);
     std::vector<std::shared_ptr<Player>> getPlayers() const;
-    bool validateMove(int player_id, const Packet& packet) const;
+    bool rebindPlayer(int player_id, const sockaddr_in& addr);
+    // 반환값: 1 새 구독, 0 기존 구독 갱신, -1 자리 없음
+    int subscribe(const sockaddr_in& addr);
+    bool unsubscribe(const sockaddr_in& addr);
+    // 구독자 한 명에게 GAME_START, 점수, 플레이어별 키프레임을 보냄
+    void sendSnapshot(const sockaddr_in& addr, SendBatch& out) const;
+    // 구형 MOVE/ROTATE/DROP 패킷을 검증하고 승인되면 시뮬레이션에 적용
+    bool validateMove(int player_id, const Packet& packet);
+    bool applyBoardUpdate(int player_id, const Packet& packet, size_t length);
+    // 서버 시뮬레이션 보드가 바뀌었으면 그 플레이어의 BOARD_UPDATE 키프레임을 채움
+    bool fillBoardUpdate(int player_id, Packet& packet, size_t& length);
+    // 새 입력 명령을 검증/기록; 처리한 최대 시퀀스를 acked에, 상대에게 보낼 묶음을 forward에 채움
+    // 반환값: 새로 승인된 명령 수 (-1: 잘못된 패킷/플레이어)
+    int applyInputs(int player_id, const Packet& packet, size_t length,
+                    uint32_t& acked, Packet& forward, size_t& forward_length);
 
 private:
-    static const int MAX_PLAYERS = 3;
+    static const int MAX_PLAYERS = ROOM_CAPACITY;
+    // 대기 시간을 ServerStats에 기록하며 방 뮤텍스를 잠금
+    std::unique_lock<std::mutex> lockRoom() const;
+    void fillGameStartLocked(GameStart& start) const;
+    int id;
+    bool started;
+    uint32_t seed;
     std::map<int, std::shared_ptr<Player>> players;
+
+    static constexpr int SUBSCRIPTION_TIMEOUT_MS = 10000;
+    struct Subscriber {
+        sockaddr_in address;
+        std::chrono::steady_clock::time_point expires;
+    };
+    std::vector<Subscriber> subscribers;
     mutable std::mutex mutex;
 };
 
 // 게임 서버 클래스
 class GameServer {
 public:
-    GameServer(int port);
+    // authoritative_boards: 클라이언트가 보낸 보드 대신 서버 시뮬레이션 보드를 중계
+    GameServer(int port, bool authoritative_boards = false);
     ~GameServer();
+    // 워커 0은 호출한 스레드에서, 나머지는 스레드 풀에서 실행
     void run();
 
 private:
-    void handlePacket(const Packet& packet, const sockaddr_in& sender);
+    static const int IO_WORKERS = 4;
+    static const int RECV_BATCH = 64;
+
+    // 주소 -> (플레이어, 방) 색인 항목
+    struct Session {
+        std::shared_ptr<Player> player;
+        std::shared_ptr<GameRoom> room;
+        uint64_t token;         // 재접속용 세션 토큰
+        uint32_t response_seq;  // CONNECT_RESPONSE의 제어 시퀀스 (중복 요청에도 같은 값)
+    };
+    static constexpr int SHUTDOWN_ACK_WAIT_MS = 1000;
+
+    static uint64_t addressKey(const sockaddr_in& addr);
+    // 워커마다 SO_REUSEPORT 소켓 하나 + epoll, recvmmsg로 묶어 받고 배치마다 flush
+    void workerLoop(int worker);
+    void handlePacket(const Packet& packet, size_t length, const sockaddr_in& sender, SendBatch& out);
+    void handleConnect(const Packet& packet, size_t length, const sockaddr_in& sender, SendBatch& out);
+    void handleDisconnect(const sockaddr_in& sender);
+    void handleSubscribe(const Packet& packet, size_t length, const sockaddr_in& sender, SendBatch& out);
+    void unsubscribeAll(const sockaddr_in& sender);
+    // 보낸 주소로 세션을 찾고 헤더의 player_id와 일치하는지 확인
+    bool findSession(const Packet& packet, const sockaddr_in& sender, Session& session);
     int assignPlayerId();
-    void broadcastToRoom(const Packet& packet, const sockaddr_in& sender);
-    bool validateAndProcessMove(int player_id, const Packet& packet);
+    void broadcastToRoom(GameRoom& room, const Packet& packet, size_t length,
+                         const sockaddr_in& sender, SendBatch& out);
+    void sendBoardAck(const Packet& update, const sockaddr_in& sender, SendBatch& out);
+    void sendInputAck(int player_id, uint32_t seq, const sockaddr_in& sender, SendBatch& out);
+    void sendConnectResponse(const Session& session, uint32_t request_seq, uint32_t flags,
+                             const sockaddr_in& sender, SendBatch& out);
+    void sendGameStart(GameRoom& room, Player& player, SendBatch& out);
+    void sendControlAck(int player_id, uint32_t seq, const sockaddr_in& sender, SendBatch& out);
+    // 로컬(루프백) 조회에만 누적 통계 스냅샷으로 응답
+    void handleStatsRequest(const sockaddr_in& sender, SendBatch& out);
+    bool validateAndProcessMove(GameRoom& room, int player_id, const Packet& packet);
+    // authoritative_boards일 때 시뮬레이션 보드가 바뀐 플레이어의 키프레임을 방에 전송
+    void broadcastSimulatedBoard(GameRoom& room, int player_id, const sockaddr_in& sender, SendBatch& out);
     void handleUserInput();  // 사용자 입력 처리 함수
     void shutdown();         // 서버 종료 함수
-    void startGame();        // 게임 시작 함수
+    void startGame(GameRoom& room, SendBatch& out);  // 게임 시작 함수
 
-    int sock;
-    std::unique_ptr<GameRoom> game_room;
+    bool authoritative_boards;
+    int sock;  // sockets[0] (종료 알림 등 워커 밖에서 보낼 때 사용)
+    std::vector<int> sockets;
     ThreadPool thread_pool;
     int next_player_id;
-    std::mutex mutex;
+    int next_room_id;
+    // 매치메이킹/색인 잠금: 연결/해제만 배타적으로, 일반 패킷은 공유 잠금으로 조회
+    std::shared_mutex mutex;
+    std::map<int, std::shared_ptr<GameRoom>> rooms;
+    std::set<int> open_rooms;  // 아직 시작하지 않았고 자리가 남은 방
+    std::unordered_map<uint64_t, Session> sessions;
+    std::unordered_map<uint64_t, uint64_t> session_tokens;  // 토큰 -> sessions 키
+    std::mt19937_64 token_rng;
+    ControlSender control;
     std::atomic<bool> running;
+    std::atomic<bool> shutting_down;
     std::unique_ptr<std::thread> input_thread;
 }; 
\ No newline at end of file
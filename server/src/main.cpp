@@ -1,6 +1,7 @@
 #include "game_server.hpp"
 #include <iostream>
 #include <csignal>
+#include <cstring>
 
 volatile sig_atomic_t running = true;
 
@@ -8,13 +9,21 @@ void signal_handler(int signal) {
     running = false;
 }
 
-int main() {
+int main(int argc, char* argv[]) {
     try {
+        // --authoritative: 상대 보드를 서버 시뮬레이션 결과로 중계
+        bool authoritative_boards = false;
+        for (int i = 1; i < argc; ++i) {
+            if (strcmp(argv[i], "--authoritative") == 0) {
+                authoritative_boards = true;
+            }
+        }
+
         // SIGINT (Ctrl+C) 핸들러 설정
         std::signal(SIGINT, signal_handler);
         
         // 게임 서버 시작 (포트 12345 사용)
-        GameServer server(12345);
+        GameServer server(12345, authoritative_boards);
         server.run();
     }
     catch (const std::exception& e) {
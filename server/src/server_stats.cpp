@@ -0,0 +1,96 @@
+#include "server_stats.hpp"
+
+namespace {
+thread_local StatsShard* current_shard = nullptr;
+
+uint64_t load(const std::atomic<uint64_t>& value) {
+    return value.load(std::memory_order_relaxed);
+}
+
+void bump(std::atomic<uint64_t>& value, uint64_t amount = 1) {
+    value.fetch_add(amount, std::memory_order_relaxed);
+}
+}
+
+// AtomicHistogram 구현
+AtomicHistogram::AtomicHistogram(int shift) : shift(shift), count(0), sum(0) {
+    for (auto& bucket : buckets) {
+        bucket.store(0, std::memory_order_relaxed);
+    }
+}
+
+void AtomicHistogram::record(uint64_t value) {
+    uint64_t scaled = value >> shift;
+    int bucket = scaled == 0 ? 0 : 64 - __builtin_clzll(scaled);
+    if (bucket >= STATS_BUCKETS) {
+        bucket = STATS_BUCKETS - 1;
+    }
+    bump(buckets[bucket]);
+    bump(count);
+    bump(sum, value);
+}
+
+void AtomicHistogram::addTo(StatsHistogram& out) const {
+    out.count += load(count);
+    out.sum += load(sum);
+    for (int i = 0; i < STATS_BUCKETS; ++i) {
+        out.buckets[i] += load(buckets[i]);
+    }
+}
+
+// StatsShard 구현
+StatsShard::StatsShard()
+    : dropped_packets(0)
+    , invalid_moves(0)
+    , batch_size(0)
+    , handle_ns(7)
+    , room_lock_wait_ns(7)
+    , directory_lock_wait_ns(7)
+{
+    for (int i = 0; i < STATS_PACKET_TYPES; ++i) {
+        received[i].store(0, std::memory_order_relaxed);
+        sent[i].store(0, std::memory_order_relaxed);
+    }
+}
+
+void StatsShard::countReceived(uint32_t type) {
+    bump(received[type < STATS_PACKET_TYPES ? type : 0]);
+}
+
+void StatsShard::countSent(uint32_t type) {
+    bump(sent[type < STATS_PACKET_TYPES ? type : 0]);
+}
+
+// ServerStats 구현
+ServerStats::ServerStats() : start_time(std::chrono::steady_clock::now()) {}
+
+ServerStats& ServerStats::instance() {
+    static ServerStats stats;
+    return stats;
+}
+
+StatsShard& ServerStats::local() {
+    return current_shard ? *current_shard : instance().shards[0];
+}
+
+void ServerStats::bindWorker(int worker) {
+    current_shard = &shards[1 + worker % (MAX_SHARDS - 1)];
+}
+
+void ServerStats::snapshot(ServerStatsSnapshot& out) const {
+    out = ServerStatsSnapshot{};
+    out.version = STATS_FORMAT_VERSION;
+    out.uptime_ms = elapsedNs(start_time) / 1000000;
+    for (const auto& shard : shards) {
+        out.dropped_packets += load(shard.dropped_packets);
+        out.invalid_moves += load(shard.invalid_moves);
+        for (int i = 0; i < STATS_PACKET_TYPES; ++i) {
+            out.received[i] += load(shard.received[i]);
+            out.sent[i] += load(shard.sent[i]);
+        }
+        shard.batch_size.addTo(out.batch_size);
+        shard.handle_ns.addTo(out.handle_ns);
+        shard.room_lock_wait_ns.addTo(out.room_lock_wait_ns);
+        shard.directory_lock_wait_ns.addTo(out.directory_lock_wait_ns);
+    }
+}
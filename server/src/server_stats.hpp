@@ -0,0 +1,107 @@
+#pragma once
+
+#include <atomic>
+#include <array>
+#include <chrono>
+#include <cstdint>
+#include <mutex>
+
+// STATS 응답 페이로드 (version 2): 값은 모두 서버 시작 이후 누적값이며
+// 조회 도구가 두 응답의 차이로 초당 값을 계산함
+const uint32_t STATS_FORMAT_VERSION = 2;
+const int STATS_PACKET_TYPES = 20;  // 패킷 타입별 카운터 (0번 칸: 범위를 벗어난 타입)
+const int STATS_BUCKETS = 16;
+
+// 로그 스케일 히스토그램: 0번 칸은 (value >> shift) == 0,
+// i번 칸(i >= 1)은 [2^(i-1+shift), 2^(i+shift)), 마지막 칸은 그 이상 전부
+struct StatsHistogram {
+    uint64_t count;
+    uint64_t sum;
+    uint64_t buckets[STATS_BUCKETS];
+};
+
+struct ServerStatsSnapshot {
+    uint32_t version;
+    uint32_t workers;
+    uint64_t uptime_ms;
+    uint64_t sessions;
+    uint64_t rooms;
+    uint64_t dropped_packets;   // 너무 짧거나, 세션이 없거나, 형식이 맞지 않아 버린 패킷
+    uint64_t invalid_moves;     // 서버 시뮬레이션이 거부한 이동/입력 명령
+    uint64_t received[STATS_PACKET_TYPES];
+    uint64_t sent[STATS_PACKET_TYPES];
+    StatsHistogram batch_size;              // recvmmsg 한 번에 받은 패킷 수 (shift 0): 워커 수신 큐 깊이
+    StatsHistogram handle_ns;               // 패킷 하나 처리 시간 (shift 7)
+    StatsHistogram room_lock_wait_ns;       // GameRoom 뮤텍스 대기 (shift 7, 0번 칸: 바로 획득)
+    StatsHistogram directory_lock_wait_ns;  // 세션/방 색인 잠금 대기 (shift 7)
+};
+
+// 여러 스레드가 잠금 없이 기록하는 히스토그램 (relaxed atomic)
+class AtomicHistogram {
+public:
+    explicit AtomicHistogram(int shift);
+    void record(uint64_t value);
+    void addTo(StatsHistogram& out) const;
+
+private:
+    int shift;
+    std::atomic<uint64_t> count;
+    std::atomic<uint64_t> sum;
+    std::array<std::atomic<uint64_t>, STATS_BUCKETS> buckets;
+};
+
+// 카운터 묶음 하나: I/O 워커마다 따로 두어 캐시 라인을 공유하지 않음
+struct alignas(64) StatsShard {
+    StatsShard();
+    std::array<std::atomic<uint64_t>, STATS_PACKET_TYPES> received;
+    std::array<std::atomic<uint64_t>, STATS_PACKET_TYPES> sent;
+    std::atomic<uint64_t> dropped_packets;
+    std::atomic<uint64_t> invalid_moves;
+    AtomicHistogram batch_size;
+    AtomicHistogram handle_ns;
+    AtomicHistogram room_lock_wait_ns;
+    AtomicHistogram directory_lock_wait_ns;
+
+    void countReceived(uint32_t type);
+    void countSent(uint32_t type);
+    void countDropped() { dropped_packets.fetch_add(1, std::memory_order_relaxed); }
+    void countInvalidMoves(uint64_t n = 1) { invalid_moves.fetch_add(n, std::memory_order_relaxed); }
+};
+
+class ServerStats {
+public:
+    static const int MAX_SHARDS = 8;
+
+    static ServerStats& instance();
+    // 호출한 스레드의 카운터 묶음 (bindWorker를 부르지 않은 스레드는 공용 0번 묶음)
+    static StatsShard& local();
+    // 현재 스레드를 I/O 워커 worker(0부터)의 묶음에 연결
+    void bindWorker(int worker);
+    // 모든 묶음을 합산 (sessions/rooms/workers는 서버가 채움)
+    void snapshot(ServerStatsSnapshot& out) const;
+
+private:
+    ServerStats();
+    std::array<StatsShard, MAX_SHARDS> shards;
+    std::chrono::steady_clock::time_point start_time;
+};
+
+inline uint64_t elapsedNs(std::chrono::steady_clock::time_point start) {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now() - start).count();
+}
+
+// 잠금을 먼저 try_lock으로 시도해 바로 잡히면 시계를 읽지 않고 대기 0으로 기록
+// (Lock: std::unique_lock / std::shared_lock)
+template<class Lock>
+Lock timedLock(typename Lock::mutex_type& mutex, AtomicHistogram& wait) {
+    Lock lock(mutex, std::try_to_lock);
+    if (lock.owns_lock()) {
+        wait.record(0);
+        return lock;
+    }
+    auto start = std::chrono::steady_clock::now();
+    lock.lock();
+    wait.record(elapsedNs(start));
+    return lock;
+}